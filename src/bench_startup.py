@@ -0,0 +1,125 @@
+"""
+起動時間ベンチマーク
+
+新しい Python プロセスを起動し、インタプリタ起動 → エンジンの import →
+最初の 1 ステップのシミュレーション完了までの時間を計測します。
+SubprocVecEnv のワーカーやトーナメントの並列プロセスが毎回支払うコストです。
+
+ウィンドウなしのエンジンが pygame を読み込んでいないことも確認します。
+
+実行方法:
+    cd src
+    uv run python bench_startup.py
+    uv run python bench_startup.py --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# 計測対象: (表示名, import 文, 最初の 1 ステップを進める文)
+# Game は run() で最後まで回すため、1 ステップずつ進められるエンジンを計測する
+ENGINES = (
+    (
+        "GymGame",
+        "from tcg.gym_game import GymGame",
+        "GymGame(Idle(), Idle(), window=False).process_step()",
+    ),
+    (
+        "SkipGame",
+        "from tcg.skip_game import SkipGame",
+        "SkipGame(Idle(), Idle(), window=False).process_step()",
+    ),
+    (
+        "GameState",
+        "from tcg.game_state import GameState",
+        "GameState(seed=0).play()",
+    ),
+)
+
+# 子プロセスで実行するスクリプト。起動からの経過時間は親プロセスが計る
+CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+{import_line}
+from tcg.controller import Controller
+t1 = time.perf_counter()
+
+class Idle(Controller):
+    def team_name(self):
+        return "Idle"
+
+    def update(self, info):
+        return 0, 0, 0
+
+{first_step}
+t2 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "step": t2 - t1, "pygame": "pygame" in sys.modules}}))
+"""
+
+HEAVY_MODULES = ("pygame", "gym", "gymnasium", "torch")
+
+
+def measure(import_line: str, first_step: str) -> dict:
+    """1 回分の計測。total はプロセス起動から最初のステップ完了まで"""
+    script = CHILD.format(import_line=import_line, first_step=first_step)
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    total = time.perf_counter() - start
+    result = json.loads(out)
+    # プロセス終了までの時間も含むため、total は最初のステップ完了時刻の上限値
+    result["total"] = total
+    return result
+
+
+def check_headless_imports() -> list[str]:
+    """ウィンドウなしのエンジン一式を import したときに読み込まれた重いモジュール"""
+    script = (
+        "import sys\n"
+        "import tcg.game, tcg.skip_game, tcg.gym_game, tcg.game_state, tcg.batch_game\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return [m for m in out.strip().split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="エンジンの起動時間を計測します")
+    parser.add_argument("--repeat", type=int, default=10, help="エンジンごとの計測回数")
+    args = parser.parse_args()
+
+    # 何も import しないインタプリタ起動時間（比較用の基準）
+    baseline = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline.append(time.perf_counter() - start)
+    print(f"{'interpreter':<10} 合計 {statistics.median(baseline) * 1000:7.1f} ms")
+
+    for name, import_line, first_step in ENGINES:
+        runs = [measure(import_line, first_step) for _ in range(args.repeat)]
+        total = statistics.median(r["total"] for r in runs) * 1000
+        imported = statistics.median(r["import"] for r in runs) * 1000
+        step = statistics.median(r["step"] for r in runs) * 1000
+        pygame = "あり" if any(r["pygame"] for r in runs) else "なし"
+        print(
+            f"{name:<10} 合計 {total:7.1f} ms"
+            f"  (import {imported:6.1f} ms, 初回ステップ {step:6.1f} ms, pygame {pygame})"
+        )
+
+    loaded = check_headless_imports()
+    if loaded:
+        print(f"警告: ウィンドウなしのエンジンが {', '.join(loaded)} を読み込んでいます")
+    else:
+        print(f"ウィンドウなしのエンジンは {', '.join(HEAVY_MODULES)} を読み込みません")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+ベクトル化環境ベンチマーク
+
+同じ対戦相手・同じゲーム数 B で、次の環境が 1 秒あたりに進める env ステップ数
+（1 env ステップ = 行動 1 回 = シミュレーション 40 ステップ、を B ゲーム分数えたもの）を計測します。
+
+    TCGVecEnv         1 プロセスの BatchGame（対戦相手の update はゲームごとに順番に呼ぶ）
+    SubprocTCGVecEnv  BatchGame をワーカープロセス数に分割して並列に実行
+    DummyVecEnv       SB3 の DummyVecEnv で TCGEnv を B 個、1 プロセスで順番に実行
+    SubprocVecEnv     SB3 の SubprocVecEnv で TCGEnv を B 個、1 ゲーム 1 プロセスで実行
+
+行動はマスクで許される手から一様に選びます（学習中の方策の推論時間は含みません）。
+対戦相手は既定では 3 種の混合ですが、環境ごとに選ばれ方が違うため、厳密に比べるときは
+--opponent で 1 種に固定してください。--repeat を指定すると環境を交互に計測し、最良値を表示します。
+どれが速いかはコア数と B で変わるため、学習に使うマシンで計測してから選んでください。
+
+実行方法:
+    cd src
+    uv run python bench_vec_env.py
+    uv run python bench_vec_env.py --envs 64 --steps 200 --workers 8
+    uv run python bench_vec_env.py --only TCGVecEnv DummyVecEnv
+    uv run python bench_vec_env.py --opponent RightFlankExpansionist --repeat 3
+"""
+
+import argparse
+import os
+import time
+from functools import partial
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+from tcg.gym_env import TCGEnv
+from tcg.players.strategy_economist import DefensiveEconomist
+from tcg.players.strategy_expansionist import RapidExpansionist
+from tcg.players.strategy_right_flank import RightFlankExpansionist
+from tcg.vec_env import SubprocTCGVecEnv, TCGVecEnv
+
+# 学習スクリプトと同じく、リセットのたびにこの中から対戦相手を選ぶ
+OPPONENTS = [RightFlankExpansionist, DefensiveEconomist, RapidExpansionist]
+
+
+def make_env(name: str, n_envs: int, workers: int, opponents):
+    if name == "TCGVecEnv":
+        return TCGVecEnv(opponents, n_envs=n_envs, seed=0)
+    if name == "SubprocTCGVecEnv":
+        return SubprocTCGVecEnv(opponents, n_envs=n_envs, workers=workers, seed=0)
+    if name == "DummyVecEnv":
+        return DummyVecEnv([partial(TCGEnv, opponents)] * n_envs)
+    return SubprocVecEnv([partial(TCGEnv, opponents)] * n_envs)
+
+
+def measure(env, steps: int, warmup: int) -> float:
+    """env ステップ / 秒（最初の warmup 回は計測しない）"""
+    rng = np.random.default_rng(0)
+    env.seed(0)
+    env.reset()
+    for i in range(warmup + steps):
+        if i == warmup:
+            start = time.perf_counter()
+        masks = np.array(env.env_method("action_masks"))
+        env.step(np.array([rng.choice(np.flatnonzero(mask)) for mask in masks]))
+    return env.num_envs * steps / (time.perf_counter() - start)
+
+
+def main():
+    names = ("TCGVecEnv", "SubprocTCGVecEnv", "DummyVecEnv", "SubprocVecEnv")
+    parser = argparse.ArgumentParser(description="ベクトル化環境の速度比較")
+    parser.add_argument("--envs", type=int, default=16, help="ゲーム数 B")
+    parser.add_argument("--steps", type=int, default=100, help="計測する env ステップ数")
+    parser.add_argument("--warmup", type=int, default=10, help="計測前に進める env ステップ数")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="SubprocTCGVecEnv のプロセス数"
+    )
+    parser.add_argument("--only", nargs="+", choices=names, default=names, help="計測する環境")
+    parser.add_argument(
+        "--opponent",
+        choices=["mix"] + [cls.__name__ for cls in OPPONENTS],
+        default="mix",
+        help="対戦相手（mix は 3 種から選ぶ）",
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="交互に計測する回数（最良値を表示）")
+    args = parser.parse_args()
+
+    opponents = OPPONENTS
+    if args.opponent != "mix":
+        opponents = next(cls for cls in OPPONENTS if cls.__name__ == args.opponent)
+
+    print(
+        f"B={args.envs}, CPU {os.cpu_count()} コア, SubprocTCGVecEnv {args.workers} プロセス, "
+        f"対戦相手 {args.opponent}"
+    )
+    envs = {}
+    try:
+        for name in args.only:
+            envs[name] = make_env(name, args.envs, args.workers, opponents)
+        rates = {name: [] for name in envs}
+        for _ in range(args.repeat):
+            for name, env in envs.items():
+                rates[name].append(measure(env, args.steps, args.warmup))
+    finally:
+        for env in envs.values():
+            env.close()
+    for name, rate in rates.items():
+        print(f"  {name:<17} {max(rate):8.0f} env ステップ/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+学習済みモデルの NumPy 形式への書き出し
+
+MaskablePPO のチェックポイント (.zip) から行動の決定に使う部分 (actor) の重みだけを取り出し、
+同じ場所に同じ名前の .npz として書き出します。.npz があるとプレイヤーは
+tcg.numpy_policy.NumpyPolicy でプレイし、torch も stable-baselines3 も読み込みません。
+.npz には .zip のハッシュを記録し、.zip が変わった（学習し直した）後は書き出し直すまで使いません。
+
+書き出した後、実際の対戦で記録した観測に対して SB3 の predict と行動が一致するかを確認します
+（torch が必要です）。
+
+実行方法:
+    cd src
+    uv run python export_policy.py                       # 各 PPO プレイヤーの既定のモデル
+    uv run python export_policy.py path/to/model.zip     # 指定したモデル
+    uv run python export_policy.py --games 4 --samples 5000
+    uv run python export_policy.py --corpus corpus.npz   # 記録済みの観測 (obs, mask) で確認
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from tcg.controller import Controller
+from tcg.features import Featurizer
+from tcg.numpy_policy import NumpyPolicy, export, verify
+from tcg.utils import flip_board_view
+
+SRC_DIR = Path(__file__).parent
+PLAYERS_DIR = SRC_DIR / "tcg" / "players"
+
+# 各 PPO プレイヤーが既定で読み込むモデル
+DEFAULT_CHECKPOINTS = (
+    PLAYERS_DIR / "player_kishida_mlppo" / "tcg_ppo_finetuned.zip",
+    PLAYERS_DIR / "player_kishida_counter" / "counter_ml_model_final.zip",
+    SRC_DIR / "defensive_model_960000_steps.zip",
+)
+
+
+class Recorder(Controller):
+    """プレイヤーをそのまま動かしつつ、PPO プレイヤーが見る観測と行動マスクを記録する"""
+
+    def __init__(self, player: Controller, every: int):
+        self.player = player
+        self.every = every
+        self.featurizer = Featurizer()
+        self.steps = 0
+        self.observations = []
+        self.masks = []
+
+    def team_name(self) -> str:
+        return self.player.team_name()
+
+    def update(self, info):
+        if self.steps % self.every == 0:
+            _, state, moving_pawns, _, _ = flip_board_view(info)
+            obs, mask = self.featurizer.encode(state, moving_pawns)
+            self.observations.append(np.array(obs))
+            self.masks.append(np.array(mask, dtype=bool))
+        self.steps += 1
+        return self.player.update(info)
+
+
+def record_corpus(games: int, samples: int) -> tuple[np.ndarray, np.ndarray]:
+    """ルールベースのプレイヤー同士の対戦から、両チームの観測を合計 samples 個まで記録する"""
+    from tcg.game import Game
+    from tcg.players.claude_player import ClaudePlayer
+    from tcg.players.strategy_economist import DefensiveEconomist
+    from tcg.players.strategy_right_flank import RightFlankExpansionist
+
+    opponents = (ClaudePlayer, RightFlankExpansionist, DefensiveEconomist)
+    # 1 試合は最大 50000 ステップ。最後まで続いても両チーム分で samples 個になる間隔で記録する
+    every = max(1, 2 * 50000 * games // max(samples, 1))
+    observations, masks = [], []
+    for game in range(games):
+        red = Recorder(opponents[game % len(opponents)](), every)
+        blue = Recorder(opponents[(game + 1) % len(opponents)](), every)
+        Game(red, blue, window=False).run()
+        for recorder in (red, blue):
+            observations.extend(recorder.observations)
+            masks.extend(recorder.masks)
+    return np.stack(observations), np.stack(masks)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="学習済みモデルを NumPy 形式 (.npz) で書き出します"
+    )
+    parser.add_argument("checkpoints", nargs="*", type=Path, help="書き出すモデル (.zip)")
+    parser.add_argument("--corpus", type=Path, help="確認に使う観測 (obs, mask を含む .npz)")
+    parser.add_argument("--games", type=int, default=2, help="確認用の観測を記録する対戦数")
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=4000,
+        help="記録する観測数の目安 (試合が早く終わると少なくなる)",
+    )
+    parser.add_argument("--no-verify", action="store_true", help="SB3 との一致を確認しない")
+    args = parser.parse_args()
+
+    checkpoints = args.checkpoints or [c for c in DEFAULT_CHECKPOINTS if c.exists()]
+    if not checkpoints:
+        print("書き出すモデルが見つかりません")
+        return
+
+    exported = []
+    for checkpoint in checkpoints:
+        path = export(checkpoint)
+        size = checkpoint.stat().st_size / 1e6 if checkpoint.exists() else float("nan")
+        print(f"{checkpoint} ({size:.1f} MB) -> {path} ({path.stat().st_size / 1e6:.1f} MB)")
+        exported.append((checkpoint, path))
+    if args.no_verify:
+        return
+
+    if args.corpus:
+        with np.load(args.corpus) as data:
+            observations, masks = data["obs"], data["mask"].astype(bool)
+    else:
+        print(f"確認用の観測を {args.games} 試合から記録しています...")
+        observations, masks = record_corpus(args.games, args.samples)
+
+    failed = False
+    for checkpoint, path in exported:
+        result = verify(checkpoint, NumpyPolicy(path), observations, masks)
+        failed |= result["mismatches"] > 0 or result["batch_mismatches"] > 0
+        print(
+            f"{path.name}: 観測 {result['observations']} 個、"
+            f"不一致 {result['mismatches']} (バッチ {result['batch_mismatches']})、"
+            f"上位 2 行動のロジット差の最小値 {result['min_logit_gap']:.2e}"
+        )
+    if failed:
+        print("警告: SB3 と行動が一致しない観測があります")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+試合データベース
+
+リプレイ (.tcgr) を試合データベース（tcg.match_db.MatchDB）に取り込み、検索・集計します。
+試合の情報（プレイヤー・シード・結果・コードのハッシュ）と要塞の占領は SQLite に、
+一定ステップごとの各要塞の持ち主・レベル・部隊数はメモリマップした NumPy の列ファイルに入り、
+集計は再シミュレーションせずにベクトル演算で行います。
+
+SQL で使えるテーブル:
+    matches   1 試合 1 行（blue, red, blue_class, winner, steps, seed, blue_hash など）
+    captures  要塞の持ち主が変わるたびに 1 行（match_id, step, fortress, old_team, new_team）
+    results   1 試合をプレイヤーごとに 2 行（player, opponent, side, outcome = win/loss/draw など）
+
+実行方法:
+    cd src
+    uv run python tournament.py --db matches                  # トーナメントの全試合を追加
+    uv run python match_database.py matches ingest replays/*.tcgr
+    uv run python match_database.py matches summary
+    uv run python match_database.py matches sql "SELECT match_id, seed FROM results
+        WHERE player = 'RightFlank' AND opponent = 'ONCT' AND outcome = 'loss'"
+    uv run python match_database.py matches sql "SELECT match_id, COUNT(*) FROM captures
+        WHERE fortress = 7 GROUP BY match_id HAVING COUNT(*) > 5"
+    uv run python match_database.py matches heatmap --player RightFlank
+    uv run python match_database.py matches captures --player RightFlank --fortress 7
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from tcg.match_db import MatchDB
+
+# ヒートマップ・分布の区間数
+BINS = 10
+
+
+def ingest(db: MatchDB, paths: list[Path]):
+    """リプレイを取り込む（内容が同じリプレイを取り込み済みなら飛ばす）"""
+    before = db.sql("SELECT COUNT(*) FROM matches")[0][0]
+    for i, path in enumerate(paths, 1):
+        db.add_file(path)
+        if i % 100 == 0:
+            print(f"  {i}/{len(paths)}")
+    db.flush()
+    after = db.sql("SELECT COUNT(*) FROM matches")[0][0]
+    print(f"{after - before} 試合を追加しました（合計 {after} 試合）")
+
+
+def summary(db: MatchDB):
+    """プレイヤーごとの成績"""
+    rows = db.sql(
+        "SELECT player, COUNT(*), SUM(outcome = 'win'), SUM(outcome = 'draw'), "
+        "SUM(outcome = 'loss'), AVG(fortresses), AVG(steps) "
+        "FROM results GROUP BY player ORDER BY SUM(outcome = 'win') * 1.0 / COUNT(*) DESC"
+    )
+    print(
+        f"{'プレイヤー':<20} {'試合':>6} {'勝':>6} {'分':>6} {'敗':>6} "
+        f"{'平均要塞数':>10} {'平均ステップ':>12}"
+    )
+    for player, matches, wins, draws, losses, fortresses, steps in rows:
+        print(
+            f"{player:<20} {matches:>6} {wins:>6} {draws:>6} {losses:>6} "
+            f"{fortresses:>10.2f} {steps:>12.0f}"
+        )
+
+
+def print_rows(rows: list[tuple]):
+    for row in rows:
+        print("\t".join(str(value) for value in row))
+    print(f"({len(rows)} 行)")
+
+
+def heatmap(db: MatchDB, match_ids, player: str | None):
+    """試合の進行度ごとに、各要塞を自チーム（player 指定時はそのプレイヤー）が持っていた割合"""
+    shares = db.ownership_heatmap(match_ids, player, BINS)
+    garrison = db.mean_garrison(match_ids, player, BINS)
+    team = player or "Blue"
+    print(f"{team} が持っていた割合（%）／ 平均部隊数。行: 試合の進行度、列: 要塞 0〜11")
+    print("進行度  " + " ".join(f"{fortress:>5}" for fortress in range(shares.shape[2])))
+    for stage in range(BINS):
+        own = " ".join(f"{100 * share:5.0f}" for share in shares[1, stage])
+        print(f"{100 * stage // BINS:>3}%〜  {own}")
+    print("平均部隊数")
+    for stage in range(BINS):
+        print(f"{100 * stage // BINS:>3}%〜  " + " ".join(f"{g:5.1f}" for g in garrison[stage]))
+
+
+def captures(db: MatchDB, match_ids, player: str | None, fortress: int | None):
+    """占領したステップの分布"""
+    steps = db.capture_steps(match_ids, fortress, player)
+    if len(steps) == 0:
+        print("該当する占領はありません")
+        return
+    quantiles = np.percentile(steps, [10, 25, 50, 75, 90])
+    points = ", ".join(f"{q:.0f}" for q in quantiles)
+    print(f"占領 {len(steps)} 回  ステップの 10/25/50/75/90% 点: {points}")
+    counts, edges = np.histogram(steps, bins=BINS)
+    for count, low, high in zip(counts, edges, edges[1:]):
+        print(f"  {low:>7.0f}〜{high:>7.0f}  {count:>6}  {'#' * int(50 * count / counts.max())}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="試合データベースの作成と分析")
+    parser.add_argument("db", type=Path, help="試合データベースのディレクトリ")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("ingest", help="リプレイを取り込む")
+    command.add_argument("replays", nargs="+", type=Path, help="リプレイファイル")
+    commands.add_parser("summary", help="プレイヤーごとの成績")
+    command = commands.add_parser("sql", help="SQL を実行して結果を表示")
+    command.add_argument("query", help="SQL（テーブル: matches, captures, results）")
+    for name, description in (
+        ("heatmap", "要塞の保持率と部隊数"),
+        ("captures", "占領したステップの分布"),
+    ):
+        command = commands.add_parser(name, help=description)
+        command.add_argument("--player", help="このプレイヤーの試合を、このプレイヤーの視点で集計")
+        command.add_argument("--where", help="対象の試合を絞る matches への SQL の条件")
+        if name == "captures":
+            command.add_argument("--fortress", type=int, help="この要塞の占領だけを数える")
+    args = parser.parse_args()
+
+    with MatchDB(args.db) as db:
+        if args.command == "ingest":
+            ingest(db, args.replays)
+        elif args.command == "summary":
+            summary(db)
+        elif args.command == "sql":
+            print_rows(db.sql(args.query))
+        else:
+            match_ids = db.select(args.where) if args.where else None
+            if args.command == "heatmap":
+                heatmap(db, match_ids, args.player)
+            else:
+                captures(db, match_ids, args.player, args.fortress)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+リプレイビューア
+
+tournament.py --replays DIR などで記録した試合のリプレイ (.tcgr) を再生します。
+リプレイには両チームのコマンドと一定間隔のキーフレーム（盤面全体）だけが入っており、
+任意のステップへは直前のキーフレームから再シミュレーションして移動します。
+
+操作:
+    Space       一時停止 / 再開
+    → / ←       1000 ステップ進む / 戻る（Shift で 100 ステップ）
+    ↑ / ↓       再生速度を 2 倍 / 1/2 倍
+    0〜9        試合の 0%〜90% の位置へ移動
+    Home / End  最初 / 最後へ移動
+    Esc         終了
+
+実行方法:
+    cd src
+    uv run python replay_viewer.py replays/match_0001.tcgr
+    uv run python replay_viewer.py replays/match_0001.tcgr --start 12000 --speed 80
+    uv run python replay_viewer.py replays/match_0001.tcgr --info     # ウィンドウなしで概要を表示
+    uv run python replay_viewer.py replays/*.tcgr --verify            # 記録どおり再現できるか確認
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from tcg.config import FPS, SPEEDRATE
+from tcg.replay import Replay, unpack_keyframe
+
+# ←/→ で移動するステップ数（Shift 併用時は SMALL_SEEK）
+SEEK = 1000
+SMALL_SEEK = 100
+
+
+class Frame:
+    """Renderer に渡す 1 フレーム分の盤面（GameState にチーム名と経過時間を添えたもの）"""
+
+    def __init__(self, state, team1: str, team2: str, seconds: int):
+        self.state = state.state
+        self.moving_pawns = state.moving_pawns
+        self.spawning_pawns = state.spawning_pawns
+        self.step = state.step
+        self.Blue_fortress = state.Blue_fortress
+        self.Red_fortress = state.Red_fortress
+        self.team1 = team1
+        self.team2 = team2
+        self.seconds = seconds
+
+
+def describe(path: Path, replay: Replay):
+    """リプレイの概要を表示"""
+    header = replay.header
+    blue, red = header["players"]
+    result = header["result"]
+    print(f"{path}")
+    print(f"  Blue: {blue['team_name']} ({blue['class']})")
+    print(f"  Red : {red['team_name']} ({red['class']})")
+    print(
+        f"  結果: {result['winner']} Win! (Blue: {result['blue_fortresses']}, "
+        f"Red: {result['red_fortresses']}, Steps: {result['steps']})"
+    )
+    print(
+        f"  シード: {header['seed']}  エンジン: {header['engine']}  "
+        f"コマンド: {len(replay.commands)}  キーフレーム: {len(replay.keyframes)}  "
+        f"サイズ: {path.stat().st_size / 1024:.1f} KB"
+    )
+
+
+def verify(replay: Replay) -> list[str]:
+    """最初のキーフレームから最後まで再シミュレーションし、各キーフレームと結果が一致するか確認"""
+    problems = []
+    state = unpack_keyframe(replay.keyframes[0][1])
+    for step, data in replay.keyframes[1:]:
+        replay.advance(state, step)
+        expected = unpack_keyframe(data)
+        if (state.step, state.state, state.rng.getstate()) != (
+            expected.step,
+            expected.state,
+            expected.rng.getstate(),
+        ):
+            problems.append(f"ステップ {step} のキーフレームと一致しません")
+    result = replay.header["result"]
+    if (state.step, state.win_team) != (result["steps"], result["winner"]):
+        problems.append(
+            f"結果が一致しません: {state.win_team} ({state.step} ステップ) / "
+            f"記録 {result['winner']} ({result['steps']} ステップ)"
+        )
+    return problems
+
+
+def view(replay: Replay, start: int, speed: int):
+    """ウィンドウでリプレイを再生する"""
+    import pygame
+
+    from tcg.render import Renderer
+
+    renderer = Renderer()
+    blue, red = (player["team_name"] for player in replay.header["players"])
+    pygame.display.set_caption(f"{blue} vs {red}")
+    last = replay.steps
+    state = replay.state_at(start)
+    paused = False
+
+    def seek(step):
+        return replay.state_at(max(0, min(step, last)))
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                renderer.close()
+                return
+            if event.type != pygame.KEYDOWN:
+                continue
+            shift = event.mod & pygame.KMOD_SHIFT
+            jump = SMALL_SEEK if shift else SEEK
+            if event.key == pygame.K_ESCAPE:
+                renderer.close()
+                return
+            elif event.key == pygame.K_SPACE:
+                paused = not paused
+            elif event.key == pygame.K_RIGHT:
+                state = seek(state.step + jump)
+            elif event.key == pygame.K_LEFT:
+                state = seek(state.step - jump)
+            elif event.key == pygame.K_UP:
+                speed = min(speed * 2, 5000)
+            elif event.key == pygame.K_DOWN:
+                speed = max(speed // 2, 1)
+            elif event.key == pygame.K_HOME:
+                state = seek(0)
+            elif event.key == pygame.K_END:
+                state = seek(last)
+            elif pygame.K_0 <= event.key <= pygame.K_9:
+                state = seek(last * (event.key - pygame.K_0) // 10)
+
+        if not paused and state.step < last:
+            replay.advance(state, state.step + speed)
+        renderer.draw(Frame(state, blue, red, renderer.seconds()))
+        renderer.present(FPS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="試合のリプレイ (.tcgr) を再生します")
+    parser.add_argument("replays", nargs="+", type=Path, help="リプレイファイル")
+    parser.add_argument("--start", type=int, default=0, help="再生を始めるステップ")
+    parser.add_argument(
+        "--speed", type=int, default=int(SPEEDRATE), help="1 フレームで進めるステップ数"
+    )
+    parser.add_argument("--info", action="store_true", help="ウィンドウを開かず概要だけ表示")
+    parser.add_argument(
+        "--verify", action="store_true", help="記録どおりに再現できるか確認（ウィンドウなし）"
+    )
+    args = parser.parse_args()
+
+    if args.info or args.verify:
+        failed = False
+        for path in args.replays:
+            replay = Replay.load(path)
+            describe(path, replay)
+            if args.verify:
+                problems = verify(replay)
+                failed |= bool(problems)
+                for problem in problems:
+                    print(f"  警告: {problem}")
+                if not problems:
+                    print("  再現: OK")
+        sys.exit(1 if failed else 0)
+
+    view(Replay.load(args.replays[0]), args.start, args.speed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""Game class for Fortress Conquest backed by NumPy arrays."""
+
+import numpy as np
+
+from .config import (
+    STEPLIMIT,
+    A_coordinate,
+    fortress_cool,
+    fortress_limit,
+    n_fortress,
+    pos_fortress,
+    swap_number_l,
+)
+from .controller import Controller
+from .game import Game
+from .profiling import StepProfiler
+from .utils import LazyRows
+
+# Pawn speed per kind (pixels per step)
+PAWN_SPEED = (1.5, 1)
+
+# Damage dealt to a hostile fortress per arriving pawn, by kind
+PAWN_DAMAGE = (0.65, 0.95)
+
+# Unit direction per edge; zero for fortresses that are not connected
+DIRECTION = np.zeros((n_fortress, n_fortress, 2), dtype=np.float64)
+for _i in range(n_fortress):
+    for _j in range(n_fortress):
+        if A_coordinate[_i][_j] != 0:
+            DIRECTION[_i, _j] = A_coordinate[_i][_j]
+ADJACENT = np.any(DIRECTION != 0, axis=2)
+
+# Per-step displacement indexed by kind * 144 + from_ * 12 + to
+VELOCITY = np.concatenate([(DIRECTION * speed).reshape(-1, 2) for speed in PAWN_SPEED])
+
+FORTRESS_POS = np.array(pos_fortress, dtype=np.float64)
+# Spawn point of a squad sent along each edge
+SPAWN_POS = FORTRESS_POS[:, None, :] + DIRECTION * 42
+ARRIVAL_RADIUS_SQ = 45**2
+
+FORTRESS_LIMIT = np.array(fortress_limit, dtype=np.float64)
+FORTRESS_COOL = np.array(fortress_cool, dtype=np.int64)
+
+# Team and fortress numbers as seen by team 2
+SWAP_TEAM = np.array([0, 2, 1], dtype=np.int64)
+SWAP_NUMBER = np.array(swap_number_l, dtype=np.int64)
+
+# Steps at which some fortress kind and level can produce a pawn
+_birth = np.zeros(STEPLIMIT + 1, dtype=bool)
+for _cool in np.unique(FORTRESS_COOL):
+    _birth[::_cool] = True
+BIRTH_STEP = _birth.tolist()
+
+
+def _moving_rows(team, kind, from_, to, pos):
+    """``moving_pawns`` rows from snapshots of the pawn arrays."""
+    return [
+        [team, kind, from_, to, pos]
+        for team, kind, from_, to, pos in zip(
+            team.tolist(), kind.tolist(), from_.tolist(), to.tolist(), pos.tolist()
+        )
+    ]
+
+
+def _red_moving_rows(team, kind, from_, to, pos):
+    """Team 2's ``moving_pawns`` rows from snapshots of the pawn arrays."""
+    return _moving_rows(SWAP_TEAM[team], kind, SWAP_NUMBER[from_], SWAP_NUMBER[to], pos)
+
+
+class ArrayGame(Game):
+    """
+    Game with fortresses and pawns stored as structure-of-arrays.
+
+    Pawns in flight are kept in preallocated arrays (team, kind, edge,
+    velocity, target position, position) in departure order, so movement and arrival
+    detection are single vectorized passes. Arrivals are resolved in the
+    same order as ``Game.pawn_arrive`` so outcomes match ``Game`` for the
+    same random seed.
+
+    ``state``, ``moving_pawns`` and ``spawning_pawns`` are exposed as
+    list-shaped views for controllers and rendering. They are refreshed
+    lazily after a change and must be treated as read-only; assigning a
+    list to one of them loads it into the arrays. ``moving_pawns`` is a
+    ``LazyRows`` over copies of the pawn arrays, so its rows are only
+    built if a controller reads them.
+    """
+
+    def __init__(
+        self,
+        controller1: Controller,
+        controller2: Controller,
+        window: bool = True,
+        seed: int | None = None,
+        profiler: StepProfiler | None = None,
+        recorder=None,
+        capacity: int = 1024,
+    ):
+        self._capacity = capacity
+        self._alloc_fortresses()
+        self._alloc_pawns(capacity)
+        super().__init__(controller1, controller2, window, seed, profiler, recorder)
+
+    def _alloc_fortresses(self):
+        self.f_team = np.zeros(n_fortress, dtype=np.int64)
+        self.f_kind = np.zeros(n_fortress, dtype=np.int64)
+        self.f_level = np.zeros(n_fortress, dtype=np.int64)
+        self.f_pawns = np.zeros(n_fortress, dtype=np.float64)
+        self.f_upgrade = np.full(n_fortress, -1, dtype=np.int64)
+        # True once a fortress count has become fractional in Game (int -> float)
+        self.f_float = np.zeros(n_fortress, dtype=bool)
+        self.f_to_set = [[] for _ in range(n_fortress)]
+        self._state_view = [[0, 0, 0, 0, -1, to_set] for to_set in self.f_to_set]
+        # Rows of _state_view that no longer match the arrays
+        self._dirty = set(range(n_fortress))
+        # Fortresses with an upgrade running
+        self._upgrading = set()
+        # Whether an owner changed since the last CheckGameOver
+        self._teams_changed = True
+
+    def _alloc_pawns(self, capacity):
+        self.n_pawns = 0
+        self.p_team = np.zeros(capacity, dtype=np.int64)
+        self.p_kind = np.zeros(capacity, dtype=np.int64)
+        self.p_from = np.zeros(capacity, dtype=np.int64)
+        self.p_to = np.zeros(capacity, dtype=np.int64)
+        self.p_vel = np.zeros((capacity, 2), dtype=np.float64)
+        self.p_target = np.zeros((capacity, 2), dtype=np.float64)
+        self.p_pos = np.zeros((capacity, 2), dtype=np.float64)
+        self._moving_view = None
+
+        # Spawn queue: team, kind, pawn_number, from_, to, pos
+        self.spawn_queue = []
+
+    def _grow_pawns(self, needed):
+        capacity = len(self.p_team)
+        while capacity < needed:
+            capacity *= 2
+        for name in ("p_team", "p_kind", "p_from", "p_to", "p_vel", "p_target", "p_pos"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.n_pawns] = old[: self.n_pawns]
+            setattr(self, name, new)
+
+    # ------------------------------------------------------------------
+    # List-shaped views
+    # ------------------------------------------------------------------
+
+    @property
+    def state(self):
+        """Fortress list ``[team, kind, level, pawn_number, upgrade_time, to_set]``."""
+        dirty = self._dirty
+        if dirty:
+            # Like Game's, the rows are live: only changed fortresses are rewritten
+            team, kind, level = self.f_team, self.f_kind, self.f_level
+            pawns, upgrade, is_float = self.f_pawns, self.f_upgrade, self.f_float
+            if len(dirty) > 4:
+                team, kind, level = team.tolist(), kind.tolist(), level.tolist()
+                pawns, upgrade, is_float = pawns.tolist(), upgrade.tolist(), is_float.tolist()
+            for i in dirty:
+                row = self._state_view[i]
+                row[0] = int(team[i])
+                row[1] = int(kind[i])
+                row[2] = int(level[i])
+                row[3] = float(pawns[i]) if is_float[i] else int(pawns[i])
+                row[4] = int(upgrade[i])
+                row[5] = self.f_to_set[i]
+            dirty.clear()
+        return self._state_view
+
+    @state.setter
+    def state(self, value):
+        for i, (team, kind, level, pawn_number, upgrade_time, to_set) in enumerate(value):
+            self.f_team[i] = team
+            self.f_kind[i] = kind
+            self.f_level[i] = level
+            self.f_pawns[i] = pawn_number
+            self.f_float[i] = isinstance(pawn_number, float)
+            self.f_upgrade[i] = upgrade_time
+            self.f_to_set[i] = to_set
+        self._dirty.update(range(n_fortress))
+        self._upgrading = {i for i, time in enumerate(self.f_upgrade.tolist()) if time != -1}
+        self._teams_changed = True
+
+    @property
+    def moving_pawns(self):
+        """Pawns in flight as ``[team, kind, from_, to, pos]``."""
+        if self._moving_view is None:
+            n = self.n_pawns
+            self._moving_arrays = (
+                self.p_team[:n].copy(),
+                self.p_kind[:n].copy(),
+                self.p_from[:n].copy(),
+                self.p_to[:n].copy(),
+                self.p_pos[:n].copy(),
+            )
+            self._moving_view = LazyRows(n, _moving_rows, *self._moving_arrays)
+            self._red_moving_view = None
+        return self._moving_view
+
+    @moving_pawns.setter
+    def moving_pawns(self, value):
+        self.n_pawns = 0
+        for team, kind, from_, to, pos in value:
+            self._push_pawn(team, kind, from_, to, pos[0], pos[1])
+        self._moving_view = None
+
+    def flip_board_view(self, info):
+        """Flip board view so controller2 sees itself as team 1."""
+        flipped = super().flip_board_view(info)
+        if info[0] == 2 and info[2] is self._moving_view:
+            # Mirror the pawn arrays rather than rows built for team 1
+            if self._red_moving_view is None:
+                team, kind, from_, to, pos = self._moving_arrays
+                self._red_moving_view = LazyRows(
+                    len(team), _red_moving_rows, team, kind, from_, to, pos
+                )
+            flipped[2] = self._red_moving_view
+        return flipped
+
+    @property
+    def spawning_pawns(self):
+        """Spawn points as ``[team, kind, pawn_number, from_, to, pos]``."""
+        # The queue is only a handful of entries, so it is kept as lists
+        return self.spawn_queue
+
+    @spawning_pawns.setter
+    def spawning_pawns(self, value):
+        self.spawn_queue = [list(s) for s in value]
+
+    def _push_pawn(self, team, kind, from_, to, x, y):
+        i = self.n_pawns
+        if i >= len(self.p_team):
+            self._grow_pawns(i + 1)
+        self.p_team[i] = team
+        self.p_kind[i] = kind
+        self.p_from[i] = from_
+        self.p_to[i] = to
+        self.p_vel[i] = VELOCITY[kind * 144 + from_ * 12 + to]
+        self.p_target[i] = FORTRESS_POS[to]
+        self.p_pos[i, 0] = x
+        self.p_pos[i, 1] = y
+        self.n_pawns = i + 1
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+
+    def pawn_born(self):
+        """Pawns regenerate over time."""
+        if not BIRTH_STEP[self.step]:
+            return
+        cool = FORTRESS_COOL[self.f_kind, self.f_level]
+        limit = FORTRESS_LIMIT[self.f_level]
+        born = (self.step % cool == 0) & (self.f_pawns < limit)
+        if not born.any():
+            return
+        self.f_pawns[born] += 1
+        capped = born & (self.f_pawns > limit)
+        self.f_pawns[capped] = limit[capped]
+        self.f_float[capped] = False
+        self._dirty.update(np.flatnonzero(born).tolist())
+
+    def pawn_over(self):
+        """Remove pawns exceeding fortress limit."""
+        if self.step % 40 != 0:
+            return
+        over = self.f_pawns > FORTRESS_LIMIT[self.f_level]
+        if over.any():
+            self.f_pawns[over] -= 1
+            self._dirty.update(np.flatnonzero(over).tolist())
+
+    def deliver(self, team, from_, to):
+        """Create spawn point for pawns."""
+        if team == self.f_team[from_] and self.f_pawns[from_] >= 2:
+            if not ADJACENT[from_, to]:
+                return 0
+            pawn_number = float(self.f_pawns[from_] // 2)
+            if not self.f_float[from_]:
+                pawn_number = int(pawn_number)
+            pos = SPAWN_POS[from_, to].tolist()
+            self.spawn_queue.append([team, int(self.f_kind[from_]), pawn_number, from_, to, pos])
+            self.f_pawns[from_] -= pawn_number
+            self._dirty.add(from_)
+
+    def upgrade(self, team, subject):
+        """Start fortress upgrade."""
+        level = self.f_level[subject]
+        if (
+            team == self.f_team[subject]
+            and self.f_pawns[subject] >= fortress_limit[level] // 2
+            and self.f_upgrade[subject] == -1
+            and 1 <= level <= 4
+        ):
+            self.f_upgrade[subject] = 200
+            self.f_pawns[subject] -= fortress_limit[level] // 2
+            self._dirty.add(subject)
+            self._upgrading.add(subject)
+
+    def check_upgrade(self):
+        """Check if fortress upgrade is complete."""
+        if not self._upgrading:
+            return
+        f_upgrade = self.f_upgrade
+        self._dirty.update(self._upgrading)
+        for i in list(self._upgrading):
+            if f_upgrade[i] == 0:
+                f_upgrade[i] = -1
+                self.f_level[i] += 1
+                self._upgrading.discard(i)
+            else:
+                f_upgrade[i] -= 1
+
+    def pawn_departure(self):
+        """Pawns depart from spawn points."""
+        if not self.spawn_queue:
+            return
+        for spawn in self.spawn_queue:
+            team, kind, pawn_number, from_, to, pos = spawn
+            r = self.rng.random() - 0.5
+            if pawn_number > 0 and (
+                (kind == 0 and self.step % 7 == 0) or (kind == 1 and self.step % 10 == 0)
+            ):
+                direction = A_coordinate[from_][to]
+                self._push_pawn(
+                    team,
+                    kind,
+                    from_,
+                    to,
+                    pos[0] + direction[1] * r * 10,
+                    pos[1] + direction[0] * -1 * r * 10,
+                )
+                spawn[2] -= 1
+                self._moving_view = None
+
+        for i in range(len(self.spawn_queue)):
+            if self.spawn_queue[i][2] <= 0:
+                del self.spawn_queue[i]
+                break
+
+    def pawn_move(self):
+        """Move pawns towards target fortress."""
+        n = self.n_pawns
+        if n == 0:
+            return
+        pos = self.p_pos[:n]
+        pos += self.p_vel[:n]
+        self._moving_view = None
+
+        offset = self.p_target[:n] - pos
+        offset *= offset
+        dist_sq = offset.sum(axis=1)
+        if dist_sq.min() > ARRIVAL_RADIUS_SQ:
+            return
+        arrived = dist_sq <= ARRIVAL_RADIUS_SQ
+
+        idx = np.flatnonzero(arrived)
+        self.pawn_arrive(
+            self.p_team[idx].tolist(), self.p_kind[idx].tolist(), self.p_to[idx].tolist()
+        )
+
+        keep = ~arrived
+        m = n - len(idx)
+        for name in ("p_team", "p_kind", "p_from", "p_to", "p_vel", "p_target", "p_pos"):
+            arr = getattr(self, name)
+            arr[:m] = arr[:n][keep]
+        self.n_pawns = m
+
+    def pawn_arrive(self, teams, kinds, targets):
+        """Handle pawn arrivals at fortresses, in departure order."""
+        f_team = self.f_team
+        f_pawns = self.f_pawns
+        self._dirty.update(targets)
+        for team, kind, to in zip(teams, kinds, targets):
+            if team == f_team[to]:
+                f_pawns[to] += 1
+            else:
+                f_pawns[to] -= PAWN_DAMAGE[kind]
+                self.f_float[to] = True
+                if f_pawns[to] < 0:
+                    f_team[to] = team
+                    self._teams_changed = True
+                    self.f_level[to] = 1
+                    f_pawns[to] = 0
+                    self.f_float[to] = False
+                    self.f_upgrade[to] = -1
+                    self._upgrading.discard(to)
+
+    def CheckGameOver(self):
+        """Check if game is over."""
+        if self._teams_changed:
+            self.Blue_fortress = int(np.count_nonzero(self.f_team == 1))
+            self.Red_fortress = int(np.count_nonzero(self.f_team == 2))
+            self._teams_changed = False
+
+        if self.Red_fortress == self.Blue_fortress:
+            self.win_team = "Both"
+        elif self.Red_fortress > self.Blue_fortress:
+            self.win_team = "Red"
+        else:
+            self.win_team = "Blue"
+
+        return self.Red_fortress == 0 or self.Blue_fortress == 0
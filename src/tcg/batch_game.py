@@ -0,0 +1,625 @@
+"""Batched engine that steps many Fortress Conquest games in lockstep."""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+from .array_game import (
+    ADJACENT,
+    ARRIVAL_RADIUS_SQ,
+    DIRECTION,
+    FORTRESS_COOL,
+    FORTRESS_LIMIT,
+    FORTRESS_POS,
+    PAWN_DAMAGE,
+    SPAWN_POS,
+    VELOCITY,
+)
+from .cadence import ATTACK, CAPTURE, UPGRADE, check_events
+from .config import STEPLIMIT, initial_state, n_fortress, swap_number_l
+
+SWAP = np.array(swap_number_l)
+DAMAGE = np.array(PAWN_DAMAGE, dtype=np.float64)
+# Steps between two departures from a spawn point, by kind
+DEPARTURE_INTERVAL = np.array([7, 10])
+
+INITIAL_TEAM = np.array([s[0] for s in initial_state])
+INITIAL_KIND = np.array([s[1] for s in initial_state])
+INITIAL_LEVEL = np.array([s[2] for s in initial_state])
+INITIAL_PAWNS = np.array([s[3] for s in initial_state], dtype=np.float64)
+NEIGHBORS = [list(s[5]) for s in initial_state]
+
+PAWN_FIELDS = ("p_team", "p_kind", "p_from", "p_to", "p_vel", "p_target", "p_pos")
+SPAWN_FIELDS = ("s_team", "s_kind", "s_count", "s_float", "s_from", "s_to", "s_pos")
+# Team and fortress numbers as seen by each side, indexed by team - 1
+TEAM_MAP = ([0, 1, 2], [0, 2, 1])
+FORT_MAP = (list(range(n_fortress)), swap_number_l)
+
+
+class _LiveRows(Sequence):
+    """
+    One game's pawn or spawn list, seen by one side, read from the live arrays.
+
+    The rows are built by ``build(game, team)`` on the first read after the
+    arrays changed and reused until they change again, so a list that no
+    controller reads costs nothing.
+    """
+
+    __slots__ = ("_engine", "_build", "_counts", "_game", "_team", "_epoch", "_rows")
+
+    def __init__(self, engine, build, counts, game, team):
+        self._engine = engine
+        self._build = build
+        self._counts = counts
+        self._game = game
+        self._team = team
+        self._epoch = -1
+        self._rows = None
+
+    def _materialize(self):
+        if self._epoch != self._engine._epoch:
+            self._rows = self._build(self._game, self._team)
+            self._epoch = self._engine._epoch
+        return self._rows
+
+    def __len__(self):
+        return int(self._counts[self._game])
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(self._materialize())
+
+
+class BatchGame:
+    """
+    ``n_games`` independent games stored as batched arrays.
+
+    Fortress arrays have shape (B, 12). Pawns in flight and spawn points
+    live in padded (B, P) / (B, S) tensors with a per-game fill count, kept
+    in departure order. ``process_step`` advances every active game by one
+    simulation step with the same phase order as ``GymGame.process_step``.
+
+    Each side is driven either by a (B, 3) command array (e.g. a policy
+    acting for every game at once) or by one ``Controller`` per game, which
+    receives the usual list-shaped ``info`` (flipped for team 2).
+
+    Differences from ``GymGame``: the departure jitter is drawn from the
+    engine's own ``numpy`` generator, and exhausted spawn points are dropped
+    immediately instead of one per step.
+    """
+
+    def __init__(self, n_games: int, capacity: int = 256, seed=None):
+        self.n_games = n_games
+        self._games = np.arange(n_games)
+        self.rng = np.random.default_rng(seed)
+
+        shape = (n_games, n_fortress)
+        self.team = np.zeros(shape, dtype=np.int64)
+        self.kind = np.zeros(shape, dtype=np.int64)
+        self.level = np.zeros(shape, dtype=np.int64)
+        self.pawns = np.zeros(shape, dtype=np.float64)
+        self.upgrade_time = np.full(shape, -1, dtype=np.int64)
+        # Mirrors Game, where a count turns into a float once it takes damage
+        self.pawns_float = np.zeros(shape, dtype=bool)
+
+        self.step = np.zeros(n_games, dtype=np.int64)
+        # Step at which each game's controllers are consulted next, per team
+        self.wake = np.zeros((n_games, 2), dtype=np.int64)
+        # Each controller's last command, in board coordinates (Controller.repeat_command)
+        self.last = np.zeros((n_games, 2, 3), dtype=np.int64)
+        # Board at each watching controller's last decision (Controller.wake_events)
+        self.seen_team = np.zeros((n_games, 2, n_fortress), dtype=np.int64)
+        self.seen_level = np.zeros((n_games, 2, n_fortress), dtype=np.int64)
+        self.seen_attacks = np.zeros((n_games, 2, n_fortress * n_fortress), dtype=bool)
+        self.done = np.zeros(n_games, dtype=bool)
+        self.game_over_loop = np.zeros(n_games, dtype=bool)
+
+        self.n_pawns = np.zeros(n_games, dtype=np.int64)
+        self.p_team = np.zeros((n_games, capacity), dtype=np.int64)
+        self.p_kind = np.zeros((n_games, capacity), dtype=np.int64)
+        self.p_from = np.zeros((n_games, capacity), dtype=np.int64)
+        self.p_to = np.zeros((n_games, capacity), dtype=np.int64)
+        self.p_vel = np.zeros((n_games, capacity, 2), dtype=np.float64)
+        self.p_target = np.zeros((n_games, capacity, 2), dtype=np.float64)
+        self.p_pos = np.zeros((n_games, capacity, 2), dtype=np.float64)
+
+        spawn_capacity = 16
+        self.n_spawns = np.zeros(n_games, dtype=np.int64)
+        self.s_team = np.zeros((n_games, spawn_capacity), dtype=np.int64)
+        self.s_kind = np.zeros((n_games, spawn_capacity), dtype=np.int64)
+        self.s_count = np.zeros((n_games, spawn_capacity), dtype=np.float64)
+        self.s_float = np.zeros((n_games, spawn_capacity), dtype=bool)
+        self.s_from = np.zeros((n_games, spawn_capacity), dtype=np.int64)
+        self.s_to = np.zeros((n_games, spawn_capacity), dtype=np.int64)
+        self.s_pos = np.zeros((n_games, spawn_capacity, 2), dtype=np.float64)
+
+        # List-shaped state handed to controllers, per side and game. Like
+        # ArrayGame's, the rows are live and only the changed ones are rewritten.
+        self._state_rows = [
+            [[[0, 0, 0, 0, -1, to_set] for to_set in NEIGHBORS] for _ in range(n_games)]
+            for _ in range(2)
+        ]
+        # Fortresses whose row no longer matches the arrays, per side
+        self._dirty = np.ones((2, n_games, n_fortress), dtype=bool)
+        # Pawn and spawn lists per side and game, rebuilt when _epoch moves on
+        self._moving_views = [
+            [_LiveRows(self, self._moving_rows, self.n_pawns, b, team) for b in range(n_games)]
+            for team in (1, 2)
+        ]
+        self._spawning_views = [
+            [_LiveRows(self, self._spawning_rows, self.n_spawns, b, team) for b in range(n_games)]
+            for team in (1, 2)
+        ]
+        # Bumped before the pawn or spawn arrays change
+        self._epoch = 0
+
+        self.reset_games(np.ones(n_games, dtype=bool))
+
+    def reset_games(self, mask):
+        """Put the games selected by ``mask`` back to the initial position."""
+        self.team[mask] = INITIAL_TEAM
+        self.kind[mask] = INITIAL_KIND
+        self.level[mask] = INITIAL_LEVEL
+        self.pawns[mask] = INITIAL_PAWNS
+        self.upgrade_time[mask] = -1
+        self.pawns_float[mask] = False
+        self.step[mask] = 0
+        self.wake[mask] = 0
+        self.last[mask] = 0
+        self.done[mask] = False
+        self.game_over_loop[mask] = False
+        self.n_pawns[mask] = 0
+        self.n_spawns[mask] = 0
+        self._dirty[:, mask] = True
+        self._epoch += 1
+
+    @property
+    def finished(self):
+        """Games whose next ``process_step`` would not advance."""
+        return self.done | self.game_over_loop | (self.step >= STEPLIMIT)
+
+    def fortress_counts(self):
+        """Return (blue, red) fortress counts per game."""
+        return (self.team == 1).sum(axis=1), (self.team == 2).sum(axis=1)
+
+    def winner(self):
+        """Winning team per game: 1 (Blue), 2 (Red) or 0 (Both)."""
+        blue, red = self.fortress_counts()
+        return np.where(blue > red, 1, np.where(red > blue, 2, 0))
+
+    # ------------------------------------------------------------------
+    # List-shaped info for controllers
+    # ------------------------------------------------------------------
+
+    def info(self, game: int, team: int = 1):
+        """Build the ``[team, state, moving_pawns, spawning_pawns, done]`` list for one game."""
+        return self.infos([game], team)[0]
+
+    def infos(self, games, team: int = 1):
+        """
+        Build list-shaped ``info`` for several games, seen from ``team``.
+
+        Like ``Game``'s, the lists are live and must be treated as read-only:
+        ``state`` is the same list for a game and side on every call, with
+        only the rows of changed fortresses rewritten, and the pawn and spawn
+        lists are views that read the arrays when first accessed after a step.
+        """
+        side = team - 1
+        games = np.asarray(games, dtype=np.int64)
+        dirty = self._dirty[side]
+        i, f = np.nonzero(dirty[games])
+        if len(i):
+            b = games[i]
+            dirty[b, f] = False
+            team_map, fort_map, rows = TEAM_MAP[side], FORT_MAP[side], self._state_rows[side]
+            for g, fort, t, k, lv, p, fl, u in zip(
+                b.tolist(),
+                f.tolist(),
+                self.team[b, f].tolist(),
+                self.kind[b, f].tolist(),
+                self.level[b, f].tolist(),
+                self.pawns[b, f].tolist(),
+                self.pawns_float[b, f].tolist(),
+                self.upgrade_time[b, f].tolist(),
+            ):
+                row = rows[g][fort_map[fort]]
+                row[0] = team_map[t]
+                row[1] = k
+                row[2] = lv
+                row[3] = p if fl else int(p)
+                row[4] = u
+
+        rows = self._state_rows[side]
+        moving, spawning = self._moving_views[side], self._spawning_views[side]
+        return [
+            [1, rows[b], moving[b], spawning[b], done]
+            for b, done in zip(games.tolist(), self.done[games].tolist())
+        ]
+
+    def _moving_rows(self, b, team):
+        n = self.n_pawns[b]
+        team_map, fort_map = TEAM_MAP[team - 1], FORT_MAP[team - 1]
+        teams, kinds, froms, tos, positions = (
+            getattr(self, name)[b, :n].tolist()
+            for name in ("p_team", "p_kind", "p_from", "p_to", "p_pos")
+        )
+        return [
+            [team_map[t], k, fort_map[f], fort_map[to], pos]
+            for t, k, f, to, pos in zip(teams, kinds, froms, tos, positions)
+        ]
+
+    def _spawning_rows(self, b, team):
+        m = self.n_spawns[b]
+        team_map, fort_map = TEAM_MAP[team - 1], FORT_MAP[team - 1]
+        teams, kinds, counts, is_float, froms, tos, positions = (
+            getattr(self, name)[b, :m].tolist() for name in SPAWN_FIELDS
+        )
+        return [
+            [team_map[t], k, c if fl else int(c), fort_map[f], fort_map[to], pos]
+            for t, k, c, fl, f, to, pos in zip(
+                teams, kinds, counts, is_float, froms, tos, positions
+            )
+        ]
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+
+    def process_step(self, team_1, team_2, active=None):
+        """
+        Execute one simulation step in every active game.
+
+        Args:
+            team_1: (B, 3) int array of ``(command, subject, to)`` or one
+                Controller per game, playing team 1 (Blue)
+            team_2: same for team 2 (Red); controllers see the flipped view
+            active: optional (B,) bool mask of games to advance
+
+        Returns:
+            (B,) bool mask of games that advanced; the batched equivalent of
+            the return value of ``GymGame.process_step``.
+        """
+        advancing = ~self.finished
+        if active is not None:
+            advancing &= active
+        if not advancing.any():
+            return advancing
+
+        self._epoch += 1
+        self.pawn_move(advancing)
+        blue, red = self.fortress_counts()
+        wiped = (blue == 0) | (red == 0)
+        over = wiped | (self.step == STEPLIMIT - 1)
+        np.copyto(self.done, over, where=advancing)
+
+        commands_1 = self._commands(team_1, 1, advancing)
+        commands_2 = self._commands(team_2, 2, advancing)
+        self._epoch += 1
+
+        self.order(1, commands_1, advancing)
+        self.order(2, commands_2, advancing)
+
+        self.pawn_departure(advancing)
+        self.pawn_born(advancing)
+        over_tick = advancing & (self.step % 40 == 0)
+        if over_tick.any():
+            self.pawn_over(over_tick)
+        if (self.upgrade_time[advancing] != -1).any():
+            self.check_upgrade(advancing)
+
+        self.step += advancing
+
+        # Owners only change on arrival, so the counts taken after pawn_move still hold
+        self.game_over_loop |= wiped & advancing
+        return advancing
+
+    def _commands(self, player, team, active):
+        """Collect (B, 3) commands for ``team`` from an array or per-game controllers."""
+        if isinstance(player, np.ndarray):
+            return player
+        side = team - 1
+        commands = np.zeros((self.n_games, 3), dtype=np.int64)
+        # Idle controllers (Controller.idle_steps) play (0, 0, 0), or their last command,
+        # without being asked, unless one of their wake_events happened (tcg.cadence)
+        due = active & (self.step >= self.wake[:, side])
+        waiting = np.flatnonzero(active & ~due).tolist()
+        if waiting:
+            woken = self._woken(player, team, waiting)
+            for b in waiting:
+                if b in woken:
+                    due[b] = True
+                elif player[b].repeat_command:
+                    commands[b] = self.last[b, side]
+        games = np.flatnonzero(due)
+        if not len(games):
+            return commands
+        # (command, subject, to, idle_steps) per game, flat: one array conversion for all
+        replies = []
+        for b, info in zip(games.tolist(), self.infos(games, team)):
+            command, subject, to = player[b].update(info)
+            replies += command, subject, to, player[b].idle_steps()
+        replies = np.array(replies, dtype=np.int64).reshape(-1, 4)
+        if team == 2:
+            # Convert controller2's commands back to original perspective
+            replies[:, 1:3] = SWAP[replies[:, 1:3]]
+        commands[games] = replies[:, :3]
+        self.last[games, side] = replies[:, :3]
+        self.wake[games, side] = self.step[games] + 1 + replies[:, 3]
+        watchers = [b for b in games.tolist() if player[b].wake_events]
+        if watchers:
+            rows = np.array(watchers)
+            self.seen_team[rows, side] = self.team[rows]
+            self.seen_level[rows, side] = self.level[rows]
+            self.seen_attacks[rows, side] = self._attacks(team, rows)
+        return commands
+
+    def _attacks(self, team, rows):
+        """
+        (len(rows), 144) mask of the routes ``from * 12 + to`` on which the
+        enemy of ``team`` has a spawn point toward one of its fortresses.
+        """
+        to = self.s_to[rows]
+        spawning = np.arange(to.shape[1]) < self.n_spawns[rows, None]
+        toward = np.take_along_axis(self.team[rows], to, axis=1) == team
+        i, s = np.nonzero(spawning & (self.s_team[rows] != team) & toward)
+        attacks = np.zeros((len(rows), n_fortress * n_fortress), dtype=bool)
+        attacks[i, self.s_from[rows][i, s] * n_fortress + to[i, s]] = True
+        return attacks
+
+    def _woken(self, player, team, waiting) -> set:
+        """Games among ``waiting`` whose controller for ``team`` is woken by one of its events."""
+        watchers = [b for b in waiting if player[b].wake_events]
+        if not watchers:
+            return set()
+        side = team - 1
+        rows = np.array(watchers)
+        owners, seen_owners = self.team[rows], self.seen_team[rows, side]
+        captured = (owners != seen_owners).any(axis=1)
+        levels, seen_levels = self.level[rows], self.seen_level[rows, side]
+        upgraded = ((owners == team) & (owners == seen_owners) & (levels > seen_levels)).any(axis=1)
+        attacked = (self._attacks(team, rows) & ~self.seen_attacks[rows, side]).any(axis=1)
+        woken = set()
+        for b, capture, upgrade, attack in zip(
+            watchers, captured.tolist(), upgraded.tolist(), attacked.tolist()
+        ):
+            events = check_events(player[b])
+            if (
+                (capture and CAPTURE in events)
+                or (upgrade and UPGRADE in events)
+                or (attack and ATTACK in events)
+            ):
+                woken.add(b)
+        return woken
+
+    def order(self, team, commands, active):
+        """Apply one command per game for ``team``."""
+        commands = np.asarray(commands)
+        command, subject, to = commands[:, 0], commands[:, 1], commands[:, 2]
+        deliver, upgrade = active & (command == 1), active & (command == 2)
+        if deliver.any():
+            self.deliver(team, subject, to, deliver)
+        if upgrade.any():
+            self.upgrade(team, subject, upgrade)
+
+    def deliver(self, team, subject, to, mask):
+        """Create spawn points for the games selected by ``mask``."""
+        games = self._games
+        ok = (
+            mask
+            & (self.team[games, subject] == team)
+            & (self.pawns[games, subject] >= 2)
+            & ADJACENT[subject, to]
+        )
+        if not ok.any():
+            return
+        b = np.flatnonzero(ok)
+        src, dst = subject[b], to[b]
+        self._reserve_spawns(self.n_spawns[b].max() + 1)
+
+        slot = self.n_spawns[b]
+        count = self.pawns[b, src] // 2
+        self.s_team[b, slot] = team
+        self.s_kind[b, slot] = self.kind[b, src]
+        self.s_count[b, slot] = count
+        self.s_float[b, slot] = self.pawns_float[b, src]
+        self.s_from[b, slot] = src
+        self.s_to[b, slot] = dst
+        self.s_pos[b, slot] = SPAWN_POS[src, dst]
+        self.n_spawns[b] += 1
+        self.pawns[b, src] -= count
+        self._dirty[:, b, src] = True
+
+    def upgrade(self, team, subject, mask):
+        """Start fortress upgrades for the games selected by ``mask``."""
+        games = self._games
+        level = self.level[games, subject]
+        cost = FORTRESS_LIMIT[level] // 2
+        ok = (
+            mask
+            & (self.team[games, subject] == team)
+            & (self.pawns[games, subject] >= cost)
+            & (self.upgrade_time[games, subject] == -1)
+            & (level >= 1)
+            & (level <= 4)
+        )
+        b = np.flatnonzero(ok)
+        self.upgrade_time[b, subject[b]] = 200
+        self.pawns[b, subject[b]] -= cost[b]
+        self._dirty[:, b, subject[b]] = True
+
+    def pawn_born(self, active):
+        """Pawns regenerate over time."""
+        cool = FORTRESS_COOL[self.kind, self.level]
+        limit = FORTRESS_LIMIT[self.level]
+        born = active[:, None] & (self.step[:, None] % cool == 0) & (self.pawns < limit)
+        self.pawns += born
+        capped = born & (self.pawns > limit)
+        if capped.any():
+            self.pawns[capped] = limit[capped]
+            self.pawns_float[capped] = False
+        self._dirty |= born
+
+    def pawn_over(self, active):
+        """Remove pawns exceeding fortress limit."""
+        over = active[:, None] & (self.pawns > FORTRESS_LIMIT[self.level])
+        self.pawns[over] -= 1
+        self._dirty |= over
+
+    def check_upgrade(self, active):
+        """Check if fortress upgrades are complete."""
+        upgrading = active[:, None] & (self.upgrade_time > 0)
+        finished = active[:, None] & (self.upgrade_time == 0)
+        self.upgrade_time[upgrading] -= 1
+        self.upgrade_time[finished] = -1
+        self.level[finished] += 1
+        self._dirty |= upgrading | finished
+
+    def pawn_departure(self, active):
+        """Pawns depart from spawn points."""
+        width = int(self.n_spawns[active].max(initial=0))
+        if width == 0:
+            return
+        live = active[:, None] & (np.arange(width) < self.n_spawns[:, None])
+        tick = self.step[:, None] % DEPARTURE_INTERVAL[self.s_kind[:, :width]] == 0
+        emit = live & tick & (self.s_count[:, :width] > 0)
+
+        if emit.any():
+            per_game = emit.sum(axis=1)
+            self._reserve_pawns((self.n_pawns + per_game).max())
+            b, s = np.nonzero(emit)
+            slot = self.n_pawns[b] + (np.cumsum(emit, axis=1) - 1)[b, s]
+
+            src, dst = self.s_from[b, s], self.s_to[b, s]
+            r = self.rng.random(len(b)) - 0.5
+            direction = DIRECTION[src, dst]
+            self.p_team[b, slot] = self.s_team[b, s]
+            self.p_kind[b, slot] = self.s_kind[b, s]
+            self.p_from[b, slot] = src
+            self.p_to[b, slot] = dst
+            self.p_vel[b, slot] = VELOCITY[self.s_kind[b, s] * 144 + src * 12 + dst]
+            self.p_target[b, slot] = FORTRESS_POS[dst]
+            self.p_pos[b, slot, 0] = self.s_pos[b, s, 0] + direction[:, 1] * r * 10
+            self.p_pos[b, slot, 1] = self.s_pos[b, s, 1] + direction[:, 0] * -1 * r * 10
+            self.n_pawns += per_game
+            self.s_count[b, s] -= 1
+
+        exhausted = live & (self.s_count[:, :width] <= 0)
+        if exhausted.any():
+            self._compact(SPAWN_FIELDS, self.n_spawns, live & ~exhausted, exhausted.any(axis=1))
+
+    def pawn_move(self, active):
+        """Move pawns towards their target fortress and resolve arrivals."""
+        width = int(self.n_pawns[active].max(initial=0))
+        if width == 0:
+            return
+        # Work on the padded block; dead slots move by zero and never arrive
+        live = active[:, None] & (np.arange(width) < self.n_pawns[:, None])
+        pos = self.p_pos[:, :width]
+        pos += self.p_vel[:, :width] * live[:, :, None]
+        offset = self.p_target[:, :width] - pos
+        dist_sq = (offset * offset).sum(axis=2)
+
+        arrived = live & (dist_sq <= ARRIVAL_RADIUS_SQ)
+        if not arrived.any():
+            return
+        b, slot = np.nonzero(arrived)
+        self.pawn_arrive(b, slot)
+        self._compact(PAWN_FIELDS, self.n_pawns, live & ~arrived, arrived.any(axis=1))
+
+    def pawn_arrive(self, b, slot):
+        """
+        Handle pawn arrivals given as (game, slot) pairs in departure order.
+
+        Fortresses hit by a single team without changing hands are resolved
+        with ordered ``ufunc.at`` updates. Fortresses that are captured or hit
+        by both teams in the same step are replayed pawn by pawn.
+        """
+        teams = self.p_team[b, slot]
+        kinds = self.p_kind[b, slot]
+        key = b * n_fortress + self.p_to[b, slot]
+
+        team_flat = self.team.reshape(-1)
+        pawns_flat = self.pawns.reshape(-1)
+        float_flat = self.pawns_float.reshape(-1)
+        n_keys = len(team_flat)
+        self._dirty.reshape(2, n_keys)[:, key] = True
+
+        blue = np.bincount(key, weights=teams == 1, minlength=n_keys)
+        red = np.bincount(key, weights=teams == 2, minlength=n_keys)
+        slow = (blue > 0) & (red > 0)
+
+        fast = ~slow[key]
+        friendly = teams == team_flat[key]
+        np.add.at(pawns_flat, key[fast & friendly], 1)
+
+        hostile = fast & ~friendly
+        if hostile.any():
+            hit = key[hostile]
+            tentative = pawns_flat.copy()
+            np.subtract.at(tentative, hit, DAMAGE[kinds[hostile]])
+            captured = tentative < 0
+            held = np.unique(hit[~captured[hit]])
+            pawns_flat[held] = tentative[held]
+            float_flat[held] = True
+            slow |= captured
+
+        replay = slow[key]
+        if not replay.any():
+            return
+        level_flat = self.level.reshape(-1)
+        upgrade_flat = self.upgrade_time.reshape(-1)
+        for k, team, kind in zip(
+            key[replay].tolist(), teams[replay].tolist(), kinds[replay].tolist()
+        ):
+            if team == team_flat[k]:
+                pawns_flat[k] += 1
+            else:
+                pawns_flat[k] -= PAWN_DAMAGE[kind]
+                float_flat[k] = True
+                if pawns_flat[k] < 0:
+                    team_flat[k] = team
+                    level_flat[k] = 1
+                    pawns_flat[k] = 0
+                    float_flat[k] = False
+                    upgrade_flat[k] = -1
+
+    # ------------------------------------------------------------------
+    # Padded storage
+    # ------------------------------------------------------------------
+
+    def _compact(self, fields, counts, keep, rows):
+        """Stable-compact the kept entries of ``rows`` to the front."""
+        rows = np.flatnonzero(rows)
+        width = keep.shape[1]
+        order = np.argsort(~keep[rows], axis=1, kind="stable")
+        source = rows[:, None]
+        for name in fields:
+            arr = getattr(self, name)
+            arr[rows, :width] = arr[source, order]
+        counts[rows] = keep[rows].sum(axis=1)
+
+    def _reserve_pawns(self, needed):
+        self._reserve(PAWN_FIELDS, needed)
+
+    def _reserve_spawns(self, needed):
+        self._reserve(SPAWN_FIELDS, needed)
+
+    def _reserve(self, fields, needed):
+        capacity = getattr(self, fields[0]).shape[1]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in fields:
+            old = getattr(self, name)
+            new = np.zeros((old.shape[0], capacity) + old.shape[2:], dtype=old.dtype)
+            new[:, : old.shape[1]] = old
+            setattr(self, name, new)
@@ -0,0 +1,164 @@
+"""
+Derived facts about one player's view of the board, computed once per step.
+
+Heuristic controllers all start their ``update`` by deriving the same facts
+from ``info``: which fortresses are whose, how many enemies border each
+one, which fortresses hostile pawns are heading for, which side of the map
+is home. ``analyze(info)`` returns a ``BoardAnalysis`` holding those facts
+as lazily computed attributes, so each is derived only if some caller
+asks for it, and only once however many callers ask.
+
+The engines build a fresh ``info`` list for every ``update`` call, so
+``analyze`` memoizes on the identity of that list: every component of a
+player (a wrapped policy, a searcher, the player itself) that looks at the
+same ``info`` shares one analysis, and the next step's ``info`` starts a
+new one. The two players of a match see different views and so never
+share an analysis.
+
+Like the players, the analysis reads ``info`` from team 1's point of view:
+``1`` is the caller, ``2`` the opponent, ``0`` neutral.
+"""
+
+from functools import cached_property
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+from .config import initial_state, n_fortress
+
+# Fortresses each fortress can send pawns to (the same in both players' views)
+NEIGHBOURS = tuple(tuple(row[5]) for row in initial_state)
+# Home rows of the map, as the strategy players tell which side they started on
+UPPER_HOME = (0, 1, 2)
+LOWER_HOME = (9, 10, 11)
+# Analyses kept for reuse, newest last
+RECENT = 2
+
+_ROUTE = itemgetter(0, 2, 3)
+_recent = []
+
+
+class BoardAnalysis:
+    """
+    Facts about the board of one ``info``, each computed on first access.
+
+    Fortress collections are tuples in ascending id order, as the
+    players' own ``[i for i in range(12) if ...]`` scans produce them; the
+    analysis is shared, so none of its attributes may be modified.
+
+    Per-fortress facts are plain Python: with twelve fortresses a NumPy
+    call costs more than the loop it replaces. The per-edge pawn counts
+    are arrays, built with one ``bincount`` over all moving pawns.
+    """
+
+    def __init__(self, info):
+        _, self.state, self.moving_pawns, self.spawning_pawns, _ = info
+
+    @cached_property
+    def team(self) -> tuple[int, ...]:
+        """Owner of each fortress."""
+        return tuple([row[0] for row in self.state])
+
+    @cached_property
+    def mine(self) -> tuple[int, ...]:
+        return tuple([i for i, team in enumerate(self.team) if team == 1])
+
+    @cached_property
+    def enemy(self) -> tuple[int, ...]:
+        return tuple([i for i, team in enumerate(self.team) if team == 2])
+
+    @cached_property
+    def neutral(self) -> tuple[int, ...]:
+        return tuple([i for i, team in enumerate(self.team) if team == 0])
+
+    @cached_property
+    def home(self) -> str:
+        """``"upper"`` if more of fortresses 0-2 than of 9-11 are mine, else ``"lower"``."""
+        team = self.team
+        upper = sum([team[i] == 1 for i in UPPER_HOME])
+        lower = sum([team[i] == 1 for i in LOWER_HOME])
+        return "upper" if upper > lower else "lower"
+
+    @cached_property
+    def home_ids(self) -> tuple[int, ...]:
+        return UPPER_HOME if self.home == "upper" else LOWER_HOME
+
+    @cached_property
+    def enemy_neighbors(self) -> tuple[int, ...]:
+        """Number of enemy fortresses adjacent to each fortress."""
+        counts = [0] * n_fortress
+        for i in self.enemy:
+            # Roads run both ways, so i borders exactly its own neighbours
+            for n in NEIGHBOURS[i]:
+                counts[n] += 1
+        return tuple(counts)
+
+    @cached_property
+    def frontier(self) -> tuple[int, ...]:
+        """My fortresses adjacent to an enemy fortress."""
+        counts = self.enemy_neighbors
+        return tuple([i for i in self.mine if counts[i]])
+
+    @cached_property
+    def reinforcement_candidates(self) -> tuple[tuple[int, int], ...]:
+        """
+        ``(s, t)`` pairs where my fortress ``s`` has no enemy neighbour and
+        at least two pawns, and can send them to my frontier fortress ``t``;
+        by ``s``, then in ``s``'s neighbour order.
+        """
+        counts, team, state = self.enemy_neighbors, self.team, self.state
+        return tuple(
+            (s, t)
+            for s in self.mine
+            if not counts[s] and state[s][3] >= 2
+            for t in NEIGHBOURS[s]
+            if team[t] == 1 and counts[t]
+        )
+
+    @cached_property
+    def threats(self) -> dict[int, int]:
+        """
+        Enemy pawns moving towards each of my fortresses that has any.
+
+        Keys are in the order the first such pawn appears in
+        ``moving_pawns``, as a scan of the pawns would insert them.
+        """
+        team = self.team
+        threats = {}
+        for pawn in self.moving_pawns:
+            to = pawn[3]
+            if pawn[0] == 2 and team[to] == 1:
+                threats[to] = threats.get(to, 0) + 1
+        return threats
+
+    @cached_property
+    def traffic(self) -> np.ndarray:
+        """``traffic[team, s, t]``: pawns of ``team`` moving along the edge ``s -> t``."""
+        flat = chain.from_iterable(map(_ROUTE, self.moving_pawns))
+        team, from_, to = np.fromiter(flat, dtype=np.int64).reshape(-1, 3).T
+        index = (team * n_fortress + from_) * n_fortress + to
+        counts = np.bincount(index, minlength=3 * n_fortress * n_fortress)
+        return counts.reshape(3, n_fortress, n_fortress)
+
+    @cached_property
+    def incoming(self) -> np.ndarray:
+        """``incoming[team, t]``: pawns of ``team`` moving towards fortress ``t``."""
+        return self.traffic.sum(axis=1)
+
+
+def analyze(info) -> BoardAnalysis:
+    """
+    The ``BoardAnalysis`` of ``info``, shared by every caller with the same ``info`` list.
+
+    The last few analyses are kept with their ``info`` (which keeps the
+    ids of the lists from being reused), so a new step's ``info`` never
+    hits a stale entry.
+    """
+    for seen, analysis in _recent:
+        if seen is info:
+            return analysis
+    analysis = BoardAnalysis(info)
+    _recent.append((info, analysis))
+    del _recent[:-RECENT]
+    return analysis
@@ -0,0 +1,123 @@
+"""
+Decision cadence: when the engines consult a controller, and what it plays in between.
+
+By default a controller is asked for a command every step. A controller can
+declare a slower cadence with the ``Controller`` attributes:
+
+- ``decision_interval``: consulted every N steps (``idle_steps`` returns
+  ``N - 1`` unless overridden).
+- ``wake_events``: consulted early, on the first step after one of these
+  happens while it waits:
+
+  - ``CAPTURE``: a fortress changed owner.
+  - ``ATTACK``: an enemy spawn point opened on a route toward one of its
+    fortresses.
+  - ``UPGRADE``: one of its fortresses finished an upgrade.
+
+- ``repeat_command``: between decisions, replay the last command instead
+  of ``(0, 0, 0)``. This is what ``TCGEnv`` does for the agent during the
+  40 steps of a frame.
+
+Events are detected by comparing the board against a snapshot taken when
+the controller last decided, so every engine detects them at the same step.
+"""
+
+from .controller import Controller
+
+WAIT = (0, 0, 0)
+
+CAPTURE = "capture"
+ATTACK = "attack"
+UPGRADE = "upgrade"
+EVENTS = frozenset({CAPTURE, ATTACK, UPGRADE})
+
+
+def check_events(controller: Controller) -> frozenset:
+    """The controller's ``wake_events``, validated."""
+    events = frozenset(controller.wake_events)
+    unknown = events - EVENTS
+    if unknown:
+        raise ValueError(f"unknown wake events {sorted(unknown)} (known: {sorted(EVENTS)})")
+    return events
+
+
+def watch(state, spawning_pawns, team: int) -> tuple:
+    """
+    What the events of ``team`` are detected from, in board coordinates:
+    fortress owners, fortress levels and the routes enemies spawn on toward
+    the team's fortresses.
+    """
+    owners = tuple(row[0] for row in state)
+    levels = tuple(row[2] for row in state)
+    attacks = frozenset(
+        (from_, to)
+        for spawner, _, _, from_, to, _ in spawning_pawns
+        if spawner != team and owners[to] == team
+    )
+    return owners, levels, attacks
+
+
+def happened(events: frozenset, before: tuple, after: tuple, team: int) -> bool:
+    """Whether one of ``events`` separates the ``watch`` snapshots ``before`` and ``after``."""
+    owners_before, levels_before, attacks_before = before
+    owners, levels, attacks = after
+    if CAPTURE in events and owners != owners_before:
+        return True
+    if UPGRADE in events and any(
+        owner == team and owner == previous and level > old
+        for owner, previous, level, old in zip(owners, owners_before, levels, levels_before)
+    ):
+        return True
+    return ATTACK in events and not attacks <= attacks_before
+
+
+class Cadence:
+    """
+    Consultation schedule of the two controllers of a list-based engine.
+
+    ``wake[i]`` is the step at which controller ``i`` is next consulted
+    regardless of events.
+    """
+
+    def __init__(self, controllers: tuple[Controller, Controller]):
+        self.controllers = controllers
+        self.wake = [0, 0]
+        self.last = [WAIT, WAIT]
+        self.events = [check_events(controller) for controller in controllers]
+        self.repeat = [bool(controller.repeat_command) for controller in controllers]
+        self.seen = [None, None]
+
+    def woken(self, i: int, state, spawning_pawns) -> bool:
+        """Whether a ``wake_events`` event happened to controller ``i`` since it last decided."""
+        if not self.events[i] or self.seen[i] is None:
+            return False
+        return happened(self.events[i], self.seen[i], watch(state, spawning_pawns, i + 1), i + 1)
+
+    def commands(self, step: int, state, spawning_pawns, infos) -> list:
+        """This step's command of each controller, consulting those that are due."""
+        commands = []
+        for i, (controller, info) in enumerate(zip(self.controllers, infos)):
+            if step < self.wake[i] and not self.woken(i, state, spawning_pawns):
+                commands.append(self.last[i] if self.repeat[i] else WAIT)
+                continue
+            command = controller.update(info)
+            self.wake[i] = step + 1 + controller.idle_steps()
+            self.last[i] = command
+            if self.events[i]:
+                self.seen[i] = watch(state, spawning_pawns, i + 1)
+            commands.append(command)
+        return commands
+
+    def pending(self, step: int, state, spawning_pawns) -> bool:
+        """
+        Whether a waiting controller acts at ``step``: it replays a command
+        other than waiting, or one of its events has happened.
+        """
+        for i in (0, 1):
+            if step >= self.wake[i]:
+                continue
+            if self.repeat[i] and self.last[i][0] != 0:
+                return True
+            if self.woken(i, state, spawning_pawns):
+                return True
+        return False
@@ -0,0 +1,166 @@
+"""
+Earliest-capture estimates for every (source, target) fortress pair,
+shared by the strategy players.
+"""
+
+import math
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import NamedTuple
+
+import numpy as np
+
+from .config import fortress_cool, fortress_limit, n_fortress, pos_fortress
+
+# Pawns spawn 42 from the source centre and arrive 45 from the target centre
+TRAVEL_OFFSET = 87
+# Speed of a kind-0 pawn, which the estimate assumes for every pawn
+TRAVEL_SPEED = 1.5
+# Steps an upgrade takes
+UPGRADE_STEPS = 200
+
+
+def _travel_steps(from_id: int, to_id: int) -> int:
+    p1 = pos_fortress[from_id]
+    p2 = pos_fortress[to_id]
+    dist = math.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2)
+    return int(max(0, dist - TRAVEL_OFFSET) / TRAVEL_SPEED)
+
+
+# TRAVEL_STEPS[s][t]: estimated steps for a pawn to go from fortress s to t
+TRAVEL_STEPS = tuple(
+    tuple(_travel_steps(s, t) for t in range(n_fortress)) for s in range(n_fortress)
+)
+_TRAVEL = np.array(TRAVEL_STEPS, dtype=np.int64)
+
+_LIMIT = np.array(fortress_limit, dtype=np.int64)
+_COOL = np.array(fortress_cool, dtype=np.int64)
+# Offsets along the candidate pawn counts, enough for the highest limit
+_PAWNS = np.arange(max(fortress_limit) + 1, dtype=np.int64)
+_FIELDS = itemgetter(1, 2, 3)
+
+
+class CaptureTimes(NamedTuple):
+    """
+    Earliest capture times in steps from now, ``inf`` where there is none.
+
+    ``wait[s, t]``: fortress ``s`` keeps producing and sends half its pawns
+    to ``t``; ``upgrade[s, t]``: the same after ``s`` first upgrades once.
+    """
+
+    wait: np.ndarray
+    upgrade: np.ndarray
+
+
+def _earliest(start, pawns, limit, cool, target_pawns, target_limit, target_cool):
+    """
+    ``start`` + the wait until a source holding ``p`` pawns (``pawns`` now,
+    one more every ``cool`` steps, up to ``limit``) sends ``p // 2`` pawns
+    that outnumber the target's predicted garrison on arrival, for the
+    smallest such ``p``.
+
+    The wait only grows with ``p``, so of the counts sending the same
+    ``p // 2`` pawns only the first can be the answer: ``int(pawns)`` and
+    the even counts above it are tested, all at once on a third axis.
+    """
+    base = pawns.astype(np.int64)
+    span = max(int((limit // 2 - base // 2).max()), 0) + 1
+    p = np.maximum(base[:, None], 2 * (base // 2)[:, None] + 2 * _PAWNS[None, :span])
+    ready = start[:, None] + ((p - pawns[:, None]) * cool[:, None]).astype(np.int64)
+    arrival = (ready[:, None, :] + _TRAVEL[:, :, None]).astype(np.float64)
+    # Floor of a quotient of small integers, exact in float64
+    produced = np.floor(arrival / target_cool[None, :, None])
+    garrison = np.minimum(target_limit[None, :, None], target_pawns[None, :, None] + produced)
+    wins = (p // 2)[:, None, :] > garrison
+    wins &= (p <= limit[:, None])[:, None, :]
+    first = wins.argmax(axis=2)
+    times = ready[np.arange(n_fortress)[:, None], first]
+    return np.where(wins.any(axis=2), times, np.inf)
+
+
+@lru_cache(maxsize=16)
+def _capture_times(key: tuple) -> CaptureTimes:
+    kind, level, pawns = np.array(key, dtype=np.float64).reshape(n_fortress, 3).T
+    kind = kind.astype(np.intp)
+    level = level.astype(np.intp)
+    limit = _LIMIT[level]
+    cool = _COOL[kind, level]
+    target = (pawns, limit, cool)
+
+    wait = _earliest(np.zeros(n_fortress, dtype=np.int64), pawns, limit, cool, *target)
+
+    # Save up for the upgrade, upgrade, then wait with the next level's production
+    cost = limit // 2
+    start = np.where(pawns < cost, ((cost - pawns) * cool).astype(np.int64), 0) + UPGRADE_STEPS
+    after = np.maximum(pawns, cost) - cost + UPGRADE_STEPS // cool
+    next_level = np.minimum(level + 1, len(fortress_limit) - 1)
+    upgrade = _earliest(start, after, _LIMIT[next_level], _COOL[kind, next_level], *target)
+    upgrade[level >= len(fortress_limit) - 1] = np.inf
+
+    wait.flags.writeable = False
+    upgrade.flags.writeable = False
+    return CaptureTimes(wait, upgrade)
+
+
+def capture_times(state) -> CaptureTimes:
+    """
+    ``CaptureTimes`` for a board ``state``, computed once per distinct state.
+
+    The estimate only reads each fortress's kind, level and pawns, so the
+    result is cached on those: every player in the process that looks at
+    the same board in the same step (or an identical one later) shares it.
+    The arrays are read-only.
+    """
+    return _capture_times(tuple(chain.from_iterable(map(_FIELDS, state))))
+
+
+def _earliest_pair(start, pawns, limit, cool, travel, target_pawns, target_limit, target_cool):
+    """``_earliest`` for one (source, target) pair, with the same candidate counts."""
+    p = int(pawns)
+    while p <= limit:
+        ready = start + int((p - pawns) * cool)
+        garrison = min(target_limit, target_pawns + (ready + travel) // target_cool)
+        if p // 2 > garrison:
+            return ready
+        # Next even count; once the garrison is full, the first that outnumbers it
+        p += 2 - p % 2
+        if garrison == target_limit:
+            p = max(p, 2 * target_limit + 2)
+    return float("inf")
+
+
+def capture_time_estimate(state, my_idx: int, target_idx: int, upgrade: bool = False):
+    """
+    Steps until ``my_idx`` can take ``target_idx``, ``float('inf')`` if it cannot.
+
+    One entry of ``capture_times`` (an int, or ``inf``), computed on its
+    own: for the few pairs a player looks at per step this is cheaper than
+    the whole matrix.
+    """
+    _, kind, level, pawns, _, _ = state[my_idx]
+    _, target_kind, target_level, target_pawns, _, _ = state[target_idx]
+    limit = fortress_limit[level]
+    cool = fortress_cool[kind][level]
+    start = 0
+    if upgrade:
+        if level >= len(fortress_limit) - 1:
+            return float("inf")
+        cost = limit // 2
+        if pawns < cost:
+            start = int((cost - pawns) * cool)
+            pawns = cost
+        start += UPGRADE_STEPS
+        pawns = (pawns - cost) + UPGRADE_STEPS // cool
+        limit = fortress_limit[level + 1]
+        cool = fortress_cool[kind][level + 1]
+    return _earliest_pair(
+        start,
+        pawns,
+        limit,
+        cool,
+        TRAVEL_STEPS[my_idx][target_idx],
+        target_pawns,
+        fortress_limit[target_level],
+        fortress_cool[target_kind][target_level],
+    )
@@ -101,6 +101,22 @@ A_fortress_set = [
 fortress_limit = [10, 10, 20, 30, 40, 50]
 fortress_cool = [[60, 60, 54, 48, 42, 35], [90, 90, 81, 72, 63, 54]]
 
+# Initial fortress state: team, kind, level, pawn_number, upgrade_time, to_set
+initial_state = [
+    [0, 0, 1, 10, -1, [1, 3, 4]],
+    [2, 0, 2, 20, -1, [0, 2, 4]],
+    [0, 0, 1, 10, -1, [1, 4, 5]],
+    [0, 0, 2, 20, -1, [0, 4, 6, 7]],
+    [0, 1, 3, 30, -1, [0, 1, 2, 3, 5, 6, 7, 8]],
+    [0, 0, 2, 20, -1, [2, 4, 7, 8]],
+    [0, 0, 2, 20, -1, [3, 4, 7, 9]],
+    [0, 1, 3, 30, -1, [3, 4, 5, 6, 8, 9, 10, 11]],
+    [0, 0, 2, 20, -1, [4, 5, 7, 11]],
+    [0, 0, 1, 10, -1, [6, 7, 10]],
+    [1, 0, 2, 20, -1, [7, 9, 11]],
+    [0, 0, 1, 10, -1, [7, 8, 10]],
+]
+
 # Swap numbers for perspective
 swap_number_l = [11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1, 0]
 swap_number_d = {i: swap_number_l[i] for i in range(len(swap_number_l))}
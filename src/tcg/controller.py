@@ -1,10 +1,40 @@
+import random
+
+
 class Controller:
+    # Random source for the controller's own decisions. Defaults to the module-level
+    # generator; games hand each controller a seeded one through set_rng().
+    rng = random
+
+    # Decision cadence (see tcg.cadence): consulted every decision_interval steps, and
+    # early on any of wake_events; between decisions the engine plays (0, 0, 0), or the
+    # last command again if repeat_command is set.
+    decision_interval = 1
+    wake_events = frozenset()
+    repeat_command = False
+
     def team_name(self) -> str:
         raise NotImplementedError
 
     def update(self, info) -> tuple[int, int, int]:
         raise NotImplementedError
 
+    def idle_steps(self) -> int:
+        """
+        Number of steps after the current one for which this controller has no command.
+
+        Asked right after ``update``. The engine does not call ``update`` during
+        those steps, unless one of ``wake_events`` happens, and plays ``(0, 0, 0)``
+        (or the last command, with ``repeat_command``) for this controller instead;
+        engines that skip quiet steps (``SkipGame``) can then jump over them.
+        Defaults to ``decision_interval - 1``.
+        """
+        return self.decision_interval - 1
+
+    def set_rng(self, rng: random.Random):
+        """Receive the seeded random generator to use for this game."""
+        self.rng = rng
+
 
 class Human(Controller):
     def team_name(self) -> str:
@@ -4,7 +4,8 @@ import numpy as np
 from gymnasium import spaces
 from tcg.gym_game import GymGame
 from tcg.controller import Controller
-from tcg.config import fortress_limit, A_fortress_set, n_fortress, A_coordinate
+from tcg.config import fortress_limit, A_fortress_set, n_fortress
+from tcg.features import Featurizer
 
 class DefensiveTCGEnv(gym.Env):
     """
@@ -29,68 +30,29 @@ class DefensiveTCGEnv(gym.Env):
         )
         self.game = None
         self.gym_controller = None
+        self.featurizer = Featurizer()
 
     def _get_obs(self):
-        state_obs = []
-        for s in self.game.state:
-            team_val = 0.0
-            if s[0] == 1: team_val = 1.0
-            elif s[0] == 2: team_val = -1.0
-            kind = float(s[1])
-            level = s[2] * 0.2
-            pawns = np.log1p(s[3]) * 0.1
-            upgrade = s[4] * 0.005 if s[4] != -1 else -1.0
-            state_obs.extend([team_val, kind, level, pawns, upgrade])
-        edge_traffic = np.zeros((12, 12, 2), dtype=np.float32)
-        for pawn in self.game.moving_pawns:
-            team = pawn[0]
-            from_ = pawn[2]
-            to = pawn[3]
-            team_idx = 0 if team == 1 else 1
-            edge_traffic[from_][to][team_idx] += 0.01
-        return np.concatenate([
-            np.array(state_obs, dtype=np.float32),
-            edge_traffic.flatten()
-        ])
+        return self.featurizer.observation(self.game.state, self.game.moving_pawns).copy()
 
     def action_masks(self):
-        mask = [False] * 432
-        mask[0] = True
-        for s in range(12):
-            if self.game.state[s][0] != 1:
-                continue
-            if self.game.state[s][3] < 2:
-                continue
-            for t in range(12):
-                if A_coordinate[s][t] != 0:
-                    idx = 144 + s * 12 + t
-                    mask[idx] = True
-        for s in range(12):
-            if self.game.state[s][0] != 1:
-                continue
-            level = self.game.state[s][2]
-            if level >= 5:
-                continue
-            cost = fortress_limit[level] // 2
-            if self.game.state[s][3] < cost:
-                continue
-            if self.game.state[s][4] != -1:
-                continue
-            idx = 288 + s * 12 + s
-            mask[idx] = True
-        return mask
+        return self.featurizer.action_mask(self.game.state).copy()
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         from tcg.gym_env import GymController
         self.gym_controller = GymController()
         if isinstance(self.opponent_class, list):
-            import random
-            opponent_cls = random.choice(self.opponent_class)
+            opponent_cls = self.opponent_class[self.np_random.integers(len(self.opponent_class))]
             opponent = opponent_cls()
         else:
             opponent = self.opponent_class()
-        self.game = GymGame(self.gym_controller, opponent, window=(self.render_mode == "human"))
+        self.game = GymGame(
+            self.gym_controller,
+            opponent,
+            window=(self.render_mode == "human"),
+            seed=int(self.np_random.integers(2**63)),
+        )
         return self._get_obs(), {}
 
     def step(self, action):
@@ -184,12 +146,21 @@ class DefensiveTCGEnv(gym.Env):
         return obs, reward, terminated, truncated, info
 
     def render(self):
-        if self.render_mode == "human" and self.game.window_enabled:
-            import pygame
-            pygame.display.update()
-            self.game.fps(30)
+        if self.render_mode == "human" and self.game.renderer is not None:
+            self.game.renderer.draw(self.game)
+            self.game.renderer.present(self.metadata["render_fps"])
+        elif self.render_mode == "rgb_array":
+            if self.window is None:
+                # Off-screen surface: pygame is only imported once a frame is requested
+                from tcg.render import Renderer
+
+                self.window = Renderer(window=False)
+            self.window.draw(self.game)
+            return self.window.rgb_array()
 
     def close(self):
         if self.window is not None:
-            import pygame
-            pygame.quit()
+            self.window.close()
+            self.window = None
+        elif self.game is not None and self.game.renderer is not None:
+            self.game.renderer.close()
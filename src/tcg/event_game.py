@@ -0,0 +1,156 @@
+"""Game class for Fortress Conquest with event-driven pawn arrivals."""
+
+import math
+from collections import defaultdict
+
+from .config import A_coordinate, pos_fortress
+from .controller import Controller
+from .gym_game import GymGame
+from .profiling import StepProfiler
+from .utils import LazyRows
+
+# Pawn speed per kind (pixels per step)
+PAWN_SPEED = (1.5, 1)
+ARRIVAL_RADIUS_SQ = 45**2
+
+# Arrival tests closer to the radius than this are replayed step by step
+ARRIVAL_EPS = 1e-6
+
+
+def arrival_moves(pos, velocity, target):
+    """
+    Number of ``pawn_move`` calls until a pawn at ``pos`` reaches ``target``.
+
+    Solves ``|pos + k * velocity - target|^2 <= 45^2`` for the smallest
+    ``k >= 1``. When the closed form lands within rounding distance of the
+    radius, the repeated additions done by ``GymGame.pawn_move`` are replayed
+    so the answer matches it exactly.
+    """
+    vx, vy = velocity
+    tx, ty = target
+    dx, dy = pos[0] - tx, pos[1] - ty
+    a = vx * vx + vy * vy
+    b = 2 * (vx * dx + vy * dy)
+    c = dx * dx + dy * dy - ARRIVAL_RADIUS_SQ
+    disc = b * b - 4 * a * c
+    if a == 0 or disc < 0:
+        return None
+    k = max(1, math.ceil((-b - math.sqrt(disc)) / (2 * a)))
+
+    def dist_sq(n):
+        return (dx + n * vx) ** 2 + (dy + n * vy) ** 2
+
+    if dist_sq(k) <= ARRIVAL_RADIUS_SQ - ARRIVAL_EPS and (
+        k == 1 or dist_sq(k - 1) > ARRIVAL_RADIUS_SQ + ARRIVAL_EPS
+    ):
+        return k
+
+    x, y = pos
+    n = 0
+    while True:
+        n += 1
+        x, y = x + vx, y + vy
+        if (tx - x) ** 2 + (ty - y) ** 2 <= ARRIVAL_RADIUS_SQ:
+            return n
+
+
+def _moving_rows(flying, moves):
+    return [
+        [team, kind, from_, to, [x + (moves - m0) * vx, y + (moves - m0) * vy]]
+        for team, kind, from_, to, x, y, vx, vy, m0 in flying
+    ]
+
+
+class EventGame(GymGame):
+    """
+    GymGame whose pawns are scheduled by arrival instead of integrated.
+
+    A pawn moves in a straight line at constant speed, so the ``pawn_move``
+    call in which it enters the arrival radius is known when it departs. It
+    is put into a per-move arrival bucket, and each step only resolves that
+    step's bucket in departure order, so ``pawn_move`` costs O(arrivals)
+    rather than O(pawns in flight).
+
+    ``moving_pawns`` is a read-only lazy view whose positions are computed
+    in closed form when a controller or the renderer reads it. They can
+    differ from the integrated positions of ``GymGame`` in the last bits;
+    arrival steps and every game outcome are identical.
+    """
+
+    def __init__(
+        self,
+        controller1: Controller,
+        controller2: Controller,
+        window: bool = True,
+        seed: int | None = None,
+        profiler: StepProfiler | None = None,
+        recorder=None,
+    ):
+        self.moves = 0
+        self.pawn_id = 0
+        # pawn id -> (team, kind, from_, to, x, y, vx, vy, moves at departure)
+        self.flying = {}
+        self.arrivals = defaultdict(list)
+        super().__init__(controller1, controller2, window, seed, profiler, recorder)
+
+    @property
+    def moving_pawns(self):
+        """Pawns in flight as ``[team, kind, from_, to, pos]``, built on access."""
+        return LazyRows(len(self.flying), _moving_rows, list(self.flying.values()), self.moves)
+
+    @moving_pawns.setter
+    def moving_pawns(self, value):
+        self.flying.clear()
+        self.arrivals.clear()
+        for team, kind, from_, to, pos in value:
+            self.launch(team, kind, from_, to, pos)
+
+    def launch(self, team, kind, from_, to, pos):
+        """Put a pawn in flight and schedule its arrival."""
+        speed = PAWN_SPEED[kind]
+        vx, vy = A_coordinate[from_][to][0] * speed, A_coordinate[from_][to][1] * speed
+        k = arrival_moves(pos, (vx, vy), pos_fortress[to])
+        self.flying[self.pawn_id] = (team, kind, from_, to, pos[0], pos[1], vx, vy, self.moves)
+        if k is not None:
+            self.arrivals[self.moves + k].append(self.pawn_id)
+        self.pawn_id += 1
+
+    def pawn_departure(self):
+        """Pawns depart from spawn points."""
+        for i in range(len(self.spawning_pawns)):
+            team, kind, pawn_number, from_, to, pos = self.spawning_pawns[i]
+            r = self.rng.random() - 0.5
+            if pawn_number > 0 and (
+                (kind == 0 and self.step % 7 == 0) or (kind == 1 and self.step % 10 == 0)
+            ):
+                pos = [
+                    pos[0] + A_coordinate[from_][to][1] * r * 10,
+                    pos[1] + A_coordinate[from_][to][0] * -1 * r * 10,
+                ]
+                self.launch(team, kind, from_, to, pos)
+                self.spawning_pawns[i][2] -= 1
+
+        for i in range(len(self.spawning_pawns)):
+            if self.spawning_pawns[i][2] <= 0:
+                self.spawning_pawns.remove(self.spawning_pawns[i])
+                break
+
+    def pawn_move(self):
+        """Resolve the pawns arriving in this move, in departure order."""
+        self.moves += 1
+        for pawn_id in self.arrivals.pop(self.moves, ()):
+            self.pawn_arrive(self.flying.pop(pawn_id))
+
+    def pawn_arrive(self, pawn):
+        """Handle pawn arrival at fortress."""
+        team, kind, _, to = pawn[:4]
+        if team == self.state[to][0]:
+            self.state[to][3] += 1
+        else:
+            if kind == 0:
+                self.state[to][3] -= 0.65
+            elif kind == 1:
+                self.state[to][3] -= 0.95
+
+            if self.state[to][3] < 0:
+                self.state[to] = [team, self.state[to][1], 1, 0, -1, self.state[to][5]]
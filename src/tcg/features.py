@@ -0,0 +1,186 @@
+"""
+Observation and action-mask encoding shared by the TCG environments and ML players.
+
+``Featurizer`` encodes one list-shaped board view; ``batch_observations``
+and ``batch_action_masks`` encode many games held as (B, 12) arrays
+(``BatchGame``). Both go through the same fortress encoding and the same
+mask predicates, so they agree value for value.
+"""
+
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+from .config import A_coordinate, fortress_limit, n_fortress
+
+N_ACTIONS = 432
+# 12 fortresses * 5 features + 12 * 12 edges * 2 teams
+OBS_SIZE = n_fortress * 5 + n_fortress * n_fortress * 2
+
+# Edges a ``move`` command may use, as the original mask tested them
+MOVE_ALLOWED = np.array(
+    [[A_coordinate[s][t] != 0 for t in range(n_fortress)] for s in range(n_fortress)]
+)
+# Pawns needed to start an upgrade, by level; the top level cannot be upgraded
+UPGRADE_COST = np.array([limit // 2 for limit in fortress_limit[:-1]] + [np.inf])
+# Observation value of each team id: neutral 0, me 1, enemy -1
+TEAM_SIGN = np.array([0.0, 1.0, -1.0])
+
+_FORTRESS_FIELDS = itemgetter(0, 1, 2, 3, 4)
+_MOVE_OFFSET = 144
+_UPGRADE_OFFSET = 288
+# Edge-traffic features per game: (from_, to, team) with team 0 me, 1 enemy
+_N_EDGES = n_fortress * n_fortress * 2
+
+# _TRAFFIC[k]: edge feature for k pawns, i.e. 0.01 added k times in float32.
+# Grown on demand so the value matches the per-pawn accumulation bit for bit.
+_TRAFFIC = np.zeros(1, dtype=np.float32)
+
+
+def _traffic_table(size: int) -> np.ndarray:
+    global _TRAFFIC
+    if size > len(_TRAFFIC):
+        steps = np.full(max(size, 2 * len(_TRAFFIC)), np.float32(0.01), dtype=np.float32)
+        steps[0] = 0.0
+        _TRAFFIC = np.cumsum(steps, dtype=np.float32)
+    return _TRAFFIC
+
+
+def traffic_values(counts: np.ndarray) -> np.ndarray:
+    """Edge-traffic features (float32) for an integer array of pawn counts."""
+    return _traffic_table(int(counts.max(initial=0)) + 1)[counts]
+
+
+def fortress_features(team, kind, level, pawns, upgrade, out: np.ndarray) -> np.ndarray:
+    """
+    Write the fortress block of observations into ``out`` (shape ``(..., 12, 5)``)
+    from fortress arrays of shape ``(..., 12)``: ``[team (1 me, -1 enemy),
+    kind, level * 0.2, log1p(pawns) * 0.1, upgrade_time * 0.005 or -1]``.
+    """
+    out[..., 0] = TEAM_SIGN[team.astype(np.intp)]
+    out[..., 1] = kind
+    out[..., 2] = level * 0.2
+    out[..., 3] = np.log1p(pawns) * 0.1
+    out[..., 4] = np.where(upgrade == -1, -1.0, upgrade * 0.005)
+    return out
+
+
+def _can_move(team, pawns):
+    """Fortresses a move may start from: owned, with at least 2 pawns."""
+    return (team == 1) & (pawns >= 2)
+
+
+def _can_upgrade(team, level, pawns, upgrade):
+    """Fortresses that may start an upgrade: owned, idle, below level 5 and able to pay."""
+    return (team == 1) & (upgrade == -1) & (pawns >= UPGRADE_COST[level.astype(np.intp)])
+
+
+def batch_observations(team, kind, level, pawns, upgrade, pawn_game, pawn_from, pawn_to, pawn_team):
+    """
+    (B, 348) observations of B team-1 views: fortress arrays of shape
+    (B, 12), and one entry per pawn in flight in the ``pawn_*`` arrays
+    (``pawn_game`` is the game it belongs to). Same values as ``Featurizer``.
+    """
+    n = len(team)
+    fortress = fortress_features(
+        team, kind, level, pawns, upgrade, np.empty((n, n_fortress, 5), dtype=np.float32)
+    )
+    edges = pawn_game * _N_EDGES + pawn_from * 24 + pawn_to * 2 + (pawn_team != 1)
+    counts = np.bincount(edges, minlength=n * _N_EDGES).reshape(n, _N_EDGES)
+    return np.concatenate([fortress.reshape(n, n_fortress * 5), traffic_values(counts)], axis=1)
+
+
+def batch_action_masks(team, level, pawns, upgrade) -> np.ndarray:
+    """(B, 432) action masks of B team-1 views; same values as ``Featurizer.action_mask``."""
+    n = len(team)
+    mask = np.zeros((n, 3, n_fortress, n_fortress), dtype=bool)
+    mask[:, 0, 0, 0] = True
+    mask[:, 1] = _can_move(team, pawns)[:, :, None] & MOVE_ALLOWED
+    fortress = np.arange(n_fortress)
+    mask[:, 2, fortress, fortress] = _can_upgrade(team, level, pawns, upgrade)
+    return mask.reshape(n, N_ACTIONS)
+
+
+def decode_action(action: int) -> tuple[int, int, int]:
+    """``(command, subject, to)`` for an action index, as the environments decode it."""
+    if action < _MOVE_OFFSET:
+        return 0, 0, 0
+    if action < _UPGRADE_OFFSET:
+        return (1, *divmod(action - _MOVE_OFFSET, n_fortress))
+    return (2, *divmod(action - _UPGRADE_OFFSET, n_fortress))
+
+
+class Featurizer:
+    """
+    Encodes a team-1 board view into the 348-float observation and 432-bool mask.
+
+    ``observation`` and ``action_mask`` write into buffers owned by the
+    instance and return them, so every call overwrites the previous result;
+    copy it if it has to outlive the next step.
+    """
+
+    def __init__(self):
+        self.obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        self.mask = np.zeros(N_ACTIONS, dtype=bool)
+        self._fortress = self.obs[: n_fortress * 5].reshape(n_fortress, 5)
+        self._traffic = self.obs[n_fortress * 5 :]
+        self._move = self.mask[_MOVE_OFFSET:_UPGRADE_OFFSET].reshape(n_fortress, n_fortress)
+        # Canonical upgrades ``288 + s * 12 + s`` lie on a stride-13 diagonal
+        self._upgrade = self.mask[_UPGRADE_OFFSET :: n_fortress + 1]
+
+    @staticmethod
+    def _columns(state):
+        """team, kind, level, pawn_number, upgrade_time of every fortress, as columns."""
+        fields = np.fromiter(
+            chain.from_iterable(map(_FORTRESS_FIELDS, state)),
+            dtype=np.float64,
+            count=n_fortress * 5,
+        )
+        return fields.reshape(n_fortress, 5).T
+
+    def observation(self, state, moving_pawns) -> np.ndarray:
+        """
+        Fill and return the observation buffer.
+
+        Fortress features are ``[team (1 me, -1 enemy), kind, level * 0.2,
+        log1p(pawns) * 0.1, upgrade_time * 0.005 or -1]``, followed by the
+        number of pawns per ``(from_, to, team)`` edge scaled by 0.01.
+        """
+        return self._observation(self._columns(state), moving_pawns)
+
+    def action_mask(self, state) -> np.ndarray:
+        """
+        Fill and return the mask buffer.
+
+        Wait (0) is always valid; ``144 + s * 12 + t`` moves from an owned
+        fortress with at least 2 pawns along an edge; ``288 + s * 13``
+        upgrades an owned, idle fortress below level 5 that can pay half
+        its limit.
+        """
+        return self._action_mask(self._columns(state))
+
+    def encode(self, state, moving_pawns) -> tuple[np.ndarray, np.ndarray]:
+        """``(observation, action_mask)`` for one view, reading ``state`` once."""
+        columns = self._columns(state)
+        return self._observation(columns, moving_pawns), self._action_mask(columns)
+
+    def _observation(self, columns, moving_pawns):
+        fortress_features(*columns, self._fortress)
+
+        # Same edge index as batch_observations
+        edges = np.fromiter(
+            (p[2] * 24 + p[3] * 2 + (p[0] != 1) for p in moving_pawns),
+            dtype=np.intp,
+            count=len(moving_pawns),
+        )
+        counts = np.bincount(edges, minlength=len(self._traffic))
+        self._traffic[:] = traffic_values(counts)
+        return self.obs
+
+    def _action_mask(self, columns):
+        team, _, level, pawns, upgrade = columns
+        self.mask[0] = True
+        np.logical_and(_can_move(team, pawns)[:, None], MOVE_ALLOWED, out=self._move)
+        self._upgrade[:] = _can_upgrade(team, level, pawns, upgrade)
+        return self.mask
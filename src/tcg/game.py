@@ -1,66 +1,65 @@
 """Game class for Fortress Conquest."""
 
 import random
+from copy import deepcopy
 
-import pygame
-
+from .cadence import Cadence
 from .config import (
-    FPS,
-    HEIGHT,
     SPEEDRATE,
     STEPLIMIT,
-    WIDTH,
     A_coordinate,
-    A_fortress_set,
-    color_fortress,
-    color_pawn,
     fortress_cool,
     fortress_limit,
+    initial_state,
     n_fortress,
     pos_fortress,
     swap_number_l,
 )
 from .controller import Controller
-from .utils import flip_board_view
+from .profiling import StepProfiler
+from .utils import PerspectiveView
 
 
 class Game:
-    def __init__(self, controller1: Controller, controller2: Controller, window: bool = True):
+    def __init__(
+        self,
+        controller1: Controller,
+        controller2: Controller,
+        window: bool = True,
+        seed: int | None = None,
+        profiler: StepProfiler | None = None,
+        recorder=None,
+    ):
         self.controller1 = controller1  # bottom
         self.controller2 = controller2  # up
         self.window_enabled = window
 
+        # Engine randomness, plus one generator per controller derived from it
+        self.rng = random.Random(seed)
+        self.controller1.set_rng(random.Random(self.rng.getrandbits(64)))
+        self.controller2.set_rng(random.Random(self.rng.getrandbits(64)))
+
         self.team1 = self.controller1.team_name()
         self.team2 = self.controller2.team_name()
 
+        # pygame is only imported (and SDL started) when there is a window
+        self.renderer = None
         if self.window_enabled:
-            pygame.init()
-            self.font = pygame.font.Font(None, 16)
-            self.font_number = pygame.font.Font(None, 36)
-
-            self.back_color = [150, 255, 150]
+            from .render import Renderer
 
-            self.window = pygame.display.set_mode((WIDTH, HEIGHT))
-            self.fps = pygame.time.Clock().tick
+            self.renderer = Renderer()
         self.seconds = 0
 
         # team, kind, level, pawn_number, upgrade_time, to_set
-        self.state = [
-            [0, 0, 1, 10, -1, [1, 3, 4]],
-            [2, 0, 2, 20, -1, [0, 2, 4]],
-            [0, 0, 1, 10, -1, [1, 4, 5]],
-            [0, 0, 2, 20, -1, [0, 4, 6, 7]],
-            [0, 1, 3, 30, -1, [0, 1, 2, 3, 5, 6, 7, 8]],
-            [0, 0, 2, 20, -1, [2, 4, 7, 8]],
-            [0, 0, 2, 20, -1, [3, 4, 7, 9]],
-            [0, 1, 3, 30, -1, [3, 4, 5, 6, 8, 9, 10, 11]],
-            [0, 0, 2, 20, -1, [4, 5, 7, 11]],
-            [0, 0, 1, 10, -1, [6, 7, 10]],
-            [1, 0, 2, 20, -1, [7, 9, 11]],
-            [0, 0, 1, 10, -1, [7, 8, 10]],
-        ]
+        self.state = deepcopy(initial_state)
+        # Controller2's mirrored view, refreshed in place every step
+        self.red_view = PerspectiveView()
 
         self.step = 0
+        # When each controller is consulted and what it plays in between (tcg.cadence)
+        self.cadence = Cadence((self.controller1, self.controller2))
+        # Step at which each controller is consulted next (see Controller.idle_steps)
+        self.wake = self.cadence.wake
 
         self.spawning_pawns = []  # team, kind, pawn_number, from_, to, [pos]
         self.moving_pawns = []  # team, kind, from_, to, pos
@@ -76,103 +75,19 @@ class Game:
         self.Overed = False
         self.done = False
 
-    def draw_fortress(self):
-        """Draw fortresses on screen."""
-        if not self.window_enabled:
-            return
-        r = 0
-        for x, y in pos_fortress:
-            if r == 4 or r == 7:  # Draw square fortresses
-                pygame.draw.rect(
-                    self.window,
-                    color_fortress[self.state[r][0]],
-                    pygame.Rect(x - 40, y - 40, 80, 80),
-                    width=0,
-                )
-            else:
-                pygame.draw.circle(self.window, color_fortress[self.state[r][0]], (x, y), 45)
-            r += 1
-
-    def draw_road(self):
-        """Draw roads between fortresses."""
-        if not self.window_enabled:
-            return
-        for i in range(n_fortress):
-            for j in range(n_fortress):
-                if A_fortress_set[i][j] == 1:
-                    pygame.draw.line(
-                        self.window, [200, 150, 50], pos_fortress[i], pos_fortress[j], 25
-                    )
+        # Opt-in per-phase timing; without a profiler nothing is wrapped
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.attach(self)
 
-    def draw_number(self):
-        """Draw numbers on fortresses."""
-        if not self.window_enabled:
-            return
-        for i in range(12):
-            text = self.font.render(f"Lv {self.state[i][2]}", True, (0, 0, 0))
-            position = (pos_fortress[i][0] - 20, pos_fortress[i][1] - 35)
-            self.window.blit(text, position)
-
-            if self.state[i][3] >= 10:
-                text = self.font_number.render(f"{int(self.state[i][3])}", True, (0, 0, 0))
-                position = (pos_fortress[i][0] - 20, pos_fortress[i][1] - 5)
-                self.window.blit(text, position)
-            else:
-                text = self.font_number.render(f"{int(self.state[i][3])}", True, (0, 0, 0))
-                position = (pos_fortress[i][0] - 10, pos_fortress[i][1] - 5)
-                self.window.blit(text, position)
-
-            if self.state[i][4] != -1:
-                text = self.font.render(f"{int(self.state[i][4] // 2)}", True, (0, 0, 0))
-                position = (pos_fortress[i][0] + 25, pos_fortress[i][1] - 5)
-                self.window.blit(text, position)
-
-        score_text = self.font.render(f"step: {self.step}", True, (255, 255, 255))
-        score_position = (900, 10)
-        self.window.blit(score_text, score_position)
-
-        text = self.font.render(f"時間: {self.seconds}", True, (255, 255, 255))
-        position = (900, 30)
-        self.window.blit(text, position)
-
-        len_text = self.font.render(f"pawn: {len(self.moving_pawns)}", True, (255, 255, 255))
-        position = (900, 50)
-        self.window.blit(len_text, position)
-
-        len_text = self.font.render(f"spawn: {len(self.spawning_pawns)}", True, (255, 255, 255))
-        position = (900, 70)
-        self.window.blit(len_text, position)
-
-        len_text = self.font.render(f"Rate: {SPEEDRATE}", True, (255, 255, 255))
-        position = (900, 110)
-        self.window.blit(len_text, position)
-
-        len_text = self.font.render(f"fps: {FPS}", True, (255, 255, 255))
-        position = (900, 130)
-        self.window.blit(len_text, position)
-
-    def draw_team_name(self):
-        """Draw team names."""
-        len_text = self.font_number.render(f"Red : {self.team2}", True, (200, 25, 25))
-        position = (10, 10)
-        self.window.blit(len_text, position)
-        len_text = self.font_number.render(f"Blue: {self.team1}", True, (25, 25, 200))
-        position = (10, HEIGHT - 50)
-        self.window.blit(len_text, position)
-
-    def draw_pawn(self):
-        """Draw pawns on screen."""
-        if not self.window_enabled:
-            return
-        for i in range(len(self.moving_pawns)):
-            team, kind, from_, to, pos = self.moving_pawns[i]
-            if kind == 0:
-                pygame.draw.circle(self.window, color_pawn[team], pos, 5)
-            elif kind == 1:
-                x, y = pos[0], pos[1]
-                pygame.draw.rect(
-                    self.window, color_pawn[team], pygame.Rect(x - 2, y - 2, 8, 8), width=0
-                )
+        # Opt-in replay recording (a tcg.replay.ReplayRecorder)
+        self.recorder = recorder
+        if recorder is not None:
+            recorder.attach(self)
+
+    def flip_board_view(self, info):
+        """Flip board view so controller2 sees itself as team 1."""
+        return self.red_view.flip(info)
 
     def pawn_born(self):
         """Pawns regenerate over time."""
@@ -231,7 +146,7 @@ class Game:
         """Pawns depart from spawn points."""
         for i in range(len(self.spawning_pawns)):
             team, kind, pawn_number, from_, to, pos = self.spawning_pawns[i]
-            r = random.random() - 0.5
+            r = self.rng.random() - 0.5
             if self.step % 7 == 0 and kind == 0 and pawn_number > 0:
                 pos = [
                     pos[0] + A_coordinate[from_][to][1] * r * 10,
@@ -294,6 +209,21 @@ class Game:
 
         self.moving_pawns.remove(pawn)
 
+    def update_controllers(self, info_1, info_2):
+        """
+        Ask both controllers for this step's command.
+
+        A controller that declared ``idle_steps`` is not consulted until they
+        have passed, or one of its ``wake_events`` happens, and plays
+        ``(0, 0, 0)`` meanwhile (its last command with ``repeat_command``).
+        """
+        commands = self.cadence.commands(
+            self.step, self.state, self.spawning_pawns, (info_1, info_2)
+        )
+        if self.recorder is not None:
+            self.recorder.record(self.step, commands)
+        return commands
+
     def order(self, team, command, subject, to):
         """Process player command."""
         if command == 0:
@@ -327,19 +257,15 @@ class Game:
 
         return False
 
-    def check_event(self, event):
-        """Check pygame events."""
-        if not self.window_enabled:
-            return
-        for e in pygame.event.get():
-            if e.type == event:
-                return True
-        return False
+    def quit_requested(self) -> bool:
+        """True if the window has been closed (never without a window)."""
+        return self.renderer is not None and self.renderer.quit_requested()
 
     def run(self):
         """Main game loop."""
         while True:
-            self.seconds = (pygame.time.get_ticks() - 0) // 1000
+            if self.renderer is not None:
+                self.seconds = self.renderer.seconds()
             if self.isGameOver or self.step > STEPLIMIT:
                 if self.Overed:
                     break
@@ -360,22 +286,25 @@ class Game:
                     )
                     break
 
-                if self.check_event(pygame.QUIT):
+                if self.quit_requested():
                     exit(0)
                     break
 
+                if self.recorder is not None and self.step >= self.recorder.next_keyframe:
+                    self.recorder.keyframe()
                 self.pawn_move()
                 self.done = self.CheckGameOver() or self.step == STEPLIMIT - 1
 
                 # Controller1 gets team 1 perspective (bottom player)
                 info_1 = [1, self.state, self.moving_pawns, self.spawning_pawns, self.done]
                 # Controller2 gets flipped perspective (always sees themselves as team 1)
-                info_2 = flip_board_view(
+                info_2 = self.flip_board_view(
                     [2, self.state, self.moving_pawns, self.spawning_pawns, self.done]
                 )
 
-                command_1, subject_1, to_1 = self.controller1.update(info_1)
-                command_2, subject_2, to_2 = self.controller2.update(info_2)
+                (command_1, subject_1, to_1), (command_2, subject_2, to_2) = (
+                    self.update_controllers(info_1, info_2)
+                )
 
                 # Convert controller2's commands back to original perspective
                 subject_2 = swap_number_l[subject_2]
@@ -396,45 +325,12 @@ class Game:
                 if self.CheckGameOver():
                     self.isGameOver_loop = True
 
-            if self.window_enabled:
-                back_color = [150, 150, 150]
-                if self.Red_fortress == self.Blue_fortress:
-                    back_color[1] += 105
-                elif self.Red_fortress > self.Blue_fortress:
-                    per = 2 * self.Red_fortress / (self.Red_fortress + self.Blue_fortress) - 1
-                    back_color[0] += int(105 * per)
-                    back_color[1] += int(105 * (1 - per))
-                elif self.Red_fortress < self.Blue_fortress:
-                    per = 2 * self.Blue_fortress / (self.Red_fortress + self.Blue_fortress) - 1
-                    back_color[2] += int(105 * per)
-                    back_color[1] += int(105 * (1 - per))
-
-                if self.back_color[0] < back_color[0]:
-                    self.back_color[0] += 1
-                elif self.back_color[0] > back_color[0]:
-                    self.back_color[0] -= 1
-
-                if self.back_color[1] < back_color[1]:
-                    self.back_color[1] += 1
-                elif self.back_color[1] > back_color[1]:
-                    self.back_color[1] -= 1
-
-                if self.back_color[2] < back_color[2]:
-                    self.back_color[2] += 1
-                elif self.back_color[2] > back_color[2]:
-                    self.back_color[2] -= 1
-
-                self.window.fill(self.back_color)
-
-                self.draw_road()
-                self.draw_fortress()
-                self.draw_pawn()
-                self.draw_number()
-                self.draw_team_name()
-
-            if self.window_enabled:
-                pygame.display.update()
-                self.fps(int(FPS))
+            if self.renderer is not None:
+                self.renderer.draw(self)
+                self.renderer.present()
 
             if self.CheckGameOver():
                 self.isGameOver = True
+
+        if self.profiler is not None:
+            self.profiler.finish()
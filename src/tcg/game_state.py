@@ -0,0 +1,287 @@
+"""Forkable game state and forward model for lookahead search."""
+
+import random
+from collections import defaultdict
+
+from .config import STEPLIMIT, A_coordinate, initial_state, pos_fortress, swap_number_l
+from .event_game import EventGame
+from .gym_game import GymGame
+from .skip_game import SkipGame
+from .utils import flip_board_view
+
+WAIT = (0, 0, 0)
+
+# flip_board_view mirrors fortress ids but leaves pawn positions in board
+# coordinates; the map is point-symmetric about this centre
+BOARD_CENTRE = (500.0, 390.0)
+# Spawn points sit this far from their fortress along the edge (GymGame.deliver)
+SPAWN_OFFSET = 42
+# Half the width of the departure jitter band, plus rounding slack
+LANE_HALF_WIDTH = 5.0 + 1e-6
+
+
+def _clone_rng(rng: random.Random) -> random.Random:
+    # Skips Random.__init__, which would seed itself from os.urandom first
+    clone = random.Random.__new__(random.Random)
+    clone.setstate(rng.getstate())
+    return clone
+
+
+def _mirror(pos):
+    return [2 * BOARD_CENTRE[0] - pos[0], 2 * BOARD_CENTRE[1] - pos[1]]
+
+
+def _spawn_fits(from_, to, pos) -> bool:
+    x, y = pos_fortress[from_]
+    dx, dy = A_coordinate[from_][to]
+    return abs(x + dx * SPAWN_OFFSET - pos[0]) < 1e-6 and abs(y + dy * SPAWN_OFFSET - pos[1]) < 1e-6
+
+
+def _lane_fits(from_, to, pos) -> bool:
+    x, y = pos_fortress[from_]
+    dx, dy = A_coordinate[from_][to]
+    return abs((pos[0] - x) * dy - (pos[1] - y) * dx) <= LANE_HALF_WIDTH
+
+
+def view_is_mirrored(info) -> bool | None:
+    """
+    Whether the pawn positions in a controller's ``info`` are mirrored
+    relative to its fortress ids, i.e. whether the view was flipped for team 2.
+
+    A spawn point decides it exactly; a pawn in flight decides it when only
+    one of the two frames puts it in the lane of its edge. Returns None when
+    nothing on the board tells (no pawns, or only pawns on edges through the
+    centre, which are their own mirror image).
+    """
+    _, _, moving_pawns, spawning_pawns, _ = info
+    for _, _, _, from_, to, pos in spawning_pawns:
+        if _spawn_fits(from_, to, pos):
+            return False
+        if _spawn_fits(from_, to, _mirror(pos)):
+            return True
+    for _, _, from_, to, pos in moving_pawns:
+        direct, mirrored = _lane_fits(from_, to, pos), _lane_fits(from_, to, _mirror(pos))
+        if direct != mirrored:
+            return mirrored
+    return None
+
+
+class GameState:
+    """
+    The simulated part of a game: fortresses, spawn points, pawns in flight,
+    step counter and engine RNG, without controllers or rendering.
+
+    ``fork`` is O(1): the copy shares its containers with the original and
+    whichever of them is advanced first copies them (copy-on-write). Pawns
+    in flight are kept as ``EventGame`` does, as launch parameters plus an
+    arrival schedule, so ``play`` jumps over quiet steps like ``SkipGame``.
+
+    The rules are the engines' own methods, so a state taken from a game
+    with ``from_game`` and advanced with the commands the controllers
+    played reaches the same states as the game itself.
+    """
+
+    __slots__ = (
+        "state",
+        "spawning_pawns",
+        "flying",
+        "arrivals",
+        "moves",
+        "pawn_id",
+        "step",
+        "rng",
+        "done",
+        "isGameOver_loop",
+        "Blue_fortress",
+        "Red_fortress",
+        "win_team",
+        "wake",
+        "skipped",
+        "_shared",
+    )
+
+    deliver = GymGame.deliver
+    upgrade = GymGame.upgrade
+    order = GymGame.order
+    pawn_born = GymGame.pawn_born
+    pawn_over = GymGame.pawn_over
+    check_upgrade = GymGame.check_upgrade
+    CheckGameOver = GymGame.CheckGameOver
+    moving_pawns = EventGame.moving_pawns
+    launch = EventGame.launch
+    pawn_departure = EventGame.pawn_departure
+    pawn_move = EventGame.pawn_move
+    pawn_arrive = EventGame.pawn_arrive
+    next_event = SkipGame.next_event
+    skip_to = SkipGame.skip_to
+
+    def __init__(self, seed: int | None = None):
+        """Initial position, with the engine RNG seeded by ``seed``."""
+        self.state = [list(row) for row in initial_state]
+        self.spawning_pawns = []
+        # pawn id -> (team, kind, from_, to, x, y, vx, vy, moves at departure)
+        self.flying = {}
+        self.arrivals = defaultdict(list)
+        self.moves = 0
+        self.pawn_id = 0
+        self.step = 0
+        self.rng = random.Random(seed)
+        self.done = False
+        self.isGameOver_loop = False
+        self.Blue_fortress = 1
+        self.Red_fortress = 1
+        self.win_team = "Both"
+        self.wake = [0, 0]
+        self.skipped = 0
+        self._shared = False
+
+    @classmethod
+    def from_game(cls, game) -> "GameState":
+        """Snapshot of a running ``Game``, ``GymGame``, ``EventGame`` or ``SkipGame``."""
+        snapshot = cls.__new__(cls)
+        snapshot.state = [list(row) for row in game.state]
+        snapshot.spawning_pawns = [list(row) for row in game.spawning_pawns]
+        snapshot.step = game.step
+        snapshot.rng = _clone_rng(game.rng)
+        snapshot.done = game.done
+        snapshot.isGameOver_loop = game.isGameOver_loop
+        snapshot.Blue_fortress = game.Blue_fortress
+        snapshot.Red_fortress = game.Red_fortress
+        snapshot.win_team = game.win_team
+        snapshot.wake = [0, 0]
+        snapshot.skipped = 0
+        snapshot._shared = False
+        if isinstance(game, EventGame):
+            snapshot.flying = dict(game.flying)
+            snapshot.arrivals = defaultdict(
+                list, {m: list(ids) for m, ids in game.arrivals.items()}
+            )
+            snapshot.moves = game.moves
+            snapshot.pawn_id = game.pawn_id
+        else:
+            snapshot.flying = {}
+            snapshot.arrivals = defaultdict(list)
+            snapshot.moves = 0
+            snapshot.pawn_id = 0
+            for team, kind, from_, to, pos in game.moving_pawns:
+                snapshot.launch(team, kind, from_, to, list(pos))
+        return snapshot
+
+    @classmethod
+    def from_info(
+        cls, info, step: int = 0, mirrored: bool = False, seed: int | None = None
+    ) -> "GameState":
+        """
+        State as seen in a controller's ``info``, with that controller as team 1.
+
+        ``info`` does not carry the step counter or the engine RNG, so the
+        caller passes the step it has counted and the state draws its own
+        departure jitter from ``seed``. Pass ``mirrored`` from
+        ``view_is_mirrored`` so pawns are placed in the view's frame.
+        """
+        _, state, moving_pawns, spawning_pawns, done = info
+        snapshot = cls(seed)
+        snapshot.state = [list(row) for row in state]
+        snapshot.spawning_pawns = [
+            [team, kind, n, from_, to, _mirror(pos) if mirrored else list(pos)]
+            for team, kind, n, from_, to, pos in spawning_pawns
+        ]
+        snapshot.step = step
+        snapshot.done = done
+        for team, kind, from_, to, pos in moving_pawns:
+            snapshot.launch(team, kind, from_, to, _mirror(pos) if mirrored else list(pos))
+        snapshot.isGameOver_loop = snapshot.CheckGameOver()
+        return snapshot
+
+    def fork(self) -> "GameState":
+        """Independent copy of this state, in O(1)."""
+        child = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            setattr(child, name, getattr(self, name))
+        child.wake = list(self.wake)
+        self._shared = child._shared = True
+        return child
+
+    def _own(self):
+        """Copy the containers shared with a fork before mutating them."""
+        if not self._shared:
+            return
+        self.state = [list(row) for row in self.state]
+        self.spawning_pawns = [list(row) for row in self.spawning_pawns]
+        self.flying = dict(self.flying)
+        self.arrivals = defaultdict(list, {m: list(ids) for m, ids in self.arrivals.items()})
+        self.rng = _clone_rng(self.rng)
+        self._shared = False
+
+    @property
+    def over(self) -> bool:
+        """True once the game has ended (no further step would be simulated)."""
+        return self.isGameOver_loop or self.done or self.step >= STEPLIMIT
+
+    def info(self, team: int = 1):
+        """
+        ``info`` as the controller playing ``team`` would receive it (flipped for
+        team 2). Like the engines' own ``info``, it must be treated as read-only.
+        """
+        info = [team, self.state, self.moving_pawns, self.spawning_pawns, self.done]
+        return flip_board_view(info)
+
+    def _simulate_step(self, command_1, command_2):
+        """One step of ``GymGame.process_step`` with the given board-coordinate commands."""
+        self.pawn_move()
+        self.done = self.CheckGameOver() or self.step == STEPLIMIT - 1
+
+        self.order(1, *command_1)
+        self.order(2, *command_2)
+
+        self.pawn_departure()
+        self.pawn_born()
+        if self.step % 40 == 0:
+            self.pawn_over()
+
+        self.check_upgrade()
+
+        self.step += 1
+
+        if self.CheckGameOver():
+            self.isGameOver_loop = True
+
+    def play(self, command_1=WAIT, command_2=WAIT, n_steps: int = 1) -> bool:
+        """
+        Advance this state in place by up to ``n_steps`` steps.
+
+        ``command_1`` (Blue) and ``command_2`` (Red) are applied on the first
+        step, both in board coordinates (see ``to_board`` for a command taken
+        from a controller's own view). The following steps play
+        ``(0, 0, 0)`` for both sides, as for controllers that declared
+        ``n_steps - 1`` idle steps. Returns False if the game has ended.
+        """
+        if self.over:
+            return False
+        self._own()
+        end = min(self.step + n_steps, STEPLIMIT)
+        self.wake = [end, end]
+        self._simulate_step(command_1, command_2)
+        while self.step < end and not self.over:
+            self.skip_to(min(self.next_event(), end))
+            if self.step < end:
+                self._simulate_step(WAIT, WAIT)
+        return not self.over
+
+
+def advance(state: GameState, command_1, command_2, n_steps: int = 1) -> GameState:
+    """
+    Forward model: the state after playing ``command_1``/``command_2`` then
+    waiting, ``n_steps`` steps in total. ``state`` itself is left unchanged.
+    """
+    child = state.fork()
+    child.play(command_1, command_2, n_steps)
+    return child
+
+
+def to_board(command, team: int):
+    """Map a command from ``team``'s own view (as controllers return it) to board coordinates."""
+    if team == 1:
+        return command
+    command, subject, to = command
+    return command, swap_number_l[subject], swap_number_l[to]
@@ -3,8 +3,10 @@ import numpy as np
 from gymnasium import spaces
 
 from tcg.gym_game import GymGame
+from tcg.event_game import EventGame
+from tcg.features import Featurizer
 from tcg.controller import Controller
-from tcg.config import fortress_limit, A_fortress_set, n_fortress, A_coordinate
+from tcg.config import fortress_limit, A_fortress_set, n_fortress
 
 class GymController(Controller):
     """A controller that takes actions from an external source."""
@@ -27,10 +29,12 @@ class TCGEnv(gym.Env):
     """
     metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 30}
 
-    def __init__(self, opponent_class, render_mode=None):
+    def __init__(self, opponent_class, render_mode=None, event_driven=False):
         super().__init__()
         self.opponent_class = opponent_class
         self.render_mode = render_mode
+        # Schedule pawn arrivals instead of integrating positions (same results)
+        self.game_class = EventGame if event_driven else GymGame
         self.window = None
         self.clock = None
         
@@ -54,53 +58,13 @@ class TCGEnv(gym.Env):
 
         self.game = None
         self.gym_controller = None
+        self.featurizer = Featurizer()
 
     def _get_obs(self):
-        # 1. Fortress State (12 * 5)
-        # Normalize to help training stability
-        state_obs = []
-        for s in self.game.state:
-            # s: [team, kind, level, pawn_number, upgrade_time, neighbors]
-            # team: 0->0, 1->1 (Me), 2->-1 (Enemy)
-            # kind: 0-1 -> keep
-            # level: 1-5 -> scale by 0.2
-            # pawn_number: 0-N -> scale by 0.02 (50 pawns = 1.0)
-            # upgrade_time: -1 or 0-200 -> scale by 0.005 (200 steps = 1.0)
-            
-            team_val = 0.0
-            if s[0] == 1: team_val = 1.0
-            elif s[0] == 2: team_val = -1.0
-            
-            kind = float(s[1])
-            level = s[2] * 0.2
-            # Use log scale for pawns to handle large numbers (0-5000+)
-            # log(10) ~ 2.3, log(100) ~ 4.6, log(1000) ~ 6.9
-            # Scale by 0.1 to keep it around 0-1 range
-            pawns = np.log1p(s[3]) * 0.1
-            upgrade = s[4] * 0.005 if s[4] != -1 else -1.0
-            
-            state_obs.extend([team_val, kind, level, pawns, upgrade])
-        
-        # 2. Edge Traffic (12 * 12 * 2)
-        # Map moving pawns to edges
-        # Scale by 0.01 (100 pawns = 1.0)
-        edge_traffic = np.zeros((12, 12, 2), dtype=np.float32)
-        
-        for pawn in self.game.moving_pawns:
-            # pawn: [team, kind, from_, to, pos]
-            team = pawn[0]
-            from_ = pawn[2]
-            to = pawn[3]
-            
-            # Team 1 is index 0, Team 2 is index 1
-            team_idx = 0 if team == 1 else 1
-            
-            edge_traffic[from_][to][team_idx] += 0.01 # Count pawns (scaled)
-            
-        return np.concatenate([
-            np.array(state_obs, dtype=np.float32),
-            edge_traffic.flatten()
-        ])
+        # 60 fortress features + 288 edge-traffic features (see tcg.features).
+        # Copied because the featurizer reuses its buffer, and SB3 keeps the
+        # last observation of an episode as info["terminal_observation"].
+        return self.featurizer.observation(self.game.state, self.game.moving_pawns).copy()
 
     def action_masks(self):
         # 432 actions
@@ -108,68 +72,28 @@ class TCGEnv(gym.Env):
         # 1..143: Invalid (Wait duplicates)
         # 144..287: Move (Cmd 1)
         # 288..431: Upgrade (Cmd 2)
-        
-        mask = [False] * 432
-        mask[0] = True # Wait is always valid
-        
-        # Move: 144 + subject*12 + target
-        for s in range(12):
-            # Check ownership
-            if self.game.state[s][0] != 1: # Not mine
-                continue
-            
-            # Check pawns >= 2
-            if self.game.state[s][3] < 2:
-                continue
-                
-            for t in range(12):
-                # Check connection
-                if A_coordinate[s][t] != 0:
-                    idx = 144 + s * 12 + t
-                    mask[idx] = True
-                    
-        # Upgrade: 288 + subject*12 + target
-        # Only target=subject is valid for canonical upgrade
-        for s in range(12):
-             # Check ownership
-            if self.game.state[s][0] != 1:
-                continue
-            
-            # Check level < 5
-            level = self.game.state[s][2]
-            if level >= 5:
-                continue
-                
-            # Check cost
-            cost = fortress_limit[level] // 2
-            if self.game.state[s][3] < cost:
-                continue
-                
-            # Check not upgrading
-            if self.game.state[s][4] != -1:
-                continue
-                
-            # Enable for target=subject (canonical)
-            idx = 288 + s * 12 + s
-            mask[idx] = True
-            
-        return mask
+        # Copied because the featurizer reuses its buffer (see _get_obs)
+        return self.featurizer.action_mask(self.game.state).copy()
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         
         self.gym_controller = GymController()
         
-        # Select opponent
+        # Select opponent (from the env's own generator, seeded by reset(seed=...))
         if isinstance(self.opponent_class, list):
-            import random
-            opponent_cls = random.choice(self.opponent_class)
+            opponent_cls = self.opponent_class[self.np_random.integers(len(self.opponent_class))]
             opponent = opponent_cls()
         else:
             opponent = self.opponent_class()
         
         # Randomize sides? For now, Agent is always Player 1 (Blue/Bottom)
-        self.game = GymGame(self.gym_controller, opponent, window=(self.render_mode == "human"))
+        self.game = self.game_class(
+            self.gym_controller,
+            opponent,
+            window=(self.render_mode == "human"),
+            seed=int(self.np_random.integers(2**63)),
+        )
         
         # Initial observation
         return self._get_obs(), {}
@@ -274,14 +198,21 @@ class TCGEnv(gym.Env):
         return obs, reward, terminated, truncated, info
 
     def render(self):
-        if self.render_mode == "human" and self.game.window_enabled:
-            # The game draws itself in process_step if window is enabled
-            # But we need to handle the display update if we are controlling the loop
-            import pygame
-            pygame.display.update()
-            self.game.fps(30)
+        if self.render_mode == "human" and self.game.renderer is not None:
+            self.game.renderer.draw(self.game)
+            self.game.renderer.present(self.metadata["render_fps"])
+        elif self.render_mode == "rgb_array":
+            if self.window is None:
+                # Off-screen surface: pygame is only imported once a frame is requested
+                from tcg.render import Renderer
+
+                self.window = Renderer(window=False)
+            self.window.draw(self.game)
+            return self.window.rgb_array()
 
     def close(self):
         if self.window is not None:
-            import pygame
-            pygame.quit()
+            self.window.close()
+            self.window = None
+        elif self.game is not None and self.game.renderer is not None:
+            self.game.renderer.close()
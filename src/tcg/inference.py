@@ -0,0 +1,328 @@
+"""
+Batched inference for PPO players running in many games at once.
+
+A PPO player asks its policy for one action per ``update``, a forward pass
+on a batch of one that costs about as much as a batch of dozens. When many
+games run at once, the players' requests can share forward passes instead:
+
+- ``InferenceServer`` serves one policy to any number of threads. Requests
+  queue up; a batching thread takes the first, gathers more until
+  ``max_batch`` are waiting, every known client is waiting, or
+  ``max_wait`` seconds have passed, runs one masked forward pass and hands
+  each caller its action.
+- ``InferenceService`` runs those servers in a separate process for
+  processes: tournament workers (or any other processes) connect to it over
+  a local socket, and requests for the same checkpoint from all of them are
+  batched together. The service loads each checkpoint once, on its first
+  request, through ``tcg.model_store``.
+- ``policy_for(checkpoint)`` is what players call instead of loading a
+  model. If the checkpoint has an up-to-date export (``tcg.numpy_policy``)
+  it returns the exported ``NumpyPolicy``, which needs no torch; in a process
+  started with a service's ``environ()``, a client of the service;
+  otherwise the process's own shared policy. All have SB3's
+  ``predict(obs, action_masks=..., deterministic=True)``.
+
+Actions are the deterministic (masked argmax) actions ``predict`` returns.
+A batched matrix product can round differently from a single-row one, so an
+action can differ from the unbatched one where two actions' logits agree to
+within float rounding.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import get_context
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+import numpy as np
+
+from .numpy_policy import NumpyPolicy, current_export, export_path
+
+# Environment variables through which worker processes find the service
+ADDRESS_VARIABLE = "TCG_INFERENCE_ADDRESS"
+AUTHKEY_VARIABLE = "TCG_INFERENCE_AUTHKEY"
+
+# Defaults of the batching policy
+MAX_BATCH = 64
+MAX_WAIT = 0.002
+
+
+def masked_argmax(policy, observations: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Deterministic actions of ``policy`` for a batch, by the path ``predict`` takes."""
+    import torch
+
+    with torch.no_grad():
+        observations, _ = policy.obs_to_tensor(observations)
+        actions = policy._predict(observations, deterministic=True, action_masks=masks)
+    return actions.cpu().numpy()
+
+
+class InferenceServer:
+    """
+    One policy, evaluated in batches for concurrent callers.
+
+    ``clients`` is a callable returning how many callers can have a request
+    pending at once, if known; a batch is dispatched as soon as that many
+    are waiting, without waiting out ``max_wait``.
+    """
+
+    def __init__(
+        self, policy, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT, clients=None
+    ):
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.clients = clients
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, observation, mask) -> Future:
+        """Queue one request; the future's result is the action. No mask: all actions allowed."""
+        if mask is None:
+            mask = np.ones(self.policy.action_space.n, dtype=bool)
+        future = Future()
+        self._queue.put((np.asarray(observation), np.asarray(mask, dtype=bool), future))
+        return future
+
+    def predict(
+        self, observation, state=None, episode_start=None, deterministic=True, action_masks=None
+    ):
+        """``predict`` of the policy for one observation, evaluated in a shared batch."""
+        if not deterministic:
+            raise ValueError("the inference server only returns deterministic actions")
+        return np.array(self.submit(observation, action_masks).result()), state
+
+    def close(self):
+        """Stop the batching thread once the queued requests are answered."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _gather(self) -> tuple[list, bool]:
+        """The next batch of requests, and whether ``close`` was called."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        limit = self.max_batch
+        if self.clients is not None:
+            limit = max(1, min(limit, self.clients()))
+        while len(batch) < limit:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch, closing = self._gather()
+            if not batch:
+                continue
+            observations = np.stack([observation for observation, _, _ in batch])
+            masks = np.stack([mask for _, mask, _ in batch])
+            try:
+                actions = masked_argmax(self.policy, observations, masks).tolist()
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.requests += len(batch)
+            self.batches += 1
+            for (_, _, future), action in zip(batch, actions):
+                future.set_result(action)
+
+
+def _answer(connection, servers: dict, lock: threading.Lock, state: dict):
+    """Serve one connected process until it disconnects."""
+    try:
+        while True:
+            message = connection.recv()
+            if message is None:
+                state["closing"].set()
+                return
+            checkpoint, observation, mask = message
+            with lock:
+                server = servers.get(checkpoint)
+                if server is None:
+                    try:
+                        from .model_store import load_policy
+
+                        policy = load_policy(checkpoint)
+                    except Exception as e:
+                        connection.send(e)
+                        continue
+                    server = InferenceServer(
+                        policy,
+                        state["max_batch"],
+                        state["max_wait"],
+                        clients=lambda: state["clients"],
+                    )
+                    servers[checkpoint] = server
+            try:
+                connection.send(server.submit(observation, mask).result())
+            except Exception as e:
+                connection.send(e)
+    except (EOFError, OSError):
+        pass
+    finally:
+        with lock:
+            state["clients"] -= 1
+        connection.close()
+
+
+def _accept(listener, servers: dict, lock: threading.Lock, state: dict):
+    while True:
+        try:
+            connection = listener.accept()
+        except OSError:
+            if state["closing"].is_set():
+                return
+            continue
+        with lock:
+            state["clients"] += 1
+        threading.Thread(
+            target=_answer, args=(connection, servers, lock, state), daemon=True
+        ).start()
+
+
+def _serve(ready, authkey: bytes, max_batch: int, max_wait: float):
+    """Service process: answer connections until one sends ``None``."""
+    import torch
+
+    # One process answers for many: keep torch from oversubscribing the CPU
+    torch.set_num_threads(max(1, min(4, os.cpu_count() or 1)))
+    listener = Listener(authkey=authkey)
+    ready.send(listener.address)
+    ready.close()
+    servers = {}
+    lock = threading.Lock()
+    state = {
+        "clients": 0,
+        "closing": threading.Event(),
+        "max_batch": max_batch,
+        "max_wait": max_wait,
+    }
+    threading.Thread(target=_accept, args=(listener, servers, lock, state), daemon=True).start()
+    state["closing"].wait()
+    with lock:
+        for server in servers.values():
+            server.close()
+    listener.close()
+
+
+class InferenceService:
+    """
+    A process batching the PPO players' forward passes of other processes.
+
+    Start it before the worker processes and give them ``environ()``
+    (``os.environ.update`` before forking or spawning them is enough).
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+        self.authkey = os.urandom(16)
+        context = get_context("spawn")
+        ready, child_end = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_serve, args=(child_end, self.authkey, max_batch, max_wait), daemon=True
+        )
+        self.process.start()
+        child_end.close()
+        self.address = ready.recv()
+        ready.close()
+
+    def environ(self) -> dict[str, str]:
+        """Environment variables that make ``policy_for`` use this service."""
+        return {ADDRESS_VARIABLE: self.address, AUTHKEY_VARIABLE: self.authkey.hex()}
+
+    def close(self):
+        """Stop the service once the connected processes' requests are answered."""
+        if not self.process.is_alive():
+            return
+        try:
+            with Client(self.address, authkey=self.authkey) as connection:
+                connection.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+# Exported policies already loaded in this process, by file
+_exported = {}
+
+# This process's connection to the service, and the process it was opened in
+_connection = None
+_connection_pid = None
+
+
+class RemotePolicy:
+    """Client of an ``InferenceService`` for one checkpoint; ``predict`` like the policy's."""
+
+    def __init__(self, checkpoint):
+        self.checkpoint = os.path.abspath(checkpoint)
+
+    def predict(
+        self, observation, state=None, episode_start=None, deterministic=True, action_masks=None
+    ):
+        if not deterministic:
+            raise ValueError("the inference service only returns deterministic actions")
+        global _connection, _connection_pid
+        if _connection is None or _connection_pid != os.getpid():
+            # A forked child must not share its parent's socket
+            _connection = Client(
+                os.environ[ADDRESS_VARIABLE],
+                authkey=bytes.fromhex(os.environ[AUTHKEY_VARIABLE]),
+            )
+            _connection_pid = os.getpid()
+        _connection.send((self.checkpoint, np.asarray(observation), action_masks))
+        action = _connection.recv()
+        if isinstance(action, Exception):
+            raise action
+        return np.array(action), state
+
+
+def has_policy(checkpoint) -> bool:
+    """Whether ``policy_for(checkpoint)`` has a checkpoint or an export of it to load."""
+    checkpoint = Path(checkpoint)
+    zipped = checkpoint.with_name(checkpoint.name + ".zip")
+    return any(path.exists() for path in (checkpoint, zipped, export_path(checkpoint)))
+
+
+def policy_for(checkpoint):
+    """
+    What a PPO player should call ``predict`` on for ``checkpoint``: the
+    ``NumpyPolicy`` exported next to it, if it matches the checkpoint's
+    contents; else a client of the service this process was started for,
+    if any; else the process's shared policy from ``tcg.model_store``.
+    Only the last two import torch.
+    """
+    exported = current_export(checkpoint)
+    if exported is not None:
+        key = (os.path.abspath(exported), exported.stat().st_mtime_ns)
+        policy = _exported.get(key)
+        if policy is None:
+            policy = _exported[key] = NumpyPolicy(exported)
+        return policy
+    from .model_store import checkpoint_file, load_policy
+
+    if os.environ.get(ADDRESS_VARIABLE):
+        checkpoint = checkpoint_file(checkpoint)
+        if not checkpoint.exists():
+            raise FileNotFoundError(checkpoint)
+        return RemotePolicy(checkpoint)
+    return load_policy(checkpoint)
@@ -0,0 +1,201 @@
+"""
+Static map tables derived from ``tcg.config``, built once and cached on disk.
+
+Everything here depends only on the map and the rules, never on a game:
+
+- ``ARRIVAL_STEPS[kind, s, t]``: steps between a pawn of ``kind`` leaving the
+  spawn point of edge ``s -> t`` and its arrival at ``t``, replaying the
+  engine's own movement rule (``event_game.arrival_moves``) for a pawn in
+  the middle of its lane; ``ARRIVAL_STEPS_MIN`` / ``ARRIVAL_STEPS_MAX`` span
+  the departure jitter. ``-1`` where ``s`` and ``t`` are not connected.
+- ``EDGE_STEPS[s, t]``: ``ARRIVAL_STEPS`` for the kind of fortress ``s``
+  (fortress kinds never change), and ``SHORTEST_STEPS`` / ``NEXT_HOP``: the
+  all-pairs multi-hop shortest travel times over it and the first hop of a
+  shortest route.
+- ``FILL_STEPS[kind, level, n]``: steps a fortress needs to produce ``n``
+  pawns from a production tick; ``pawns_produced`` counts the ticks of any
+  step window exactly.
+- ``UPGRADE_PAYBACK[kind, level]``: steps from ordering an upgrade until the
+  upgraded fortress has out-produced an idle one by the upgrade cost.
+
+The tables are computed on first import and stored in an ``.npz`` file in
+``$TCG_CACHE_DIR`` (default ``~/.cache/tcg``) named after a hash of this
+module and ``config.py``, so editing either rebuilds them. A cache that
+cannot be read or written is ignored.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .config import (
+    A_coordinate,
+    fortress_cool,
+    fortress_limit,
+    initial_state,
+    n_fortress,
+    pos_fortress,
+)
+from .event_game import PAWN_SPEED, arrival_moves
+from .game_state import SPAWN_OFFSET
+
+# Departure jitter: a pawn starts up to this far either side of the lane centre
+JITTER = 5.0
+# Points sampled across the jitter band for the min / max tables
+JITTER_SAMPLES = 101
+# Steps an upgrade takes, from the order to the level change
+UPGRADE_STEPS = 200
+
+# Kind of each fortress, fixed for the whole game
+FORTRESS_KIND = np.array([row[1] for row in initial_state], dtype=np.int64)
+# Fortresses connected to each fortress
+NEIGHBOURS = tuple(tuple(row[5]) for row in initial_state)
+
+_SOURCES = ("config.py", "map_analytics.py", "event_game.py")
+_TABLES = (
+    "ARRIVAL_STEPS",
+    "ARRIVAL_STEPS_MIN",
+    "ARRIVAL_STEPS_MAX",
+    "EDGE_STEPS",
+    "SHORTEST_STEPS",
+    "NEXT_HOP",
+    "FILL_STEPS",
+    "UPGRADE_PAYBACK",
+)
+
+
+def _arrival_tables():
+    shape = (len(PAWN_SPEED), n_fortress, n_fortress)
+    centre = np.full(shape, -1, dtype=np.int64)
+    low = np.full(shape, -1, dtype=np.int64)
+    high = np.full(shape, -1, dtype=np.int64)
+    offsets = np.linspace(-0.5, 0.5, JITTER_SAMPLES) * 2 * JITTER
+    for s in range(n_fortress):
+        for t in range(n_fortress):
+            if A_coordinate[s][t] == 0:
+                continue
+            dx, dy = A_coordinate[s][t]
+            x, y = pos_fortress[s][0] + dx * SPAWN_OFFSET, pos_fortress[s][1] + dy * SPAWN_OFFSET
+            for kind, speed in enumerate(PAWN_SPEED):
+                velocity = (dx * speed, dy * speed)
+                # GymGame.pawn_departure shifts the start across the lane like this
+                steps = [
+                    arrival_moves([x + dy * r, y - dx * r], velocity, pos_fortress[t])
+                    for r in offsets
+                ]
+                centre[kind, s, t] = arrival_moves([x, y], velocity, pos_fortress[t])
+                low[kind, s, t] = min(steps)
+                high[kind, s, t] = max(steps)
+    return centre, low, high
+
+
+def _shortest_paths(edges):
+    """Floyd-Warshall over ``edges`` (``-1``: no edge); returns distances and next hops."""
+    unreachable = np.iinfo(np.int64).max // 4
+    dist = np.where(edges >= 0, edges, unreachable)
+    np.fill_diagonal(dist, 0)
+    next_hop = np.where(edges >= 0, np.arange(n_fortress)[None, :], -1)
+    np.fill_diagonal(next_hop, np.arange(n_fortress))
+    for k in range(n_fortress):
+        via = dist[:, k : k + 1] + dist[k : k + 1, :]
+        shorter = via < dist
+        dist = np.where(shorter, via, dist)
+        next_hop = np.where(shorter, next_hop[:, k : k + 1], next_hop)
+    return np.where(dist >= unreachable, -1, dist), next_hop
+
+
+def _upgrade_payback(kind: int, level: int) -> float:
+    if level + 1 >= len(fortress_limit):
+        return np.inf
+    cost = fortress_limit[level] // 2
+    old, new = fortress_cool[kind][level], fortress_cool[kind][level + 1]
+    if new >= old:
+        return np.inf  # never pays back (level 0 -> 1 does not speed production up)
+    # Ordered on step 0; production keeps the old rate until the level changes
+    gain = -cost
+    step = 0
+    while gain < 0:
+        step += 1
+        upgraded = new if step > UPGRADE_STEPS else old
+        gain += (step % upgraded == 0) - (step % old == 0)
+    return float(step)
+
+
+def _build() -> dict:
+    arrival, arrival_min, arrival_max = _arrival_tables()
+    edge_steps = arrival[FORTRESS_KIND, np.arange(n_fortress)]
+    shortest, next_hop = _shortest_paths(edge_steps)
+    pawns = np.arange(max(fortress_limit) + 1)
+    fill = np.array(fortress_cool, dtype=np.int64)[:, :, None] * pawns[None, None, :]
+    payback = np.array(
+        [[_upgrade_payback(k, lv) for lv in range(len(fortress_limit))] for k in range(2)]
+    )
+    return {
+        "ARRIVAL_STEPS": arrival,
+        "ARRIVAL_STEPS_MIN": arrival_min,
+        "ARRIVAL_STEPS_MAX": arrival_max,
+        "EDGE_STEPS": edge_steps,
+        "SHORTEST_STEPS": shortest,
+        "NEXT_HOP": next_hop,
+        "FILL_STEPS": fill,
+        "UPGRADE_PAYBACK": payback,
+    }
+
+
+def cache_path() -> Path:
+    """Cache file for the current sources."""
+    digest = hashlib.sha256()
+    here = Path(__file__).parent
+    for name in _SOURCES:
+        digest.update((here / name).read_bytes())
+    directory = Path(os.environ.get("TCG_CACHE_DIR", Path.home() / ".cache" / "tcg"))
+    return directory / f"map_analytics-{digest.hexdigest()[:16]}.npz"
+
+
+def load_tables() -> dict:
+    """The tables, from the disk cache when it is valid, else built (and cached)."""
+    path = cache_path()
+    try:
+        with np.load(path) as data:
+            if set(data.files) == set(_TABLES):
+                return {name: data[name] for name in _TABLES}
+    except (OSError, ValueError):
+        pass
+    tables = _build()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(f".{os.getpid()}.tmp.npz")
+        np.savez(partial, **tables)
+        os.replace(partial, path)
+    except OSError:
+        pass
+    return tables
+
+
+def pawns_produced(kind: int, level: int, step: int, steps: int) -> int:
+    """Production ticks of a (kind, level) fortress in steps ``step .. step + steps - 1``."""
+    cool = fortress_cool[kind][level]
+    return (step + steps - 1) // cool - (step - 1) // cool
+
+
+def route(from_id: int, to_id: int) -> list[int]:
+    """Fortresses on a shortest route from ``from_id`` to ``to_id``, both included."""
+    path = [from_id]
+    while path[-1] != to_id:
+        path.append(int(NEXT_HOP[path[-1], to_id]))
+    return path
+
+
+_tables = load_tables()
+for _name in _TABLES:
+    _tables[_name].flags.writeable = False
+ARRIVAL_STEPS = _tables["ARRIVAL_STEPS"]
+ARRIVAL_STEPS_MIN = _tables["ARRIVAL_STEPS_MIN"]
+ARRIVAL_STEPS_MAX = _tables["ARRIVAL_STEPS_MAX"]
+EDGE_STEPS = _tables["EDGE_STEPS"]
+SHORTEST_STEPS = _tables["SHORTEST_STEPS"]
+NEXT_HOP = _tables["NEXT_HOP"]
+FILL_STEPS = _tables["FILL_STEPS"]
+UPGRADE_PAYBACK = _tables["UPGRADE_PAYBACK"]
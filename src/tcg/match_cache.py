@@ -0,0 +1,112 @@
+"""
+On-disk cache of match results keyed by players, source hash and seed.
+
+Source hashes cover every tcg module a player's or the engine's code
+imports, directly or through other tcg modules (``tcg.players.import_closure``),
+so a change to any code a match runs through changes the key.
+"""
+
+import functools
+import hashlib
+import inspect
+import sqlite3
+from pathlib import Path
+
+from .players import import_closure
+
+# Engines tournament matches run on; their results are identical
+ENGINE_MODULES = ("tcg.game", "tcg.skip_game")
+
+RESULT_FIELDS = ("winner", "blue_fortresses", "red_fortresses", "steps")
+
+
+def _hash_files(digest, paths):
+    for path in sorted(paths):
+        digest.update(str(path.name).encode())
+        digest.update(path.read_bytes())
+
+
+def class_source_files(player_class) -> list[Path]:
+    """Files that define ``player_class``: its module, or its whole player package."""
+    path = Path(inspect.getfile(player_class)).resolve()
+    if path.name == "__init__.py" or path.parent.name.startswith("player_"):
+        # Directory-based player: code, models and data files all count
+        return [p for p in path.parent.rglob("*") if p.is_file() and "__pycache__" not in p.parts]
+    return [path]
+
+
+@functools.cache
+def source_hash(player_class) -> str:
+    """Hash of the files defining ``player_class`` and of the tcg modules they import."""
+    files = set(class_source_files(player_class))
+    files.update(path.resolve() for path in import_closure(player_class.__module__))
+    digest = hashlib.sha256()
+    _hash_files(digest, files)
+    return digest.hexdigest()
+
+
+@functools.cache
+def engine_hash() -> str:
+    """Hash of the engine sources: ``ENGINE_MODULES`` and the tcg modules they import."""
+    digest = hashlib.sha256()
+    _hash_files(digest, import_closure(*ENGINE_MODULES))
+    return digest.hexdigest()
+
+
+class MatchCache:
+    """
+    SQLite store of ``run_match`` results.
+
+    A key combines both controller classes, a hash of their source files
+    plus the engine sources (``engine_hash``) and the match seed, so any
+    source change makes old entries unreachable without explicit
+    invalidation. ``hits`` and ``misses`` count lookups since creation.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, winner TEXT, blue_fortresses INTEGER, "
+            "red_fortresses INTEGER, steps INTEGER)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.engine_hash = engine_hash()
+
+    def class_hash(self, player_class) -> str:
+        """Hash of the source files defining ``player_class``."""
+        return source_hash(player_class)
+
+    def key(self, player1_class, player2_class, seed: int) -> str:
+        parts = []
+        for player_class in (player1_class, player2_class):
+            name = f"{player_class.__module__}.{player_class.__qualname__}"
+            parts.append(f"{name}@{self.class_hash(player_class)}")
+        return "|".join(parts + [self.engine_hash, str(seed)])
+
+    def get(self, player1_class, player2_class, seed: int) -> dict | None:
+        """Stored result for this pairing and seed, or None."""
+        row = self.conn.execute(
+            f"SELECT {', '.join(RESULT_FIELDS)} FROM results WHERE key = ?",
+            (self.key(player1_class, player2_class, seed),),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(zip(RESULT_FIELDS, row))
+
+    def put(self, player1_class, player2_class, seed: int, result: dict):
+        """Store the result of a finished match."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+            (self.key(player1_class, player2_class, seed),)
+            + tuple(result[field] for field in RESULT_FIELDS),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
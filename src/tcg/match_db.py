@@ -0,0 +1,372 @@
+"""
+Indexed match database: SQLite metadata plus memory-mapped NumPy timelines.
+
+A database is a directory holding:
+
+- ``index.sqlite``: one ``matches`` row per match (players, classes and
+  source hashes, seed, engine and its hash, result, replay path and the
+  SHA-256 of its contents, where its timeline lives) and one ``captures``
+  row per change of a fortress's owner, with its exact step. The
+  ``results`` view lists every match once per player, from that player's
+  side (``outcome`` is win, loss or draw).
+- ``shards/NNNNNN/``: immutable columnar shards of per-step timelines,
+  one ``.npy`` file per column, opened with ``mmap_mode="r"``:
+  ``match`` and ``step`` (u4), and per fortress ``owner`` and ``level``
+  (u1) and ``pawns`` (u2, the garrison rounded down). A match's rows are
+  contiguous and sampled every ``interval`` steps, plus its final state.
+
+Matches are added from replays (``tcg.replay``): each is re-simulated
+once, step by step, so captures are exact even between samples. A replay
+is identified by its contents, so re-adding one is a no-op while a file
+overwritten by a later run is added as a new match. Queries are plain
+SQL; the analytics below scan the shards with NumPy and never
+re-simulate. Fortresses and teams are in board coordinates (team 1 is
+Blue) unless a ``player`` is given, in which case rows where that player
+was Red are mirrored so the player is always team 1 on the bottom side.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+
+from .config import swap_number_l
+from .game_state import WAIT
+from .replay import Replay
+
+# Steps between two timeline samples
+TIMELINE_INTERVAL = 10
+# Matches buffered in memory before they are written out as a shard
+SHARD_MATCHES = 256
+
+COLUMNS = ("match", "step", "owner", "level", "pawns")
+N_FORTRESSES = len(swap_number_l)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY, digest TEXT UNIQUE, replay TEXT, seed INTEGER,
+    engine TEXT, engine_hash TEXT,
+    blue TEXT, blue_class TEXT, blue_hash TEXT,
+    red TEXT, red_class TEXT, red_hash TEXT,
+    winner TEXT, blue_fortresses INTEGER, red_fortresses INTEGER, steps INTEGER,
+    shard INTEGER, row_start INTEGER, row_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS matches_blue ON matches (blue, red);
+CREATE INDEX IF NOT EXISTS matches_red ON matches (red, blue);
+CREATE INDEX IF NOT EXISTS matches_winner ON matches (winner);
+CREATE INDEX IF NOT EXISTS matches_seed ON matches (seed);
+CREATE TABLE IF NOT EXISTS captures (
+    match_id INTEGER, step INTEGER, fortress INTEGER, old_team INTEGER, new_team INTEGER
+);
+CREATE INDEX IF NOT EXISTS captures_fortress ON captures (fortress, match_id);
+CREATE INDEX IF NOT EXISTS captures_match ON captures (match_id);
+CREATE VIEW IF NOT EXISTS results AS
+    SELECT id AS match_id, blue AS player, blue_class AS player_class,
+        red AS opponent, red_class AS opponent_class, 'Blue' AS side,
+        CASE winner WHEN 'Blue' THEN 'win' WHEN 'Red' THEN 'loss' ELSE 'draw' END AS outcome,
+        blue_fortresses AS fortresses, red_fortresses AS opponent_fortresses, steps, seed
+    FROM matches
+    UNION ALL
+    SELECT id, red, red_class, blue, blue_class, 'Red',
+        CASE winner WHEN 'Red' THEN 'win' WHEN 'Blue' THEN 'loss' ELSE 'draw' END,
+        red_fortresses, blue_fortresses, steps, seed
+    FROM matches;
+"""
+
+
+def simulate(replay: Replay, interval: int = TIMELINE_INTERVAL):
+    """
+    Re-simulate ``replay`` step by step.
+
+    Returns its timeline columns (``COLUMNS`` except ``match``), sampled
+    every ``interval`` steps and at the end, and its captures as
+    ``(step, fortress, old_team, new_team)``.
+    """
+    played = {}
+    for step, team, command, subject, to in replay.commands.tolist():
+        played.setdefault(step, [WAIT, WAIT])[team - 1] = (command, subject, to)
+    state = replay.state_at(0)
+    owners = [row[0] for row in state.state]
+    steps, samples, captures = [], [], []
+    while True:
+        if state.step % interval == 0 or state.over or state.step >= replay.steps:
+            steps.append(state.step)
+            samples.append([(row[0], row[2], int(row[3])) for row in state.state])
+        if state.over or state.step >= replay.steps:
+            break
+        state.play(*played.get(state.step, (WAIT, WAIT)))
+        for fortress, row in enumerate(state.state):
+            if row[0] != owners[fortress]:
+                captures.append((state.step, fortress, owners[fortress], row[0]))
+                owners[fortress] = row[0]
+    samples = np.array(samples, dtype=np.int64).reshape(len(steps), N_FORTRESSES, 3)
+    timeline = {
+        "step": np.array(steps, dtype="<u4"),
+        "owner": samples[:, :, 0].astype("u1"),
+        "level": samples[:, :, 1].astype("u1"),
+        "pawns": np.minimum(samples[:, :, 2], np.iinfo("<u2").max).astype("<u2"),
+    }
+    return timeline, captures
+
+
+class MatchDB:
+    """
+    Match database in the directory ``path`` (created if needed).
+
+    ``add`` buffers a match's timeline and ``flush`` (also called every
+    ``SHARD_MATCHES`` matches and by ``close``) writes the buffer as a new
+    shard and commits. Use it as a context manager to flush on exit.
+    """
+
+    def __init__(self, path: str | Path, interval: int = TIMELINE_INTERVAL):
+        self.path = Path(path)
+        self.interval = interval
+        (self.path / "shards").mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path / "index.sqlite")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        # (match id, timeline) not yet written to a shard
+        self._pending = []
+        self._shards = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def add(
+        self, replay: Replay, replay_path: str | Path | None = None, digest: str | None = None
+    ) -> int:
+        """
+        Add the match recorded in ``replay``; returns its id.
+
+        ``digest`` is the SHA-256 of the replay file (computed if not given).
+        A replay already in the database is not added again.
+        """
+        if digest is None:
+            digest = hashlib.sha256(replay.to_bytes()).hexdigest()
+        if replay_path is not None:
+            replay_path = str(Path(replay_path).resolve())
+            # An older match saved at this path has been overwritten
+            self.conn.execute(
+                "UPDATE matches SET replay = NULL WHERE replay = ? AND digest != ?",
+                (replay_path, digest),
+            )
+        match_id = self._replay_id(digest)
+        if match_id is not None:
+            if replay_path is not None:
+                self.conn.execute(
+                    "UPDATE matches SET replay = ? WHERE id = ?", (replay_path, match_id)
+                )
+            return match_id
+        header = replay.header
+        blue, red = header["players"]
+        result = header["result"]
+        timeline, captures = simulate(replay, self.interval)
+        match_id = self.conn.execute(
+            "INSERT INTO matches (digest, replay, seed, engine, engine_hash, blue, blue_class, "
+            "blue_hash, red, red_class, red_hash, winner, blue_fortresses, red_fortresses, "
+            "steps) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                digest,
+                replay_path,
+                header["seed"],
+                header["engine"],
+                header.get("engine_hash"),
+                blue["team_name"],
+                blue["class"],
+                blue.get("code_hash"),
+                red["team_name"],
+                red["class"],
+                red.get("code_hash"),
+                result["winner"],
+                result["blue_fortresses"],
+                result["red_fortresses"],
+                result["steps"],
+            ),
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO captures VALUES (?, ?, ?, ?, ?)",
+            [(match_id, *capture) for capture in captures],
+        )
+        self._pending.append((match_id, timeline))
+        if len(self._pending) >= SHARD_MATCHES:
+            self.flush()
+        return match_id
+
+    def add_file(self, path: str | Path) -> int:
+        """Add the match of the replay file ``path``; replays already added are skipped."""
+        data = Path(path).read_bytes()
+        return self.add(Replay.from_bytes(data, path), path, hashlib.sha256(data).hexdigest())
+
+    def _replay_id(self, digest: str) -> int | None:
+        row = self.conn.execute("SELECT id FROM matches WHERE digest = ?", (digest,)).fetchone()
+        return None if row is None else row[0]
+
+    def flush(self):
+        """Write buffered timelines as a new shard and commit."""
+        if self._pending:
+            existing = [int(p.name) for p in (self.path / "shards").iterdir() if p.name.isdigit()]
+            shard = max(existing, default=-1) + 1
+            columns = {name: [] for name in COLUMNS}
+            row = 0
+            for match_id, timeline in self._pending:
+                count = len(timeline["step"])
+                columns["match"].append(np.full(count, match_id, dtype="<u4"))
+                for name in COLUMNS[1:]:
+                    columns[name].append(timeline[name])
+                self.conn.execute(
+                    "UPDATE matches SET shard = ?, row_start = ?, row_count = ? WHERE id = ?",
+                    (shard, row, count, match_id),
+                )
+                row += count
+            # Written under a temporary name so a shard directory is always complete
+            staging = self.path / "shards" / f"{shard:06d}.tmp"
+            staging.mkdir(exist_ok=True)
+            for name, parts in columns.items():
+                np.save(staging / f"{name}.npy", np.concatenate(parts))
+            staging.rename(self.path / "shards" / f"{shard:06d}")
+            self._pending = []
+        self.conn.commit()
+
+    def sql(self, query: str, params=()) -> list[tuple]:
+        """Rows of an SQL query over ``matches``, ``captures`` and ``results``."""
+        return self.conn.execute(query, params).fetchall()
+
+    def select(self, where: str = "1", params=()) -> list[int]:
+        """Ids of the matches satisfying an SQL condition on ``matches``."""
+        return [row[0] for row in self.sql(f"SELECT id FROM matches WHERE {where}", params)]
+
+    def shard(self, shard: int) -> dict[str, np.ndarray]:
+        """The columns of a shard, memory-mapped."""
+        if shard not in self._shards:
+            directory = self.path / "shards" / f"{shard:06d}"
+            self._shards[shard] = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+            }
+        return self._shards[shard]
+
+    def shards(self) -> list[int]:
+        self.flush()
+        return [row[0] for row in self.sql("SELECT DISTINCT shard FROM matches ORDER BY shard")]
+
+    def timeline(self, match_id: int) -> dict[str, np.ndarray]:
+        """The timeline of a match (``COLUMNS`` except ``match``), as views of its shard."""
+        self.flush()
+        row = self.conn.execute(
+            "SELECT shard, row_start, row_count FROM matches WHERE id = ?", (match_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"no match {match_id}")
+        shard, start, count = row
+        columns = self.shard(shard)
+        return {name: columns[name][start : start + count] for name in COLUMNS[1:]}
+
+    def _lookup(self, column: str, params=()) -> np.ndarray:
+        """Per-match values of an SQL expression on ``matches``, indexed by match id."""
+        rows = self.sql(f"SELECT id, {column} FROM matches", params)
+        table = np.zeros(max((i for i, _ in rows), default=0) + 1, dtype=np.int64)
+        if rows:
+            ids, values = np.array(rows, dtype=np.int64).T
+            table[ids] = values
+        return table
+
+    def _side_of(self, player: str | None) -> np.ndarray | None:
+        """Per match id: 1 if ``player`` was Blue, 2 if Red, 0 if absent (None without a player)."""
+        if player is None:
+            return None
+        return self._lookup(
+            "CASE WHEN blue = :player OR blue_class = :player THEN 1 "
+            "WHEN red = :player OR red_class = :player THEN 2 ELSE 0 END",
+            {"player": player},
+        )
+
+    def scan(self, match_ids=None, player: str | None = None):
+        """
+        Yield the timeline rows of the selected matches, shard by shard, as
+        ``(match, step, owner, level, pawns)`` arrays. With ``player``,
+        only its matches, seen from its side.
+        """
+        selected = None if match_ids is None else np.asarray(list(match_ids), dtype=np.int64)
+        side = self._side_of(player)
+        for shard in self.shards():
+            columns = self.shard(shard)
+            match = np.asarray(columns["match"], dtype=np.int64)
+            rows = np.ones(len(match), dtype=bool)
+            if selected is not None:
+                rows &= np.isin(match, selected)
+            if side is not None:
+                rows &= side[match] > 0
+            if not rows.any():
+                continue
+            match = match[rows]
+            owner = columns["owner"][rows]
+            level = columns["level"][rows]
+            pawns = columns["pawns"][rows]
+            if side is not None:
+                red = side[match] == 2
+                owner[red] = _swap_teams(owner[red][:, swap_number_l])
+                level[red] = level[red][:, swap_number_l]
+                pawns[red] = pawns[red][:, swap_number_l]
+            yield match, columns["step"][rows], owner, level, pawns
+
+    def ownership_heatmap(self, match_ids=None, player: str | None = None, bins: int = 20):
+        """
+        Share of timeline samples in which each team owns each fortress, by
+        stage of the match: ``heatmap[team, bin, fortress]`` with team 0
+        (neutral), 1 and 2 and ``bins`` equal fractions of each match's length.
+        """
+        steps = self._lookup("steps")
+        counts = np.zeros(3 * bins * N_FORTRESSES, dtype=np.int64)
+        fortress = np.arange(N_FORTRESSES)
+        for match, step, owner, _, _ in self.scan(match_ids, player):
+            stage = np.minimum(step * bins // np.maximum(steps[match], 1), bins - 1)
+            index = (owner.astype(np.int64) * bins + stage[:, None]) * N_FORTRESSES + fortress
+            counts += np.bincount(index.ravel(), minlength=len(counts))
+        counts = counts.reshape(3, bins, N_FORTRESSES)
+        total = counts.sum(axis=0, keepdims=True)
+        return counts / np.maximum(total, 1)
+
+    def mean_garrison(self, match_ids=None, player: str | None = None, bins: int = 20):
+        """Mean garrison of each fortress by stage of the match: ``garrison[bin, fortress]``."""
+        steps = self._lookup("steps")
+        sums = np.zeros((bins, N_FORTRESSES))
+        counts = np.zeros(bins)
+        for match, step, _, _, pawns in self.scan(match_ids, player):
+            stage = np.minimum(step * bins // np.maximum(steps[match], 1), bins - 1)
+            for fortress in range(N_FORTRESSES):
+                sums[:, fortress] += np.bincount(stage, pawns[:, fortress], minlength=bins)
+            counts += np.bincount(stage, minlength=bins)
+        return sums / np.maximum(counts, 1)[:, None]
+
+    def capture_steps(
+        self, match_ids=None, fortress: int | None = None, player: str | None = None
+    ) -> np.ndarray:
+        """
+        Steps of the captures in the selected matches (of ``fortress`` only,
+        if given). With ``player``, only the captures it made in its
+        matches, ``fortress`` being seen from its side.
+        """
+        rows = self.sql("SELECT match_id, step, fortress, new_team FROM captures")
+        match, step, captured, team = np.array(rows, dtype=np.int64).reshape(-1, 4).T
+        keep = np.ones(len(match), dtype=bool)
+        if match_ids is not None:
+            keep &= np.isin(match, np.asarray(list(match_ids), dtype=np.int64))
+        side = self._side_of(player)
+        if side is not None:
+            keep &= team == side[match]
+            captured = np.where(side[match] == 2, np.asarray(swap_number_l)[captured], captured)
+        if fortress is not None:
+            keep &= captured == fortress
+        return step[keep]
+
+
+def _swap_teams(owner: np.ndarray) -> np.ndarray:
+    """Exchange teams 1 and 2 in an array of owners."""
+    return np.where(owner == 0, 0, 3 - owner.astype(np.int64)).astype(owner.dtype)
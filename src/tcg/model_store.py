@@ -0,0 +1,189 @@
+"""
+Load-once store of trained MaskablePPO policies, shared between processes.
+
+``MaskablePPO.load`` unzips the checkpoint, unpickles the spaces and the
+optimizer state and builds a full algorithm object, and a player that
+calls it in ``__init__`` pays that for every match or episode, in every
+worker. ``load_policy(path)`` instead returns the checkpoint's policy
+network, with the same ``predict(obs, action_masks=..., deterministic=...)``
+as the model:
+
+- The first call for a checkpoint on a machine extracts the policy's
+  weights into a flat file in ``$TCG_CACHE_DIR/models`` (default
+  ``~/.cache/tcg/models``), with a JSON index of tensor offsets and the
+  policy's construction arguments. Extraction is the only step that reads
+  the zip.
+- The first call in a process memory-maps that file and builds the policy
+  with its parameters viewing the mapping. The pages are the OS page
+  cache's, so every process using a checkpoint (forked or spawned
+  ``SubprocVecEnv`` and tournament workers) shares one copy of the weights.
+  The mapping is copy-on-write and the parameters never change, so no page
+  is ever copied.
+- Later calls in the process return the same policy: constructing a
+  player is a dictionary lookup.
+
+Extracted files are named after the checkpoint's path, size and
+modification time, so retraining into the same path extracts again.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import torch
+from gymnasium import spaces
+from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
+
+from .numpy_policy import checkpoint_file
+
+# Byte alignment of each tensor in the weights file
+ALIGNMENT = 64
+# Bumped when the file layout changes
+STORE_VERSION = 1
+
+# Policies already built in this process, by checkpoint key
+_policies = {}
+
+
+def store_dir() -> Path:
+    """Directory of the extracted weight files."""
+    return Path(os.environ.get("TCG_CACHE_DIR", Path.home() / ".cache" / "tcg")) / "models"
+
+
+def _key(path: Path) -> str:
+    stat = os.stat(path)
+    digest = hashlib.sha256(
+        f"{STORE_VERSION}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+    )
+    return f"{path.stem}-{digest.hexdigest()[:16]}"
+
+
+def _policy_arguments(data: dict) -> dict:
+    """JSON form of what building the checkpoint's policy needs besides its weights."""
+    kwargs = dict(data.get("policy_kwargs", {}))
+    activation = kwargs.pop("activation_fn", torch.nn.Tanh)
+    for name, value in kwargs.items():
+        try:
+            json.dumps(value)
+        except TypeError:
+            raise ValueError(f"unsupported policy argument {name}={value!r}") from None
+    observation_space, action_space = data["observation_space"], data["action_space"]
+    if not isinstance(observation_space, spaces.Box) or not isinstance(
+        action_space, spaces.Discrete
+    ):
+        raise ValueError("only Box observations and Discrete actions are supported")
+    return {
+        "policy_kwargs": kwargs,
+        "activation_fn": activation.__name__,
+        "observation_shape": list(observation_space.shape),
+        "observation_dtype": np.dtype(observation_space.dtype).str,
+        "n_actions": int(action_space.n),
+    }
+
+
+def extract(checkpoint: str | Path) -> Path:
+    """
+    Extract the policy weights of ``checkpoint`` (a MaskablePPO ``.zip``)
+    into the store, unless already there, and return the weights file.
+    """
+    checkpoint = checkpoint_file(checkpoint)
+    weights = store_dir() / f"{_key(checkpoint)}.bin"
+    if weights.exists() and weights.with_suffix(".json").exists():
+        return weights
+
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    data, params, _ = load_from_zip_file(checkpoint, device="cpu", load_data=True)
+    index = _policy_arguments(data)
+    observation_space = data["observation_space"]
+    tensors = {name: tensor.numpy() for name, tensor in params["policy"].items()}
+    tensors["observation_space.low"] = np.asarray(observation_space.low)
+    tensors["observation_space.high"] = np.asarray(observation_space.high)
+
+    entries = []
+    offset = 0
+    for name, array in tensors.items():
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        entries.append(
+            {"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        )
+        offset += array.nbytes
+    index["tensors"] = entries
+
+    weights.parent.mkdir(parents=True, exist_ok=True)
+    partial = weights.with_suffix(f".{os.getpid()}.tmp")
+    buffer = np.zeros(max(offset, 1), dtype=np.uint8)
+    for entry, array in zip(entries, tensors.values()):
+        start = entry["offset"]
+        buffer[start : start + array.nbytes] = np.ascontiguousarray(array).view(np.uint8).ravel()
+    buffer.tofile(partial)
+    os.replace(partial, weights)
+    partial = weights.with_suffix(f".{os.getpid()}.tmp.json")
+    partial.write_text(json.dumps(index), encoding="utf-8")
+    os.replace(partial, weights.with_suffix(".json"))
+    return weights
+
+
+def open_weights(weights: Path) -> tuple[dict, dict[str, np.ndarray]]:
+    """The index of an extracted weights file and its tensors, as views of a shared mapping."""
+    index = json.loads(weights.with_suffix(".json").read_text(encoding="utf-8"))
+    # Copy-on-write so that torch accepts the views; nothing ever writes to them
+    mapping = np.memmap(weights, dtype=np.uint8, mode="c")
+    tensors = {}
+    for entry in index["tensors"]:
+        dtype = np.dtype(entry["dtype"])
+        count = int(np.prod(entry["shape"], dtype=np.int64))
+        start = entry["offset"]
+        tensors[entry["name"]] = (
+            mapping[start : start + count * dtype.itemsize].view(dtype).reshape(entry["shape"])
+        )
+    return index, tensors
+
+
+def _build_policy(index: dict, tensors: dict[str, np.ndarray]) -> MaskableActorCriticPolicy:
+    observation_space = spaces.Box(
+        low=np.array(tensors["observation_space.low"]),
+        high=np.array(tensors["observation_space.high"]),
+        shape=tuple(index["observation_shape"]),
+        dtype=np.dtype(index["observation_dtype"]),
+    )
+    policy = MaskableActorCriticPolicy(
+        observation_space,
+        spaces.Discrete(index["n_actions"]),
+        lr_schedule=lambda _: 0.0,
+        activation_fn=getattr(torch.nn, index["activation_fn"]),
+        # The initial weights are replaced right away; skip the costly orthogonal init
+        **{**index["policy_kwargs"], "ortho_init": False},
+    )
+    # Point every parameter at the mapping instead of copying into it
+    members = dict(policy.named_parameters())
+    members.update(policy.named_buffers())
+    stored = {name for name in tensors if not name.startswith("observation_space.")}
+    if stored != set(members):
+        raise ValueError("stored weights do not match the policy's parameters")
+    for name, member in members.items():
+        member.requires_grad_(False)
+        member.data = torch.from_numpy(tensors[name])
+    # The optimizer holds references to the freshly initialised parameters
+    policy.optimizer = None
+    policy.set_training_mode(False)
+    return policy
+
+
+def load_policy(checkpoint: str | Path) -> MaskableActorCriticPolicy:
+    """
+    The policy of ``checkpoint``, shared by every caller in the process
+    and, through the weights file, by every process.
+
+    ``predict`` on it matches ``MaskablePPO.load(checkpoint).predict``.
+    The policy is read-only: do not train it.
+    """
+    checkpoint = checkpoint_file(checkpoint)
+    key = _key(checkpoint)
+    policy = _policies.get(key)
+    if policy is None:
+        policy = _build_policy(*open_weights(extract(checkpoint)))
+        _policies[key] = policy
+    return policy
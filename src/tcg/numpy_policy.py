@@ -0,0 +1,261 @@
+"""
+Torch-free deterministic play for trained MaskablePPO policies.
+
+A PPO player only needs its policy's actor, a small MLP, to pick an action,
+but ``MaskablePPO.load`` imports torch and stable-baselines3 to get it.
+``export(checkpoint)`` writes the actor of a MaskablePPO ``.zip`` to an
+``.npz`` next to it (hidden layers, action layer, activation, the
+``net_arch`` they came from, the SHA-256 of the checkpoint); ``NumpyPolicy``
+plays from that file with NumPy alone. ``current_export(checkpoint)`` only
+returns the export while it matches the checkpoint's contents, so a
+checkpoint retrained in place is not shadowed by its old export.
+
+``NumpyPolicy.predict`` has SB3's signature and, for deterministic play,
+its result: it computes the logits in float32 and then repeats the
+masked distribution's arithmetic (normalise, mask to ``-1e8``, normalise
+again, softmax, first maximum), so ties and near-ties resolve the same
+way. The matrix products themselves come from a different BLAS and can
+differ in the last bits; ``verify`` compares the two on a corpus of
+observations and reports how close the top two logits came.
+
+Only the export needs torch. Exported files hold float32 weights and are a
+small fraction of the size of the checkpoint, which also stores the value
+network and the optimizer state.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Bumped when the file layout changes
+FORMAT_VERSION = 1
+# Logit sb3_contrib's MaskableCategorical gives masked actions
+MASKED_LOGIT = np.float32(-1e8)
+
+
+def _tanh(x, out):
+    return np.tanh(x, out=out)
+
+
+def _relu(x, out):
+    return np.maximum(x, 0, out=out)
+
+
+ACTIVATIONS = {"Tanh": _tanh, "ReLU": _relu}
+
+# SHA-256 of checkpoints already hashed in this process, by (path, size, mtime)
+_digests = {}
+
+
+def export_path(checkpoint: str | Path) -> Path:
+    """Where ``export`` writes the actor of ``checkpoint``: the same name, ``.npz``."""
+    checkpoint = Path(checkpoint)
+    if checkpoint.suffix == ".zip":
+        return checkpoint.with_suffix(".npz")
+    return checkpoint.with_name(checkpoint.name + ".npz")
+
+
+def checkpoint_file(checkpoint: str | Path) -> Path:
+    """``checkpoint``, or ``checkpoint.zip`` if only that exists, as ``MaskablePPO.load`` allows."""
+    checkpoint = Path(checkpoint)
+    if not checkpoint.exists() and checkpoint.with_name(checkpoint.name + ".zip").exists():
+        return checkpoint.with_name(checkpoint.name + ".zip")
+    return checkpoint
+
+
+def checkpoint_digest(checkpoint: str | Path) -> str:
+    """SHA-256 of the checkpoint file's contents."""
+    checkpoint = checkpoint_file(checkpoint)
+    stat = os.stat(checkpoint)
+    key = (os.path.abspath(checkpoint), stat.st_size, stat.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        digest = _digests[key] = hashlib.sha256(checkpoint.read_bytes()).hexdigest()
+    return digest
+
+
+def current_export(checkpoint: str | Path) -> Path | None:
+    """
+    ``export_path(checkpoint)`` if it holds the actor of the checkpoint as it
+    is now, or the export is there without the checkpoint; else ``None``.
+    """
+    exported = export_path(checkpoint)
+    if not exported.exists():
+        return None
+    if not checkpoint_file(checkpoint).exists():
+        return exported
+    with np.load(exported) as data:
+        if "checkpoint_sha256" not in data:
+            return None
+        source = str(data["checkpoint_sha256"])
+    return exported if source == checkpoint_digest(checkpoint) else None
+
+
+def export(checkpoint: str | Path, path: str | Path | None = None) -> Path:
+    """
+    Write the actor of the MaskablePPO ``checkpoint`` to ``path`` (default
+    ``export_path(checkpoint)``) and return the path. Needs torch.
+    """
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    checkpoint = checkpoint_file(checkpoint)
+    data, params, _ = load_from_zip_file(checkpoint, device="cpu", load_data=True)
+    state = {name: tensor.numpy() for name, tensor in params["policy"].items()}
+    kwargs = data.get("policy_kwargs", {})
+    activation = kwargs.get("activation_fn")
+    activation = "Tanh" if activation is None else activation.__name__
+    if activation not in ACTIVATIONS:
+        raise ValueError(f"unsupported activation {activation}")
+    observation_shape = data["observation_space"].shape
+    if len(observation_shape) != 1:
+        raise ValueError("only flat observations are supported")
+
+    # The actor: mlp_extractor.policy_net is Linear / activation pairs, then action_net
+    prefix = "mlp_extractor.policy_net."
+    indices = sorted(
+        int(name[len(prefix) :].split(".")[0])
+        for name in state
+        if name.startswith(prefix) and name.endswith(".weight")
+    )
+    arrays = {}
+    for layer, index in enumerate(indices):
+        arrays[f"hidden{layer}.weight"] = state[f"{prefix}{index}.weight"].astype(np.float32)
+        arrays[f"hidden{layer}.bias"] = state[f"{prefix}{index}.bias"].astype(np.float32)
+    arrays["action.weight"] = state["action_net.weight"].astype(np.float32)
+    arrays["action.bias"] = state["action_net.bias"].astype(np.float32)
+
+    path = export_path(checkpoint) if path is None else Path(path)
+    np.savez_compressed(
+        path,
+        format_version=np.array(FORMAT_VERSION),
+        activation=np.array(activation),
+        net_arch=np.array([arrays[f"hidden{i}.bias"].size for i in range(len(indices))]),
+        net_arch_json=np.array(json.dumps(kwargs.get("net_arch"))),
+        observation_size=np.array(observation_shape[0]),
+        n_actions=np.array(int(data["action_space"].n)),
+        checkpoint_sha256=np.array(checkpoint_digest(checkpoint)),
+        **arrays,
+    )
+    return path
+
+
+def _log_softmax(x: np.ndarray) -> np.ndarray:
+    """``x - logsumexp(x)`` along the last axis, computed as torch does."""
+    top = x.max(axis=-1, keepdims=True)
+    return x - (top + np.log(np.exp(x - top).sum(axis=-1, keepdims=True)))
+
+
+def _masked_mode(logits: np.ndarray, masks: np.ndarray | None) -> np.ndarray:
+    """
+    ``MaskableCategorical(logits).apply_masking(masks)`` followed by
+    ``argmax(probs)``, step by step in float32.
+    """
+    normalized = _log_softmax(logits)
+    if masks is not None:
+        normalized = _log_softmax(np.where(masks, normalized, MASKED_LOGIT))
+    top = normalized.max(axis=-1, keepdims=True)
+    weights = np.exp(normalized - top)
+    probs = weights / weights.sum(axis=-1, keepdims=True)
+    return probs.argmax(axis=-1)
+
+
+class NumpyPolicy:
+    """
+    An exported actor, playing deterministically with NumPy.
+
+    Single observations run through buffers allocated once; ``act_batch``
+    evaluates many observations with one matrix product per layer.
+    """
+
+    def __init__(self, path: str | Path):
+        with np.load(path) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported format {int(data['format_version'])}")
+            self.net_arch = [int(size) for size in data["net_arch"]]
+            self.activation = str(data["activation"])
+            self.observation_size = int(data["observation_size"])
+            self.n_actions = int(data["n_actions"])
+            names = [f"hidden{i}" for i in range(len(self.net_arch))] + ["action"]
+            self.weights = [np.ascontiguousarray(data[f"{name}.weight"]) for name in names]
+            self.biases = [np.ascontiguousarray(data[f"{name}.bias"]) for name in names]
+        self._activate = ACTIVATIONS[self.activation]
+        self._input = np.empty(self.observation_size, dtype=np.float32)
+        self._outputs = [np.empty(bias.size, dtype=np.float32) for bias in self.biases]
+
+    def logits(self, observation) -> np.ndarray:
+        """Action logits for one observation (a buffer, overwritten by the next call)."""
+        np.copyto(self._input, observation, casting="unsafe")
+        x = self._input
+        last = len(self.weights) - 1
+        for layer, (weight, bias, out) in enumerate(zip(self.weights, self.biases, self._outputs)):
+            np.dot(weight, x, out=out)
+            np.add(out, bias, out=out)
+            if layer < last:
+                self._activate(out, out)
+            x = out
+        return x
+
+    def logits_batch(self, observations) -> np.ndarray:
+        """Action logits, shape ``(B, n_actions)``, for ``(B, observation_size)`` observations."""
+        x = np.asarray(observations, dtype=np.float32)
+        last = len(self.weights) - 1
+        for layer, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = x @ weight.T
+            x += bias
+            if layer < last:
+                self._activate(x, x)
+        return x
+
+    def act(self, observation, mask=None) -> int:
+        """Deterministic action for one observation; ``mask`` marks the allowed actions."""
+        return int(_masked_mode(self.logits(observation), mask))
+
+    def act_batch(self, observations, masks=None) -> np.ndarray:
+        """Deterministic actions for a batch of observations and masks."""
+        return _masked_mode(self.logits_batch(observations), masks)
+
+    def predict(
+        self, observation, state=None, episode_start=None, deterministic=True, action_masks=None
+    ):
+        """SB3's ``predict``, for one observation or a batch; deterministic only."""
+        if not deterministic:
+            raise ValueError("NumpyPolicy only plays deterministically")
+        observation = np.asarray(observation)
+        if observation.ndim == 1:
+            return np.array(self.act(observation, action_masks)), state
+        return self.act_batch(observation, action_masks), state
+
+
+def verify(checkpoint, policy: NumpyPolicy, observations, masks) -> dict:
+    """
+    Compare ``policy`` with ``MaskablePPO.load(checkpoint).predict`` on a
+    corpus, one observation at a time as the players call it and as one
+    batch. Needs torch.
+
+    Returns the number of observations, the mismatches of each path, and
+    the smallest gap between the two highest allowed logits (how far the
+    corpus is from a decision that rounding could flip).
+    """
+    from sb3_contrib import MaskablePPO
+
+    model = MaskablePPO.load(checkpoint, device="cpu")
+    single = batched = 0
+    expected = []
+    for observation, mask in zip(observations, masks):
+        action = int(model.predict(observation, action_masks=mask, deterministic=True)[0])
+        expected.append(action)
+        single += action != policy.act(observation, mask)
+    batched = int((policy.act_batch(observations, masks) != np.array(expected)).sum())
+    logits = np.where(masks, policy.logits_batch(observations), -np.inf)
+    top2 = np.sort(logits, axis=1)[:, -2:]
+    gaps = top2[:, 1] - top2[:, 0]
+    gaps = gaps[np.isfinite(gaps)]
+    return {
+        "observations": len(expected),
+        "mismatches": int(single),
+        "batch_mismatches": batched,
+        "min_logit_gap": float(gaps.min()) if gaps.size else float("inf"),
+    }
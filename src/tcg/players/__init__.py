@@ -1,81 +1,473 @@
 """
 AI Players Module
 
-This module automatically discovers and imports all player classes
-from Python files in this directory.
+This module automatically discovers all player classes from Python files in
+this directory.
 
 To add a new player:
 1. Create a new file (e.g., player_yourname.py)
 2. Define a class that inherits from Controller
 3. Implement team_name() and update() methods
 4. Your player will be automatically discovered
+
+Discovery is static: ``scan_players()`` reads the player modules with
+``ast`` instead of importing them, and returns a ``PlayerEntry`` per player
+with its class, its team name and the heavy packages (``torch``,
+``sb3_contrib``, ...) importing it would pull in, counting imports that
+its functions (or those of the ``tcg`` modules it uses) make when called. A player's module is
+imported only by ``PlayerEntry.load()``, so a bracket of heuristic players
+never imports the machine-learning stack.
+
+The scan of each file is kept in a JSON manifest in ``$TCG_CACHE_DIR``
+(default ``~/.cache/tcg``) and redone only for files whose size or
+modification time changed. A manifest that cannot be read or written is
+ignored.
 """
 
+import ast
 import importlib
-import inspect
+import json
+import os
 from pathlib import Path
+from typing import NamedTuple
 
 from ..controller import Controller
 
+# Packages whose import costs seconds; reported per player
+HEAVY_PACKAGES = ("torch", "sb3_contrib", "stable_baselines3", "gym", "gymnasium", "pygame")
+# Bumped when the per-file records change shape
+MANIFEST_VERSION = 2
 
-def discover_players() -> list[type[Controller]]:
+_CONTROLLER = "tcg.controller:Controller"
+# Imported by the engines only to draw a window, which players never need
+_RENDER = "tcg.render"
+_PLAYERS_DIR = Path(__file__).parent
+# Result of the last scan in this process
+_entries = None
+# Directory holding the tcg package, where absolute tcg.* imports are resolved
+_SOURCE_ROOT = _PLAYERS_DIR.parents[1]
+
+
+class PlayerEntry(NamedTuple):
     """
-    Automatically discover all Controller subclasses in this directory.
+    One discovered player, known without importing its module.
 
-    Supports both single-file players (player_*.py) and directory-based players (player_*/).
+    ``team_name`` is what ``team_name()`` returns, read from the source: a
+    string the method returns, or the first string ``__init__`` assigns to
+    the attribute it returns (the name a model-backed player reports when
+    its model loads). ``None`` if the source does not say; ``team_name()``
+    then needs an instance.
+    """
 
-    Returns:
-        List of Controller subclass types found in player files
+    module: str
+    class_name: str
+    team_name: str | None
+    heavy: tuple[str, ...]
+
+    @property
+    def path(self) -> str:
+        """``"module:class"``, as the tournament's worker processes import classes."""
+        return f"{self.module}:{self.class_name}"
+
+    def load(self) -> type[Controller]:
+        """Import the player's module and return the class."""
+        return getattr(importlib.import_module(self.module), self.class_name)
+
+
+def _module_file(module: str) -> Path | None:
+    """Source file of a ``tcg`` module or package, ``None`` for anything else."""
+    if module.split(".")[0] != "tcg":
+        return None
+    base = _SOURCE_ROOT.joinpath(*module.split("."))
+    for path in (base.with_suffix(".py"), base / "__init__.py"):
+        if path.is_file():
+            return path
+    return None
+
+
+def _absolute(module: str, is_package: bool, level: int, name: str | None) -> str:
+    """Absolute module named by ``from <level dots><name> import``."""
+    if level == 0:
+        return name
+    parts = module.split(".")
+    if not is_package:
+        parts = parts[:-1]
+    if level > 1:
+        parts = parts[: -(level - 1)]
+    return ".".join(parts + ([name] if name else []))
+
+
+def _returned_team_name(node: ast.ClassDef) -> tuple[bool, str | None]:
+    """Whether ``node`` defines ``team_name``, and the name if the source fixes it."""
+    methods = {
+        item.name: item
+        for item in node.body
+        if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+    method = methods.get("team_name")
+    if method is None:
+        return False, None
+    returns = [n for n in ast.walk(method) if isinstance(n, ast.Return)]
+    if len(returns) != 1 or returns[0].value is None:
+        return True, None
+    value = returns[0].value
+    if isinstance(value, ast.Constant) and isinstance(value.value, str):
+        return True, value.value
+    if (
+        isinstance(value, ast.Attribute)
+        and isinstance(value.value, ast.Name)
+        and value.value.id == "self"
+        and "__init__" in methods
+    ):
+        assigned = sorted(
+            (n.lineno, n.value.value)
+            for n in ast.walk(methods["__init__"])
+            if isinstance(n, ast.Assign)
+            and isinstance(n.value, ast.Constant)
+            and isinstance(n.value.value, str)
+            and any(
+                isinstance(t, ast.Attribute)
+                and isinstance(t.value, ast.Name)
+                and t.value.id == "self"
+                and t.attr == value.attr
+                for t in n.targets
+            )
+        )
+        if assigned:
+            return True, assigned[0][1]
+    return True, None
+
+
+def _scan_file(module: str, path: Path) -> dict:
     """
-    players = []
-    current_dir = Path(__file__).parent
+    What discovery needs from one module: the modules it imports, at module
+    level or inside functions, what its module-level imported names refer
+    to, and its classes with their bases and team names.
+    """
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+    is_package = path.name == "__init__.py"
+    imports = []
+    # Local name -> "module" (a module) or "module:name" (a name in a module)
+    bindings = {}
+    # Module-level statements, including those nested in if/try blocks
+    body = list(tree.body)
+    statements = []
+    while body:
+        node = body.pop(0)
+        statements.append(node)
+        if isinstance(node, (ast.If, ast.Try, ast.With)):
+            body[:0] = [
+                child
+                for field in ("body", "orelse", "finalbody", "handlers")
+                for child in getattr(node, field, [])
+            ]
+        elif isinstance(node, ast.ExceptHandler):
+            body[:0] = node.body
 
-    # 1. Find all Python files except __init__.py and template
-    for file_path in current_dir.glob("*.py"):
-        if file_path.name in ["__init__.py", "template_player.py"]:
+    classes = []
+    for node in statements:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(alias.name)
+                if alias.asname:
+                    bindings[alias.asname] = alias.name
+                else:
+                    top = alias.name.split(".")[0]
+                    bindings[top] = top
+        elif isinstance(node, ast.ImportFrom):
+            source = _absolute(module, is_package, node.level, node.module)
+            imports.append(source)
+            for alias in node.names:
+                submodule = f"{source}.{alias.name}"
+                if _module_file(submodule) is not None:
+                    imports.append(submodule)
+                    bindings[alias.asname or alias.name] = submodule
+                else:
+                    bindings[alias.asname or alias.name] = f"{source}:{alias.name}"
+        elif isinstance(node, ast.ClassDef):
+            bases = []
+            for base in node.bases:
+                if isinstance(base, ast.Name):
+                    bases.append(bindings.get(base.id, f"{module}:{base.id}"))
+                elif isinstance(base, ast.Attribute) and isinstance(base.value, ast.Name):
+                    owner = bindings.get(base.value.id)
+                    if owner is not None and ":" not in owner:
+                        bases.append(f"{owner}:{base.attr}")
+            defines, team_name = _returned_team_name(node)
+            classes.append(
+                {
+                    "name": node.name,
+                    "bases": bases,
+                    "defines_team_name": defines,
+                    "team_name": team_name,
+                }
+            )
+            bindings[node.name] = f"{module}:{node.name}"
+
+    # Imports deferred into functions (as tcg.inference defers torch) run once called
+    top_level = {id(node) for node in statements}
+    for node in ast.walk(tree):
+        if id(node) in top_level:
             continue
+        if isinstance(node, ast.Import):
+            imports.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            source = _absolute(module, is_package, node.level, node.module)
+            imports.append(source)
+            for alias in node.names:
+                if _module_file(f"{source}.{alias.name}") is not None:
+                    imports.append(f"{source}.{alias.name}")
+    return {"imports": imports, "bindings": bindings, "classes": classes}
 
-        # Import the module
-        module_name = f"tcg.players.{file_path.stem}"
-        try:
-            module = importlib.import_module(module_name)
 
-            # Find all Controller subclasses in the module
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, Controller) and obj is not Controller:
-                    players.append(obj)
-        except Exception as e:
-            print(f"Warning: Failed to load {file_path.name}: {e}")
+class _Scanner:
+    """Per-file scans for one discovery pass, reusing the manifest's valid ones."""
+
+    def __init__(self, manifest: dict):
+        self.manifest = manifest
+        self.records = {}
+        self.player_memo = {}
+        self.heavy_memo = {}
+
+    def record(self, module: str) -> dict | None:
+        if module in self.records:
+            return self.records[module]
+        path = _module_file(module)
+        record = None
+        if path is not None:
+            stat = path.stat()
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            cached = self.manifest.get(module)
+            if cached is not None and cached["stamp"] == stamp:
+                record = cached
+            else:
+                try:
+                    record = {"stamp": stamp, **_scan_file(module, path)}
+                except (OSError, SyntaxError, ValueError) as e:
+                    print(f"Warning: Failed to scan {path.name}: {e}")
+                if record is not None:
+                    self.manifest[module] = record
+        self.records[module] = record
+        return record
+
+    def resolve(self, ref: str, depth: int = 0) -> tuple[str, dict] | None:
+        """The class ``"module:name"`` refers to, following re-exports."""
+        module, _, name = ref.partition(":")
+        record = self.record(module)
+        if record is None or depth > 10:
+            return None
+        for cls in record["classes"]:
+            if cls["name"] == name:
+                return ref, cls
+        target = record["bindings"].get(name)
+        if target is None or ":" not in target:
+            return None
+        return self.resolve(target, depth + 1)
+
+    def is_player(self, ref: str) -> bool:
+        """Whether ``ref`` is a Controller subclass (Controller itself excluded)."""
+        if ref in self.player_memo:
+            return self.player_memo[ref]
+        self.player_memo[ref] = False  # guards against cyclic bases
+        resolved = self.resolve(ref)
+        result = resolved is not None and any(
+            base == _CONTROLLER or self.is_player(base) for base in resolved[1]["bases"]
+        )
+        self.player_memo[ref] = result
+        return result
+
+    def team_name(self, ref: str, depth: int = 0) -> str | None:
+        resolved = self.resolve(ref)
+        if resolved is None or depth > 10:
+            return None
+        cls = resolved[1]
+        if cls["defines_team_name"]:
+            return cls["team_name"]
+        for base in cls["bases"]:
+            if base != _CONTROLLER and self.is_player(base):
+                return self.team_name(base, depth + 1)
+        return None
+
+    def walk(self, module: str) -> tuple[set[str], set[str]]:
+        """
+        The tcg modules, and the heavy packages, that importing ``module``
+        reaches directly or through tcg modules.
+        """
+        seen = set()
+        modules = set()
+        found = set()
+        parts = module.split(".")
+        stack = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+        while stack:
+            current = stack.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            if current == _RENDER:
+                continue
+            top = current.split(".")[0]
+            if top in HEAVY_PACKAGES:
+                found.add(top)
+                continue
+            record = self.record(current)
+            if record is None:
+                continue
+            modules.add(current)
+            for imported in record["imports"]:
+                names = imported.split(".")
+                # Importing a.b.c imports a and a.b first
+                stack.extend(".".join(names[:i]) for i in range(1, len(names) + 1))
+        return modules, found
+
+    def heavy(self, module: str) -> tuple[str, ...]:
+        """Heavy packages imported, directly or through tcg modules, by importing ``module``."""
+        return tuple(sorted(self.walk(module)[1]))
+
+
+def manifest_path() -> Path:
+    """Manifest file of the player scan."""
+    directory = Path(os.environ.get("TCG_CACHE_DIR", Path.home() / ".cache" / "tcg"))
+    return directory / "players-manifest.json"
 
-    # 2. Find all directories starting with "player_"
-    for dir_path in current_dir.iterdir():
+
+def _read_manifest() -> dict:
+    try:
+        with open(manifest_path(), encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION and data.get("root") == str(_SOURCE_ROOT):
+            return data["modules"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+
+def _write_manifest(modules: dict):
+    path = manifest_path()
+    data = {"version": MANIFEST_VERSION, "root": str(_SOURCE_ROOT), "modules": modules}
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        partial.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(partial, path)
+    except OSError:
+        pass
+
+
+def _player_modules() -> list[str]:
+    """Modules discovery looks into, in discovery order: files, then player_* packages."""
+    modules = []
+    for file_path in _PLAYERS_DIR.glob("*.py"):
+        if file_path.name in ["__init__.py", "template_player.py"]:
+            continue
+        modules.append(f"tcg.players.{file_path.stem}")
+    for dir_path in _PLAYERS_DIR.iterdir():
         if not dir_path.is_dir():
             continue
         if not dir_path.name.startswith("player_"):
             continue
         if dir_path.name == "__pycache__":
             continue
-
-        # Check if __init__.py exists
-        init_file = dir_path / "__init__.py"
-        if not init_file.exists():
+        if not (dir_path / "__init__.py").exists():
             print(f"Warning: {dir_path.name}/ has no __init__.py, skipping")
             continue
+        modules.append(f"tcg.players.{dir_path.name}")
+    return modules
 
-        # Import the package
-        module_name = f"tcg.players.{dir_path.name}"
-        try:
-            module = importlib.import_module(module_name)
 
-            # Find all Controller subclasses in the module
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, Controller) and obj is not Controller:
-                    players.append(obj)
-        except Exception as e:
-            print(f"Warning: Failed to load {dir_path.name}/: {e}")
+def scan_players(refresh: bool = False) -> list[PlayerEntry]:
+    """
+    Every player in this directory, without importing any of them.
+
+    A module contributes the Controller subclasses it defines or imports
+    (a ``player_*`` package exports its players from ``__init__.py``), in
+    name order; a class found in several modules is listed once, under the
+    module that defines it. The result is kept for the rest of the process
+    unless ``refresh`` is set.
+    """
+    global _entries
+    if _entries is not None and not refresh:
+        return list(_entries)
+    manifest = _read_manifest()
+    stamps = {module: record["stamp"] for module, record in manifest.items()}
+    scanner = _Scanner(manifest)
+    entries = []
+    seen = set()
+    for module in _player_modules():
+        record = scanner.record(module)
+        if record is None:
+            continue
+        names = {cls["name"]: f"{module}:{cls['name']}" for cls in record["classes"]}
+        for name, target in record["bindings"].items():
+            if ":" in target:
+                names.setdefault(name, target)
+        for name in sorted(names):
+            resolved = scanner.resolve(names[name])
+            if resolved is None or resolved[0] in seen or not scanner.is_player(resolved[0]):
+                continue
+            ref = resolved[0]
+            seen.add(ref)
+            defining_module, _, class_name = ref.partition(":")
+            entries.append(
+                PlayerEntry(
+                    defining_module,
+                    class_name,
+                    scanner.team_name(ref),
+                    scanner.heavy(defining_module),
+                )
+            )
+    if {module: record["stamp"] for module, record in manifest.items()} != stamps:
+        _write_manifest(manifest)
+    _entries = entries
+    return list(entries)
+
+
+def import_closure(*modules: str) -> list[Path]:
+    """
+    Source files of the tcg modules importing ``modules`` runs, directly or
+    through other tcg modules (the code their behaviour depends on).
+    """
+    manifest = _read_manifest()
+    stamps = {module: record["stamp"] for module, record in manifest.items()}
+    scanner = _Scanner(manifest)
+    reached = set()
+    for module in modules:
+        reached |= scanner.walk(module)[0]
+    if {module: record["stamp"] for module, record in manifest.items()} != stamps:
+        _write_manifest(manifest)
+    return sorted(_module_file(module) for module in reached)
 
+
+def team_name(player_class: type[Controller]) -> str:
+    """
+    ``player_class``'s team name: the one its source fixes, else that of a
+    new instance.
+    """
+    for entry in scan_players():
+        if entry.module == player_class.__module__ and entry.class_name == player_class.__name__:
+            if entry.team_name is not None:
+                return entry.team_name
+            break
+    return player_class().team_name()
+
+
+def discover_players() -> list[type[Controller]]:
+    """
+    Automatically discover all Controller subclasses in this directory.
+
+    Supports both single-file players (player_*.py) and directory-based players (player_*/).
+    Imports every player's module; ``scan_players()`` lists them without importing.
+
+    Returns:
+        List of Controller subclass types found in player files
+    """
+    players = []
+    for entry in scan_players():
+        try:
+            players.append(entry.load())
+        except Exception as e:
+            print(f"Warning: Failed to load {entry.module}: {e}")
     return players
 
 
-# Export the discovery function
-__all__ = ["discover_players"]
+# Export the discovery functions
+__all__ = ["PlayerEntry", "discover_players", "import_closure", "scan_players", "team_name"]
@@ -1,8 +1,9 @@
 
 import random
-import math
+from tcg.board_analysis import analyze
 from tcg.controller import Controller
-from tcg.config import fortress_limit, pos_fortress, fortress_cool
+from tcg.capture import TRAVEL_STEPS
+from tcg.config import fortress_limit, fortress_cool
 
 class AntiMLPlayer(Controller):
     """
@@ -37,11 +38,7 @@ class AntiMLPlayer(Controller):
             return self.FORTRESS_IMPORTANCE_LOWER[fort_id]
 
     def estimate_travel_steps(self, from_id, to_id):
-        p1 = pos_fortress[from_id]
-        p2 = pos_fortress[to_id]
-        dist = math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
-        travel_dist = max(0, dist - 87)
-        return int(travel_dist / 1.5)
+        return TRAVEL_STEPS[from_id][to_id]
 
     def predict_future_pawns(self, fort_id, steps, state):
         team, kind, level, pawn_number, upgrade_timer, _ = state[fort_id]
@@ -77,13 +74,8 @@ class AntiMLPlayer(Controller):
         team_id, state, moving_pawns, spawning_pawns, done = info
         
         # Determine my side
-        upper_count = sum(1 for i in [0, 1, 2] if state[i][0] == 1)
-        lower_count = sum(1 for i in [9, 10, 11] if state[i][0] == 1)
-        
-        if upper_count > lower_count:
-            my_side = "upper"
-        else:
-            my_side = "lower"
+        board = analyze(info)
+        my_side = board.home
             
         # --- Aggressive Snipe & Anti-Upgrade Logic ---
         my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
@@ -169,7 +161,7 @@ class AntiMLPlayer(Controller):
                 
                 # Reinforce front line
                 allies = [n for n in neighbors if state[n][0] == 1]
-                front_line = [a for a in allies if any(state[n][0] == 2 for n in state[a][5])]
+                front_line = [a for a in allies if board.enemy_neighbors[a]]
                 if front_line:
                     return 1, i, front_line[0]
 
@@ -5,6 +5,7 @@ AI Player
 Claudeが作りました
 """
 
+from tcg.board_analysis import analyze
 from tcg.config import fortress_cool, fortress_limit
 from tcg.controller import Controller
 
@@ -92,10 +93,11 @@ class ClaudePlayer(Controller):
         # 優先度付きアクションリスト
         actions = []
 
-        # 自分の要塞と敵の要塞を分類
-        my_fortresses = [i for i in range(12) if state[i][0] == 1]
-        enemy_fortresses = [i for i in range(12) if state[i][0] == 2]
-        neutral_fortresses = [i for i in range(12) if state[i][0] == 0]
+        # 自分の要塞と敵の要塞を分類（盤面の集計は同じステップの呼び出し間で共有される）
+        board = analyze(info)
+        my_fortresses = board.mine
+        enemy_fortresses = board.enemy
+        enemy_counts = board.enemy_neighbors
 
         # === 序盤戦略: 中立要塞の制圧を最優先 ===
         if phase == "early":
@@ -174,7 +176,7 @@ class ClaudePlayer(Controller):
                 level = state[my_fort][2]
                 importance = self.FORTRESS_IMPORTANCE[my_fort]
                 # 敵に隣接している要塞は優先的にアップグレード
-                enemy_neighbors = self.count_enemy_neighbors(my_fort, state)
+                enemy_neighbors = enemy_counts[my_fort]
 
                 if (state[my_fort][4] == -1 and
                     level <= 4 and
@@ -184,15 +186,7 @@ class ClaudePlayer(Controller):
 
         # === 防御支援 ===
         # 攻撃されている要塞を検出
-        under_attack = {}
-        for pawn in moving_pawns:
-            pawn_team, kind, from_, to, pos = pawn
-            if pawn_team == 2 and state[to][0] == 1:
-                if to not in under_attack:
-                    under_attack[to] = 0
-                under_attack[to] += 1
-
-        for target_fort, threat_level in under_attack.items():
+        for target_fort, threat_level in board.threats.items():
             # 脅威が大きい場合は優先度を上げる
             neighbors = state[target_fort][5]
             for my_fort in neighbors:
@@ -204,7 +198,7 @@ class ClaudePlayer(Controller):
         # 後方の安全な要塞から前線へ部隊を送る
         for my_fort in my_fortresses:
             level = state[my_fort][2]
-            enemy_neighbors = self.count_enemy_neighbors(my_fort, state)
+            enemy_neighbors = enemy_counts[my_fort]
 
             # 敵に隣接していない要塞で部隊が溜まっている場合
             if enemy_neighbors == 0 and state[my_fort][3] >= fortress_limit[level] * 0.7:
@@ -212,7 +206,7 @@ class ClaudePlayer(Controller):
                 # 前線の味方要塞を探す
                 for neighbor in neighbors:
                     if state[neighbor][0] == 1:
-                        neighbor_enemy_count = self.count_enemy_neighbors(neighbor, state)
+                        neighbor_enemy_count = enemy_counts[neighbor]
                         if neighbor_enemy_count > 0:
                             priority = 50 + neighbor_enemy_count * 5
                             actions.append((priority, 1, my_fort, neighbor))
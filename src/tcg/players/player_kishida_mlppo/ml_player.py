@@ -1,19 +1,21 @@
 from pathlib import Path
-from sb3_contrib import MaskablePPO
-from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
 from tcg.controller import Controller
-from tcg.config import fortress_limit, A_coordinate, swap_number_l
+from tcg.config import swap_number_l
+from tcg.features import Featurizer
+from tcg.inference import has_policy, policy_for
 from tcg.utils import flip_board_view
-import numpy as np
 
 class MLPlayer(Controller):
     """
     AI Player using a trained MaskablePPO model.
     """
-    _cached_model = None
-    _cached_model_path = None
+    # Decide at the cadence the model was trained at: the training envs repeat each
+    # action for 40 steps (tcg.cadence)
+    decision_interval = 40
+    repeat_command = True
 
     def __init__(self, model_path=None):
+        self.featurizer = Featurizer()
         if model_path is None:
             # Default path relative to project root
             # This file is in src/tcg/players/player_ml/ml_player.py
@@ -26,29 +28,14 @@ class MLPlayer(Controller):
             model_path = tcg_dir / "tcg_ppo_finetuned.zip"
         
         # Check if model exists
-        if not model_path.exists():
+        if not has_policy(model_path):
              print(f"Warning: Model file not found at {model_path}")
         
-        # Use cached model if available and path matches
-        if MLPlayer._cached_model is not None and MLPlayer._cached_model_path == model_path:
-            self.model = MLPlayer._cached_model
-            self.team = "ML_PPO"
-            return
-
-        # Fix for loading issue: explicitly set policy_class
+        # Shared, load-once policy; torch-free if exported, batched if a service runs
         try:
-            self.model = MaskablePPO.load(
-                model_path, 
-                custom_objects={
-                    "policy_class": MaskableActorCriticPolicy,
-                }
-            )
+            self.model = policy_for(model_path)
             self.team = "ML_PPO"
             
-            # Cache the model
-            MLPlayer._cached_model = self.model
-            MLPlayer._cached_model_path = model_path
-            
         except Exception as e:
             print(f"Error loading model: {e}")
             # Create a dummy model or raise error?
@@ -59,41 +46,6 @@ class MLPlayer(Controller):
     def team_name(self) -> str:
         return self.team
 
-    def action_masks(self, state):
-        # state is from flipped_info, so My Team is always 1
-        mask = [False] * 432
-        mask[0] = True
-        
-        for s in range(12):
-            # Check ownership (My team is 1)
-            if state[s][0] != 1:
-                continue
-            
-            # Check pawns >= 2
-            if state[s][3] < 2:
-                continue
-                
-            for t in range(12):
-                if A_coordinate[s][t] != 0:
-                    idx = 144 + s * 12 + t
-                    mask[idx] = True
-                    
-        for s in range(12):
-            if state[s][0] != 1:
-                continue
-            level = state[s][2]
-            if level >= 5:
-                continue
-            cost = fortress_limit[level] // 2
-            if state[s][3] < cost:
-                continue
-            if state[s][4] != -1:
-                continue
-            idx = 288 + s * 12 + s
-            mask[idx] = True
-            
-        return mask
-
     def update(self, info):
         # info: [team_id, state, moving_pawns, spawning_pawns, done]
         original_team_id = info[0]
@@ -102,42 +54,8 @@ class MLPlayer(Controller):
         flipped_info = flip_board_view(info)
         _, state, moving_pawns, _, _ = flipped_info
         
-        # Construct Observation
-        state_obs = []
-        for s in state:
-            # Normalize to match training environment
-            # team: 0->0, 1->1 (Me), 2->-1 (Enemy)
-            team_val = 0.0
-            if s[0] == 1: team_val = 1.0
-            elif s[0] == 2: team_val = -1.0
-            
-            kind = float(s[1])
-            level = s[2] * 0.2
-            # Use log scale for pawns
-            pawns = np.log1p(s[3]) * 0.1
-            upgrade = s[4] * 0.005 if s[4] != -1 else -1.0
-            
-            state_obs.extend([team_val, kind, level, pawns, upgrade])
-            
-        edge_traffic = np.zeros((12, 12, 2), dtype=np.float32)
-        for pawn in moving_pawns:
-            # pawn: [team, kind, from_, to, pos]
-            team = pawn[0]
-            from_ = pawn[2]
-            to = pawn[3]
-            
-            # Team 1 is index 0, Team 2 is index 1
-            team_idx = 0 if team == 1 else 1
-            
-            edge_traffic[from_][to][team_idx] += 0.01 # Scale by 0.01
-            
-        obs = np.concatenate([
-            np.array(state_obs, dtype=np.float32),
-            edge_traffic.flatten()
-        ])
-        
-        # Get mask
-        mask = self.action_masks(state)
+        # Construct observation and mask (matches the training environment)
+        obs, mask = self.featurizer.encode(state, moving_pawns)
         
         # Predict action
         action, _states = self.model.predict(obs, action_masks=mask, deterministic=True)
@@ -5,8 +5,6 @@ Sample AI Player: RandomPlayer
 参考用のサンプル実装
 """
 
-import random
-
 from tcg.config import fortress_limit
 from tcg.controller import Controller
 
@@ -25,13 +23,13 @@ class RandomPlayer(Controller):
         self.team, self.state, self.moving_pawns, self.spawning_pawns, self.done = info
         self.step += 1
 
-        subject = random.randint(0, 11)
-        command = random.randint(0, 2)
-        to = random.choice(self.state[subject][5])
+        subject = self.rng.randint(0, 11)
+        command = self.rng.randint(0, 2)
+        to = self.rng.choice(self.state[subject][5])
 
         if self.state[subject][3] >= fortress_limit[self.state[subject][2]] // 2:
             if (
-                random.random()
+                self.rng.random()
                 < (self.state[subject][3] / fortress_limit[self.state[subject][2]] - 0.5) / 3
             ):
                 pass
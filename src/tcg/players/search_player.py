@@ -0,0 +1,114 @@
+"""
+Monte Carlo Search Player
+
+ロールアウト（先読みシミュレーション）で手を選ぶ探索型AIプレイヤー
+"""
+
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from tcg.controller import Controller
+from tcg.features import Featurizer, decode_action
+from tcg.game_state import WAIT, GameState, view_is_mirrored
+
+# クラスではなくモジュールを import する（自動検出で ClaudePlayer が二重登録されないように）
+from tcg.players import claude_player
+from tcg.profiling import Histogram, LatencyStats
+from tcg.search import RolloutSearch
+
+
+class MonteCarloPlayer(Controller):
+    """
+    Monte Carlo 探索プレイヤー
+
+    - 普段は ClaudePlayer（基本方針）の手をそのまま打つ
+    - SEARCH_INTERVAL ステップごとに、打てる全ての手を候補として
+      「その手を打ち、その後は両軍とも基本方針で horizon ステップ進める」
+      ロールアウトを持ち時間いっぱい繰り返し、最も有望な手に差し替える
+    - ロールアウトは WORKERS 個のプロセスで並列に行う（プロセスは使い回す）
+    - 探索1回ごとの所要時間を記録し、search_stats() で確認できる
+    """
+
+    SEARCH_INTERVAL = 50  # 何ステップごとに探索するか
+    TIME_BUDGET = 0.02  # 探索1回あたりの持ち時間（秒）
+    HORIZON = 1000  # ロールアウトで先読みするステップ数
+    ROLLOUT_INTERVAL = 25  # ロールアウト中に基本方針へ手を聞く間隔（ステップ）
+    WORKERS = None  # 並列プロセス数。None なら CPU コア数（トーナメントの並列ワーカー内では 1）
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.step = 0
+        self.policy = claude_player.ClaudePlayer()
+        self.featurizer = Featurizer()
+        # team 2 の視点では駒の座標だけ反転していない。どちら側かは盤面から一度だけ判定する
+        self.mirrored = None
+        self.searcher = None
+        self.latency = Histogram(precision=8)
+        self.rollouts = 0
+
+    def team_name(self) -> str:
+        return "MonteCarlo"
+
+    def set_rng(self, rng) -> None:
+        super().set_rng(rng)
+        self.policy.set_rng(rng)
+
+    def _workers(self) -> int:
+        if self.WORKERS is not None:
+            return self.WORKERS
+        # 試合自体が並列実行のワーカープロセス内なら、さらにプロセスを増やさない
+        if multiprocessing.parent_process() is not None:
+            return 1
+        return os.cpu_count() or 1
+
+    def update(self, info) -> tuple[int, int, int]:
+        step = self.step
+        self.step += 1
+        # 基本方針は毎ステップ呼び、内部状態を実際の試合に合わせておく
+        command = self.policy.update(info)
+        if step % self.SEARCH_INTERVAL or info[4]:
+            return command
+
+        if self.mirrored is None:
+            self.mirrored = view_is_mirrored(info)
+        if self.searcher is None:
+            policy = type(self.policy)
+            self.searcher = RolloutSearch(
+                (policy, policy),
+                budget=self.TIME_BUDGET,
+                horizon=self.HORIZON,
+                interval=self.ROLLOUT_INTERVAL,
+                workers=self._workers(),
+                seed=self.rng.getrandbits(64),
+            )
+
+        # 候補: 基本方針の手、待機、その他の打てる手
+        candidates = [tuple(command), WAIT]
+        for action in np.flatnonzero(self.featurizer.action_mask(info[1])):
+            candidate = decode_action(int(action))
+            if candidate not in candidates:
+                candidates.append(candidate)
+
+        start = time.perf_counter_ns()
+        snapshot = GameState.from_info(
+            info, step, bool(self.mirrored), seed=self.rng.getrandbits(64)
+        )
+        command = self.searcher.search(snapshot, candidates)
+        self.latency.add(time.perf_counter_ns() - start)
+        self.rollouts += self.searcher.rollouts
+        return command
+
+    def search_stats(self) -> dict:
+        """探索1回あたりの所要時間（p50/p95/最大）とロールアウト数"""
+        stats = LatencyStats(self.latency, matches=1).to_dict()
+        calls = stats.pop("calls")
+        del stats["cpu_per_match_s"], stats["over_budget"]
+        return {
+            "searches": calls,
+            **stats,
+            "rollouts_per_search": self.rollouts / calls if calls else 0.0,
+            "workers": self.searcher.workers if self.searcher else self._workers(),
+        }
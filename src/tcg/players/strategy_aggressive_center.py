@@ -1,7 +1,7 @@
-import random
-import math
+from tcg.board_analysis import analyze
 from tcg.controller import Controller
-from tcg.config import fortress_limit, pos_fortress, fortress_cool
+from tcg.capture import TRAVEL_STEPS, capture_time_estimate
+from tcg.config import fortress_limit, fortress_cool
 
 class AggressiveCenterStrategy(Controller):
     """
@@ -37,11 +37,7 @@ class AggressiveCenterStrategy(Controller):
             return self.FORTRESS_IMPORTANCE_LOWER[fort_id]
 
     def estimate_travel_steps(self, from_id, to_id):
-        p1 = pos_fortress[from_id]
-        p2 = pos_fortress[to_id]
-        dist = math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
-        travel_dist = max(0, dist - 87)
-        return int(travel_dist / 1.5)
+        return TRAVEL_STEPS[from_id][to_id]
 
     def predict_future_pawns(self, fort_id, steps, state):
         team, kind, level, pawn_number, _, _ = state[fort_id]
@@ -56,76 +52,15 @@ class AggressiveCenterStrategy(Controller):
         return min(limit, pawn_number + produced)
 
     def get_capture_time_estimate(self, my_idx, target_idx, state, upgrade=False):
-        # My stats
-        my_team, my_kind, my_level, my_pawns, my_upgrade_timer, _ = state[my_idx]
-        
-        # Target stats
-        tgt_team, tgt_kind, tgt_level, tgt_pawns, _, _ = state[target_idx]
-        
-        limit_l = fortress_limit[my_level]
-        cool_l = fortress_cool[my_kind][my_level]
-        
-        tgt_limit = fortress_limit[tgt_level]
-        tgt_cool = fortress_cool[tgt_kind][tgt_level]
-        
-        dist_steps = self.estimate_travel_steps(my_idx, target_idx)
-        
-        current_time = 0
-        sim_my_pawns = my_pawns
-        sim_my_level = my_level
-        sim_limit = limit_l
-        sim_cool = cool_l
-        
-        # If upgrading
-        if upgrade:
-            if my_level >= 5:
-                return float('inf')
-            
-            upgrade_cost = limit_l // 2
-            
-            # Time to start upgrade
-            if sim_my_pawns < upgrade_cost:
-                wait_steps = int((upgrade_cost - sim_my_pawns) * sim_cool)
-                current_time += wait_steps
-                sim_my_pawns = upgrade_cost 
-            
-            # Perform upgrade
-            current_time += 200
-            # Pawns produced during upgrade
-            produced = 200 // sim_cool
-            sim_my_pawns = (sim_my_pawns - upgrade_cost) + produced
-            
-            # Level up
-            sim_my_level += 1
-            sim_limit = fortress_limit[sim_my_level]
-            sim_cool = fortress_cool[my_kind][sim_my_level]
-            
-        # Iterate to find earliest win time
-        for p in range(int(sim_my_pawns), sim_limit + 1):
-            wait_steps = int((p - sim_my_pawns) * sim_cool)
-            arrival_time = current_time + wait_steps + dist_steps
-            
-            # Target prediction
-            pred_tgt = min(tgt_limit, tgt_pawns + arrival_time // tgt_cool)
-            
-            if p // 2 > pred_tgt:
-                return current_time + wait_steps
-        
-        return float('inf')
+        return capture_time_estimate(state, my_idx, target_idx, upgrade)
 
     def update(self, info):
         team_id, state, moving_pawns, spawning_pawns, done = info
         
         # Determine my side
-        upper_count = sum(1 for i in [0, 1, 2] if state[i][0] == 1)
-        lower_count = sum(1 for i in [9, 10, 11] if state[i][0] == 1)
-        
-        if upper_count > lower_count:
-            my_side = "upper"
-            home_ids = [0, 1, 2]
-        else:
-            my_side = "lower"
-            home_ids = [9, 10, 11]
+        board = analyze(info)
+        my_side = board.home
+        home_ids = list(board.home_ids)
 
         # --- Phase 1: Secure Home Base (Economy First) ---
         # SecureHomeと同じロジックで足場を固める
@@ -176,7 +111,7 @@ class AggressiveCenterStrategy(Controller):
 
             # Upgrade non-reserved in Phase 1
             my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
-            random.shuffle(my_fortresses)
+            self.rng.shuffle(my_fortresses)
             for i in my_fortresses:
                 if i in reserved_fortresses:
                     continue
@@ -195,7 +130,7 @@ class AggressiveCenterStrategy(Controller):
         # 2.0 Priority: Snipe Weak Enemies (Opportunistic Attack)
         # 敵の拠点が手薄なら、兵力溢れを待たずに攻撃する
         my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
-        random.shuffle(my_fortresses) # ランダム順でチェック
+        self.rng.shuffle(my_fortresses) # ランダム順でチェック
         
         for i in my_fortresses:
             neighbors = state[i][5]
@@ -264,12 +199,9 @@ class AggressiveCenterStrategy(Controller):
                     return 1, i, enemies[0]
                 elif allies:
                     # Reinforce logic
-                    under_attack = set()
-                    for p in moving_pawns:
-                        if p[0] == 2 and p[3] in allies:
-                            under_attack.add(p[3])
+                    under_attack = {t for t in board.threats if t in allies}
                     
-                    front_line = [a for a in allies if any(state[n][0] == 2 for n in state[a][5])]
+                    front_line = [a for a in allies if board.enemy_neighbors[a]]
                     
                     target = None
                     if under_attack:
@@ -277,7 +209,7 @@ class AggressiveCenterStrategy(Controller):
                     elif front_line:
                         target = min(front_line, key=lambda x: state[x][3])
                     else:
-                        target = random.choice(allies)
+                        target = self.rng.choice(allies)
                         
                     return 1, i, target
         
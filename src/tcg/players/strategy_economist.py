@@ -1,5 +1,4 @@
 
-import random
 from tcg.controller import Controller
 from tcg.config import fortress_limit
 
@@ -17,7 +16,7 @@ class DefensiveEconomist(Controller):
         team_id, state, moving_pawns, spawning_pawns, done = info
         
         my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
-        random.shuffle(my_fortresses)
+        self.rng.shuffle(my_fortresses)
         
         for i in my_fortresses:
             level = state[i][2]
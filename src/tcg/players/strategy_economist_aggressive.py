@@ -1,7 +1,6 @@
-import random
-import math
 from tcg.controller import Controller
-from tcg.config import fortress_limit, pos_fortress, fortress_cool
+from tcg.capture import TRAVEL_STEPS
+from tcg.config import fortress_limit, fortress_cool
 
 class EconomistAggressive(Controller):
     """
@@ -11,11 +10,7 @@ class EconomistAggressive(Controller):
         return "EconomistAggressive"
 
     def estimate_travel_steps(self, from_id, to_id):
-        p1 = pos_fortress[from_id]
-        p2 = pos_fortress[to_id]
-        dist = math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
-        travel_dist = max(0, dist - 87)
-        return int(travel_dist / 1.5)
+        return TRAVEL_STEPS[from_id][to_id]
 
     def predict_future_pawns(self, fort_id, steps, state):
         team, kind, level, pawn_number, _, _ = state[fort_id]
@@ -30,7 +25,7 @@ class EconomistAggressive(Controller):
         
         # --- Aggressive Snipe Logic (Added) ---
         my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
-        random.shuffle(my_fortresses)
+        self.rng.shuffle(my_fortresses)
         for i in my_fortresses:
             neighbors = state[i][5]
             enemies = [n for n in neighbors if state[n][0] == 2]
@@ -42,7 +37,7 @@ class EconomistAggressive(Controller):
 
         # Standard Economist Logic
         my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
-        random.shuffle(my_fortresses)
+        self.rng.shuffle(my_fortresses)
         
         for i in my_fortresses:
             level = state[i][2]
@@ -1,8 +1,8 @@
 
-import random
-import math
+from tcg.board_analysis import analyze
 from tcg.controller import Controller
-from tcg.config import fortress_limit, pos_fortress, fortress_cool
+from tcg.capture import TRAVEL_STEPS
+from tcg.config import fortress_limit, fortress_cool
 
 class RapidExpansionist(Controller):
     """
@@ -40,17 +40,7 @@ class RapidExpansionist(Controller):
             return self.FORTRESS_IMPORTANCE_LOWER[fort_id]
 
     def estimate_travel_steps(self, from_id, to_id):
-        p1 = pos_fortress[from_id]
-        p2 = pos_fortress[to_id]
-        dist = math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
-        # Speed is 1.5. Start offset 42, End offset 45.
-        # Travel distance approx dist - 87.
-        # But let's be conservative and just use dist / 1.5
-        # Actually, game logic:
-        # Spawn at 42 from center. Arrive at 45 from center.
-        # So travel is roughly dist - 87.
-        travel_dist = max(0, dist - 87)
-        return int(travel_dist / 1.5)
+        return TRAVEL_STEPS[from_id][to_id]
 
     def predict_future_pawns(self, fort_id, steps, state):
         team, kind, level, pawn_number, _, _ = state[fort_id]
@@ -69,13 +59,8 @@ class RapidExpansionist(Controller):
         team_id, state, moving_pawns, spawning_pawns, done = info
         
         # Determine my side (Upper or Lower)
-        upper_count = sum(1 for i in [0, 1, 2] if state[i][0] == 1)
-        lower_count = sum(1 for i in [9, 10, 11] if state[i][0] == 1)
-        
-        if upper_count > lower_count:
-            my_side = "upper"
-        else:
-            my_side = "lower"
+        board = analyze(info)
+        my_side = board.home
 
         # 1. Priority: Capture Neutrals with Coordinated Attack
         neutrals = [i for i, s in enumerate(state) if s[0] == 0]
@@ -112,7 +97,7 @@ class RapidExpansionist(Controller):
 
         # 2. Secondary: Upgrade or other actions
         my_fortresses = [i for i, s in enumerate(state) if s[0] == 1]
-        random.shuffle(my_fortresses)
+        self.rng.shuffle(my_fortresses)
         
         for i in my_fortresses:
             pawn_count = state[i][3]
@@ -139,15 +124,10 @@ class RapidExpansionist(Controller):
                 elif allies:
                     # Reinforce ally
                     # Priority 1: Allies under attack
-                    under_attack = set()
-                    for p in moving_pawns:
-                        # p: [team, kind, from, to, pos]
-                        # If enemy (team 2) is moving to an ally
-                        if p[0] == 2 and p[3] in allies:
-                            under_attack.add(p[3])
+                    under_attack = {t for t in board.threats if t in allies}
                     
                     # Priority 2: Front-line allies (have enemy neighbors)
-                    front_line = [a for a in allies if any(state[n][0] == 2 for n in state[a][5])]
+                    front_line = [a for a in allies if board.enemy_neighbors[a]]
                     
                     target = None
                     if under_attack:
@@ -158,7 +138,7 @@ class RapidExpansionist(Controller):
                         target = min(front_line, key=lambda x: state[x][3])
                     else:
                         # Random ally
-                        target = random.choice(allies)
+                        target = self.rng.choice(allies)
                         
                     return 1, i, target
         
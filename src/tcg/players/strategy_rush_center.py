@@ -4,6 +4,7 @@ Rush Center Strategy Player
 波状攻撃と後方支援を活用して中央の砦（砦7と砦4）の制圧を目指す戦略
 """
 
+from tcg.board_analysis import analyze
 from tcg.config import fortress_limit, A_coordinate
 from tcg.controller import Controller
 
@@ -31,9 +32,11 @@ class RushCenterPlayer(Controller):
         self.step += 1
 
         # 自分の砦と敵の砦を特定
-        my_fortresses = [i for i in range(12) if self.state[i][0] == self.team]
-        enemy_fortresses = [i for i in range(12) if self.state[i][0] != 0 and self.state[i][0] != self.team]
-        neutral_fortresses = [i for i in range(12) if self.state[i][0] == 0]
+        # info は常に自分視点（self.team == 1）なので、共有の盤面集計をそのまま使える
+        board = analyze(info)
+        my_fortresses = board.mine
+        enemy_fortresses = board.enemy
+        neutral_fortresses = board.neutral
         
         if not my_fortresses:
             return 0, 0, 0
@@ -0,0 +1,245 @@
+"""Opt-in per-phase timing of simulation steps."""
+
+import json
+import math
+import time
+from collections import Counter
+
+# Engine methods timed per call, in process_step order
+ENGINE_PHASES = (
+    "pawn_move",
+    "CheckGameOver",
+    "flip_board_view",
+    "order",
+    "pawn_departure",
+    "pawn_born",
+    "pawn_over",
+    "check_upgrade",
+)
+
+
+class Histogram:
+    """Durations in nanoseconds, bucketed by powers of two split into ``precision`` steps."""
+
+    def __init__(self, precision: int = 1):
+        self.precision = precision
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = Counter()
+
+    def add(self, ns: int):
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        if self.precision == 1:
+            self.buckets[ns.bit_length()] += 1
+        else:
+            self.buckets[math.floor(math.log2(ns) * self.precision) + 1 if ns > 0 else 0] += 1
+
+    def upper_bound(self, bucket: int) -> float:
+        """Largest duration (ns) that falls into ``bucket``."""
+        return 2 ** (bucket / self.precision)
+
+    def merge(self, other: "Histogram"):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.buckets.update(other.buckets)
+
+    def percentile(self, q: float) -> float:
+        """Approximate ``q``-quantile (0-1) in nanoseconds, from the bucket bounds."""
+        if not self.count:
+            return 0.0
+        seen = 0
+        for bucket, n in sorted(self.buckets.items()):
+            seen += n
+            if seen >= q * self.count:
+                return min(self.upper_bound(bucket), self.max)
+        return float(self.max)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_s": self.total / 1e9,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+            "max_us": self.max / 1e3,
+            # [upper bound in microseconds, calls]
+            "histogram_us": [
+                [self.upper_bound(b) / 1e3, n] for b, n in sorted(self.buckets.items())
+            ],
+        }
+
+
+class StepProfiler:
+    """
+    Records wall time per phase and per step for one ``Game`` or ``GymGame``.
+
+    ``attach`` shadows the engine's phase methods and both controllers'
+    ``update`` with timed wrappers on the instances, so a game without a
+    profiler runs the original code untouched. Per-step counters (pawns in
+    flight, spawn queue length) are sampled at the start of each step.
+
+    At match end the game calls ``finish``, which restores the controllers
+    and writes ``json_path`` (histograms) and ``folded_path`` (collapsed
+    stacks for flamegraph.pl / speedscope) when given.
+    """
+
+    def __init__(self, json_path=None, folded_path=None):
+        self.json_path = json_path
+        self.folded_path = folded_path
+        self.phases = {}
+        self.counters = {"pawns_in_flight": Counter(), "spawn_queue": Counter()}
+        self.steps = 0
+        self.game = None
+        # (controller, the update it had on the instance before attach, or None)
+        self._restore = []
+
+    def _timed(self, name, func):
+        histogram = self.phases.setdefault(name, Histogram())
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.add(clock() - start)
+
+        return timed
+
+    def attach(self, game):
+        """Instrument ``game`` and its controllers."""
+        self.game = game
+        for name in ENGINE_PHASES:
+            setattr(game, name, self._timed(name, getattr(game, name)))
+
+        pawn_move = game.pawn_move
+
+        def step_start():
+            self.steps += 1
+            self.counters["pawns_in_flight"][len(game.moving_pawns)] += 1
+            self.counters["spawn_queue"][len(game.spawning_pawns)] += 1
+            pawn_move()
+
+        game.pawn_move = step_start
+
+        controllers = (("controller1", game.controller1), ("controller2", game.controller2))
+        seen = set()
+        for label, controller in controllers:
+            if id(controller) in seen:
+                continue  # same instance on both sides, already wrapped
+            seen.add(id(controller))
+            # An update already shadowed on the instance (e.g. a ControllerTimer) is kept
+            previous = vars(controller).get("update")
+            controller.update = self._timed(f"{label}.update", controller.update)
+            self._restore.append((controller, previous))
+
+    def finish(self):
+        """Detach from the controllers and write the configured dumps (once)."""
+        if self.game is None:
+            return
+        for controller, previous in self._restore:
+            if previous is None:
+                del controller.update
+            else:
+                controller.update = previous
+        self._restore = []
+        self.game = None
+        if self.json_path is not None:
+            self.dump_json(self.json_path)
+        if self.folded_path is not None:
+            self.dump_folded(self.folded_path)
+
+    def to_dict(self) -> dict:
+        counters = {}
+        for name, values in self.counters.items():
+            total = sum(values.values())
+            counters[name] = {
+                "max": max(values, default=0),
+                "mean": sum(v * n for v, n in values.items()) / total if total else 0.0,
+                "histogram": sorted(values.items()),
+            }
+        return {
+            "steps": self.steps,
+            "phases": {name: h.to_dict() for name, h in self.phases.items()},
+            "counters": counters,
+        }
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def dump_folded(self, path):
+        """One ``process_step;<phase> <microseconds>`` line per phase."""
+        with open(path, "w") as f:
+            for name, histogram in self.phases.items():
+                if histogram.count:
+                    f.write(f"process_step;{name} {histogram.total // 1000}\n")
+
+
+class ControllerTimer:
+    """
+    Measures one controller's ``update`` calls and optionally enforces a budget.
+
+    The controller's ``update`` is shadowed on the instance until ``detach``.
+    A call that takes longer than ``budget`` seconds still runs to completion
+    (Python cannot preempt it), but its command is replaced by the no-op
+    ``(0, 0, 0)`` and counted in ``over_budget``.
+    """
+
+    def __init__(self, controller, budget: float | None = None):
+        self.controller = controller
+        self.budget_ns = None if budget is None else int(budget * 1e9)
+        self.latency = Histogram(precision=8)
+        self.cpu_ns = 0
+        self.over_budget = 0
+
+        update = controller.update
+        wall, cpu = time.perf_counter_ns, time.process_time_ns
+
+        def timed_update(info):
+            start, start_cpu = wall(), cpu()
+            command = update(info)
+            elapsed = wall() - start
+            self.cpu_ns += cpu() - start_cpu
+            self.latency.add(elapsed)
+            if self.budget_ns is not None and elapsed > self.budget_ns:
+                self.over_budget += 1
+                return 0, 0, 0
+            return command
+
+        controller.update = timed_update
+
+    def detach(self):
+        del self.controller.update
+
+    def stats(self) -> "LatencyStats":
+        return LatencyStats(self.latency, self.cpu_ns, self.over_budget, matches=1)
+
+
+class LatencyStats:
+    """Picklable, mergeable summary of ``ControllerTimer`` measurements."""
+
+    def __init__(self, latency=None, cpu_ns=0, over_budget=0, matches=0):
+        self.latency = latency if latency is not None else Histogram(precision=8)
+        self.cpu_ns = cpu_ns
+        self.over_budget = over_budget
+        self.matches = matches
+
+    def merge(self, other: "LatencyStats"):
+        self.latency.merge(other.latency)
+        self.cpu_ns += other.cpu_ns
+        self.over_budget += other.over_budget
+        self.matches += other.matches
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.latency.count,
+            "p50_ms": self.latency.percentile(0.5) / 1e6,
+            "p95_ms": self.latency.percentile(0.95) / 1e6,
+            "max_ms": self.latency.max / 1e6,
+            "cpu_per_match_s": self.cpu_ns / 1e9 / self.matches if self.matches else 0.0,
+            "over_budget": self.over_budget,
+        }
@@ -0,0 +1,197 @@
+"""
+Optional pygame rendering for the engines.
+
+The simulation never imports this module unless something is drawn: a game
+created with ``window=True``, or an environment rendering ``rgb_array``
+frames. Everything that needs pygame lives here, so headless games,
+tournament workers and training environments never import it or start SDL.
+"""
+
+import os
+
+import pygame
+
+from .config import (
+    FPS,
+    HEIGHT,
+    SPEEDRATE,
+    WIDTH,
+    A_fortress_set,
+    color_fortress,
+    color_pawn,
+    n_fortress,
+    pos_fortress,
+)
+
+
+class Renderer:
+    """
+    Draws a game's board onto a window, or onto an off-screen surface
+    (``window=False``) whose pixels ``rgb_array`` returns.
+
+    The renderer keeps only drawing state (fonts, the surface, the
+    background colour that drifts towards the leading team), so one
+    renderer can draw successive games.
+    """
+
+    def __init__(self, window: bool = True):
+        self.window_enabled = window
+        # Suppress ALSA errors in environments without audio
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        if window:
+            pygame.init()
+            self.surface = pygame.display.set_mode((WIDTH, HEIGHT))
+        else:
+            pygame.font.init()
+            self.surface = pygame.Surface((WIDTH, HEIGHT))
+        self.font = pygame.font.Font(None, 16)
+        self.font_number = pygame.font.Font(None, 36)
+        self.back_color = [150, 255, 150]
+        self.fps = pygame.time.Clock().tick
+
+    def seconds(self) -> int:
+        """Whole seconds since pygame was initialised."""
+        return pygame.time.get_ticks() // 1000
+
+    def quit_requested(self) -> bool:
+        """True if the window has been closed since the last call."""
+        if not self.window_enabled:
+            return False
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                return True
+        return False
+
+    def draw(self, game):
+        """Draw one frame of ``game`` (not yet shown; see ``present``)."""
+        self.update_background(game)
+        self.surface.fill(self.back_color)
+        self.draw_road()
+        self.draw_fortress(game)
+        self.draw_pawn(game)
+        self.draw_number(game)
+        self.draw_team_name(game)
+
+    def present(self, fps: int = FPS):
+        """Show the drawn frame and wait to hold ``fps`` frames per second."""
+        if self.window_enabled:
+            pygame.display.update()
+            self.fps(int(fps))
+
+    def rgb_array(self):
+        """The drawn frame as a ``(HEIGHT, WIDTH, 3)`` uint8 array."""
+        return pygame.surfarray.array3d(self.surface).swapaxes(0, 1)
+
+    def close(self):
+        pygame.quit()
+
+    def update_background(self, game):
+        """Move the background one unit per channel towards the leading team's colour."""
+        red, blue = game.Red_fortress, game.Blue_fortress
+        back_color = [150, 150, 150]
+        if red == blue:
+            back_color[1] += 105
+        elif red > blue:
+            per = 2 * red / (red + blue) - 1
+            back_color[0] += int(105 * per)
+            back_color[1] += int(105 * (1 - per))
+        elif red < blue:
+            per = 2 * blue / (red + blue) - 1
+            back_color[2] += int(105 * per)
+            back_color[1] += int(105 * (1 - per))
+
+        for c in range(3):
+            if self.back_color[c] < back_color[c]:
+                self.back_color[c] += 1
+            elif self.back_color[c] > back_color[c]:
+                self.back_color[c] -= 1
+
+    def draw_fortress(self, game):
+        """Draw fortresses on screen."""
+        r = 0
+        for x, y in pos_fortress:
+            if r == 4 or r == 7:  # Draw square fortresses
+                pygame.draw.rect(
+                    self.surface,
+                    color_fortress[game.state[r][0]],
+                    pygame.Rect(x - 40, y - 40, 80, 80),
+                    width=0,
+                )
+            else:
+                pygame.draw.circle(self.surface, color_fortress[game.state[r][0]], (x, y), 45)
+            r += 1
+
+    def draw_road(self):
+        """Draw roads between fortresses."""
+        for i in range(n_fortress):
+            for j in range(n_fortress):
+                if A_fortress_set[i][j] == 1:
+                    pygame.draw.line(
+                        self.surface, [200, 150, 50], pos_fortress[i], pos_fortress[j], 25
+                    )
+
+    def draw_number(self, game):
+        """Draw numbers on fortresses."""
+        state = game.state
+        for i in range(12):
+            text = self.font.render(f"Lv {state[i][2]}", True, (0, 0, 0))
+            position = (pos_fortress[i][0] - 20, pos_fortress[i][1] - 35)
+            self.surface.blit(text, position)
+
+            if state[i][3] >= 10:
+                text = self.font_number.render(f"{int(state[i][3])}", True, (0, 0, 0))
+                position = (pos_fortress[i][0] - 20, pos_fortress[i][1] - 5)
+                self.surface.blit(text, position)
+            else:
+                text = self.font_number.render(f"{int(state[i][3])}", True, (0, 0, 0))
+                position = (pos_fortress[i][0] - 10, pos_fortress[i][1] - 5)
+                self.surface.blit(text, position)
+
+            if state[i][4] != -1:
+                text = self.font.render(f"{int(state[i][4] // 2)}", True, (0, 0, 0))
+                position = (pos_fortress[i][0] + 25, pos_fortress[i][1] - 5)
+                self.surface.blit(text, position)
+
+        score_text = self.font.render(f"step: {game.step}", True, (255, 255, 255))
+        score_position = (900, 10)
+        self.surface.blit(score_text, score_position)
+
+        text = self.font.render(f"時間: {game.seconds}", True, (255, 255, 255))
+        position = (900, 30)
+        self.surface.blit(text, position)
+
+        len_text = self.font.render(f"pawn: {len(game.moving_pawns)}", True, (255, 255, 255))
+        position = (900, 50)
+        self.surface.blit(len_text, position)
+
+        len_text = self.font.render(f"spawn: {len(game.spawning_pawns)}", True, (255, 255, 255))
+        position = (900, 70)
+        self.surface.blit(len_text, position)
+
+        len_text = self.font.render(f"Rate: {SPEEDRATE}", True, (255, 255, 255))
+        position = (900, 110)
+        self.surface.blit(len_text, position)
+
+        len_text = self.font.render(f"fps: {FPS}", True, (255, 255, 255))
+        position = (900, 130)
+        self.surface.blit(len_text, position)
+
+    def draw_team_name(self, game):
+        """Draw team names."""
+        len_text = self.font_number.render(f"Red : {game.team2}", True, (200, 25, 25))
+        position = (10, 10)
+        self.surface.blit(len_text, position)
+        len_text = self.font_number.render(f"Blue: {game.team1}", True, (25, 25, 200))
+        position = (10, HEIGHT - 50)
+        self.surface.blit(len_text, position)
+
+    def draw_pawn(self, game):
+        """Draw pawns on screen."""
+        for team, kind, from_, to, pos in game.moving_pawns:
+            if kind == 0:
+                pygame.draw.circle(self.surface, color_pawn[team], pos, 5)
+            elif kind == 1:
+                x, y = pos[0], pos[1]
+                pygame.draw.rect(
+                    self.surface, color_pawn[team], pygame.Rect(x - 2, y - 2, 8, 8), width=0
+                )
@@ -0,0 +1,330 @@
+"""
+Compact match replays: seeds, players, commands and periodic keyframes.
+
+A game is deterministic given its engine RNG and the commands both sides
+play, so a replay stores only:
+
+- a JSON header: seed, both players' team names, classes and source hashes,
+  engine and engine source hash, result;
+- every command other than waiting, as ``(step, team, command, subject, to)``
+  in board coordinates, 8 bytes each;
+- keyframes: full packed states (fortresses, spawn points, pawns in flight,
+  arrival schedule, engine RNG) every ``keyframe_interval`` steps, plus the
+  final state.
+
+``Replay.state_at(step)`` restores the last keyframe at or before ``step``
+into a ``GameState`` and re-simulates from there, jumping over quiet steps,
+so any step is at most one keyframe interval of simulation away.
+
+A ``ReplayRecorder`` passed as ``recorder`` to ``Game``, ``GymGame``,
+``EventGame``, ``SkipGame`` or ``ArrayGame`` records the game. The engine hands it each
+step's commands and asks for a keyframe at the first step it starts once
+one is due; without a recorder both cost a ``None`` check per step.
+
+File layout (little-endian): ``b"TCGR"``, u16 version, u32 header length,
+the header, u32 command count, the commands, u32 keyframe count, per
+keyframe a u32 step and a u32 length, then the keyframes.
+"""
+
+import json
+import struct
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from .config import STEPLIMIT, initial_state, swap_number_l
+from .game_state import WAIT, GameState
+from .match_cache import engine_hash, source_hash
+
+MAGIC = b"TCGR"
+# Bumped when the file layout changes
+FORMAT_VERSION = 1
+# Steps between two keyframes
+KEYFRAME_INTERVAL = 2000
+
+COMMAND_DTYPE = np.dtype(
+    [("step", "<u4"), ("team", "u1"), ("command", "u1"), ("subject", "u1"), ("to", "u1")]
+)
+FORTRESS_DTYPE = np.dtype(
+    [
+        ("team", "u1"),
+        ("kind", "u1"),
+        ("level", "u1"),
+        ("float", "?"),
+        ("upgrade_time", "<i4"),
+        ("pawns", "<f8"),
+    ]
+)
+SPAWN_DTYPE = np.dtype(
+    [
+        ("team", "u1"),
+        ("kind", "u1"),
+        ("float", "?"),
+        ("from", "u1"),
+        ("to", "u1"),
+        ("count", "<f8"),
+        ("x", "<f8"),
+        ("y", "<f8"),
+    ]
+)
+PAWN_DTYPE = np.dtype(
+    [
+        ("id", "<u4"),
+        ("team", "u1"),
+        ("kind", "u1"),
+        ("from", "u1"),
+        ("to", "u1"),
+        ("x", "<f8"),
+        ("y", "<f8"),
+        ("vx", "<f8"),
+        ("vy", "<f8"),
+        ("launched", "<u4"),
+    ]
+)
+ARRIVAL_DTYPE = np.dtype([("move", "<u4"), ("id", "<u4")])
+# step, moves, pawn_id, flags, spawn points, pawns in flight, scheduled arrivals
+KEYFRAME_HEADER = struct.Struct("<IIIBHII")
+# Mersenne Twister state: 624 words and the position (u32), then gauss_next (f8, NaN if None)
+RNG_WORDS = 625
+
+
+def _number(value: float, is_float: bool):
+    return float(value) if is_float else int(value)
+
+
+def pack_keyframe(state: GameState) -> bytes:
+    """The full simulated state of ``state``, packed."""
+    fortresses = np.array(
+        [
+            (team, kind, level, isinstance(pawns, float), upgrade_time, pawns)
+            for team, kind, level, pawns, upgrade_time, _ in state.state
+        ],
+        dtype=FORTRESS_DTYPE,
+    )
+    spawns = np.array(
+        [
+            (team, kind, isinstance(count, float), from_, to, count, pos[0], pos[1])
+            for team, kind, count, from_, to, pos in state.spawning_pawns
+        ],
+        dtype=SPAWN_DTYPE,
+    )
+    pawns = np.array([(pawn_id, *pawn) for pawn_id, pawn in state.flying.items()], dtype=PAWN_DTYPE)
+    arrivals = np.array(
+        [(move, pawn_id) for move, ids in state.arrivals.items() for pawn_id in ids],
+        dtype=ARRIVAL_DTYPE,
+    )
+    version, words, gauss = state.rng.getstate()
+    rng = np.array(words, dtype="<u4").tobytes() + struct.pack(
+        "<d", np.nan if gauss is None else gauss
+    )
+    flags = int(state.done) | int(state.isGameOver_loop) << 1
+    header = KEYFRAME_HEADER.pack(
+        state.step, state.moves, state.pawn_id, flags, len(spawns), len(pawns), len(arrivals)
+    )
+    return b"".join(
+        (header, fortresses.tobytes(), spawns.tobytes(), pawns.tobytes(), arrivals.tobytes())
+        + (struct.pack("<I", version), rng)
+    )
+
+
+def unpack_keyframe(data: bytes) -> GameState:
+    """A ``GameState`` holding the state packed by ``pack_keyframe``."""
+    step, moves, pawn_id, flags, n_spawns, n_pawns, n_arrivals = KEYFRAME_HEADER.unpack_from(data)
+    offset = KEYFRAME_HEADER.size
+    tables = []
+    for dtype, count in (
+        (FORTRESS_DTYPE, len(initial_state)),
+        (SPAWN_DTYPE, n_spawns),
+        (PAWN_DTYPE, n_pawns),
+        (ARRIVAL_DTYPE, n_arrivals),
+    ):
+        tables.append(np.frombuffer(data, dtype, count, offset).tolist())
+        offset += dtype.itemsize * count
+    fortresses, spawns, pawns, arrivals = tables
+    (version,) = struct.unpack_from("<I", data, offset)
+    words = np.frombuffer(data, "<u4", RNG_WORDS, offset + 4).tolist()
+    (gauss,) = struct.unpack_from("<d", data, offset + 4 + 4 * RNG_WORDS)
+
+    state = GameState()
+    state.state = [
+        [team, kind, level, _number(pawns_, is_float), upgrade_time, list(row[5])]
+        for (team, kind, level, is_float, upgrade_time, pawns_), row in zip(
+            fortresses, initial_state
+        )
+    ]
+    state.spawning_pawns = [
+        [team, kind, _number(count, is_float), from_, to, [x, y]]
+        for team, kind, is_float, from_, to, count, x, y in spawns
+    ]
+    state.flying = {pawn[0]: tuple(pawn[1:]) for pawn in pawns}
+    state.arrivals = defaultdict(list)
+    for move, pawn in arrivals:
+        state.arrivals[move].append(pawn)
+    state.moves = moves
+    state.pawn_id = pawn_id
+    state.step = step
+    state.done = bool(flags & 1)
+    state.isGameOver_loop = bool(flags & 2)
+    state.rng.setstate((version, tuple(words), None if np.isnan(gauss) else gauss))
+    state.CheckGameOver()
+    return state
+
+
+class Replay:
+    """A recorded match: header, commands and keyframes, loaded or recorded."""
+
+    def __init__(self, header: dict, commands: np.ndarray, keyframes: list[tuple[int, bytes]]):
+        self.header = header
+        self.commands = commands
+        # (step, packed state), by step
+        self.keyframes = keyframes
+        self._keyframe_steps = [step for step, _ in keyframes]
+
+    @property
+    def steps(self) -> int:
+        """Steps the match lasted."""
+        return self.header["result"]["steps"]
+
+    def save(self, path):
+        """Write the replay to ``path``."""
+        Path(path).write_bytes(self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        """The replay in its file format."""
+        header = json.dumps(self.header).encode()
+        parts = [
+            MAGIC,
+            struct.pack("<HI", FORMAT_VERSION, len(header)),
+            header,
+            struct.pack("<I", len(self.commands)),
+            self.commands.astype(COMMAND_DTYPE).tobytes(),
+            struct.pack("<I", len(self.keyframes)),
+        ]
+        parts.extend(struct.pack("<II", step, len(data)) for step, data in self.keyframes)
+        parts.extend(data for _, data in self.keyframes)
+        return b"".join(parts)
+
+    @classmethod
+    def load(cls, path) -> "Replay":
+        return cls.from_bytes(Path(path).read_bytes(), path)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, name="replay") -> "Replay":
+        """Parse a replay file's contents; ``name`` is used in error messages."""
+        if data[:4] != MAGIC:
+            raise ValueError(f"{name}: not a replay file")
+        version, header_length = struct.unpack_from("<HI", data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{name}: unsupported replay version {version}")
+        offset = 10
+        header = json.loads(data[offset : offset + header_length])
+        offset += header_length
+        (n_commands,) = struct.unpack_from("<I", data, offset)
+        commands = np.frombuffer(data, COMMAND_DTYPE, n_commands, offset + 4).copy()
+        offset += 4 + COMMAND_DTYPE.itemsize * n_commands
+        (n_keyframes,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        index = [struct.unpack_from("<II", data, offset + 8 * i) for i in range(n_keyframes)]
+        offset += 8 * n_keyframes
+        keyframes = []
+        for step, length in index:
+            keyframes.append((step, data[offset : offset + length]))
+            offset += length
+        return cls(header, commands, keyframes)
+
+    def keyframe(self, step: int) -> GameState:
+        """The state of the last keyframe at or before ``step``."""
+        i = max(0, np.searchsorted(self._keyframe_steps, step, side="right") - 1)
+        return unpack_keyframe(self.keyframes[i][1])
+
+    def state_at(self, step: int) -> GameState:
+        """The state at the start of ``step`` (or at the end of the match, if earlier)."""
+        state = self.keyframe(step)
+        self.advance(state, step)
+        return state
+
+    def advance(self, state: GameState, step: int):
+        """Re-simulate ``state`` (from this match) in place up to the start of ``step``."""
+        commands = self.commands
+        i = int(np.searchsorted(commands["step"], state.step))
+        step = min(step, STEPLIMIT)
+        while state.step < step and not state.over:
+            if i < len(commands) and commands["step"][i] == state.step:
+                played = [WAIT, WAIT]
+                while i < len(commands) and commands["step"][i] == state.step:
+                    _, team, command, subject, to = commands[i].tolist()
+                    played[team - 1] = (command, subject, to)
+                    i += 1
+                state.play(*played)
+            else:
+                until = int(commands["step"][i]) if i < len(commands) else step
+                state.play(WAIT, WAIT, min(until, step) - state.step)
+
+
+class ReplayRecorder:
+    """
+    Records one game into a ``Replay``: pass it to the engine as
+    ``recorder`` and call ``finish`` once the game has ended.
+    """
+
+    def __init__(self, seed: int | None = None, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.seed = seed
+        self.keyframe_interval = keyframe_interval
+        self.game = None
+        self.commands = []
+        self.keyframes = []
+        # The engine asks for a keyframe at the first step it starts at or after this one
+        self.next_keyframe = 0
+
+    def attach(self, game):
+        """Called by the engine once it is set up: record ``game`` from its first step."""
+        self.game = game
+        self.keyframe()
+
+    def record(self, step: int, commands):
+        """Log a step's commands as the controllers returned them (team 2's view flipped)."""
+        (command_1, subject_1, to_1), (command_2, subject_2, to_2) = commands
+        if command_1:
+            self.commands.append((step, 1, command_1, subject_1, to_1))
+        if command_2:
+            # Stored in board coordinates, as the engine applies them
+            self.commands.append(
+                (step, 2, command_2, swap_number_l[subject_2], swap_number_l[to_2])
+            )
+
+    def keyframe(self):
+        """Store the full state of the game, at the start of its current step."""
+        game = self.game
+        self.keyframes.append((game.step, pack_keyframe(GameState.from_game(game))))
+        self.next_keyframe = game.step + self.keyframe_interval
+
+    def finish(self) -> Replay:
+        """The recorded replay, ending with a keyframe of the final state."""
+        game = self.game
+        if self.keyframes[-1][0] != game.step:
+            self.keyframe()
+        players = []
+        for controller, name in ((game.controller1, game.team1), (game.controller2, game.team2)):
+            cls = type(controller)
+            players.append(
+                {
+                    "team_name": name,
+                    "class": f"{cls.__module__}:{cls.__qualname__}",
+                    "code_hash": source_hash(cls),
+                }
+            )
+        header = {
+            "seed": self.seed,
+            "players": players,
+            "engine": type(game).__name__,
+            "engine_hash": engine_hash(),
+            "keyframe_interval": self.keyframe_interval,
+            "result": {
+                "winner": game.win_team,
+                "blue_fortresses": game.Blue_fortress,
+                "red_fortresses": game.Red_fortress,
+                "steps": game.step,
+            },
+        }
+        return Replay(header, np.array(self.commands, dtype=COMMAND_DTYPE), self.keyframes)
@@ -0,0 +1,209 @@
+"""Monte Carlo rollout search over ``GameState``, in-process or on a worker pool."""
+
+import math
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .config import STEPLIMIT, fortress_limit, n_fortress
+from .controller import Controller
+from .game_state import GameState, to_board
+
+# Pools shared by every search in this process, by worker count
+_pools = {}
+
+
+def rollout_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for ``workers`` processes, created on first use and then reused."""
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+
+def evaluate(state: GameState) -> float:
+    """
+    Team 1's outlook in ``[-1, 1]``: the result once the game has ended,
+    otherwise the fortress lead (what decides the game at the step limit)
+    averaged with its share of the material on the board (pawns in
+    fortresses, spawn points and flight, plus the pawns invested in levels).
+    """
+    if state.over:
+        state.CheckGameOver()
+        return {"Blue": 1.0, "Red": -1.0}.get(state.win_team, 0.0)
+    fortresses = [0, 0, 0]
+    material = [0.0, 0.0, 0.0]
+    for team, _, level, pawn_number, _, _ in state.state:
+        fortresses[team] += 1
+        material[team] += pawn_number + fortress_limit[level] / 2
+    for team, _, pawn_number, *_ in state.spawning_pawns:
+        material[team] += pawn_number
+    for pawn in state.flying.values():
+        material[pawn[0]] += 1
+    total = material[1] + material[2]
+    share = (material[1] - material[2]) / total if total else 0.0
+    return ((fortresses[1] - fortresses[2]) / n_fortress + share) / 2
+
+
+def rollout(
+    state: GameState,
+    command,
+    policies: tuple[type[Controller], type[Controller]],
+    horizon: int,
+    interval: int,
+    rng: random.Random,
+    deadline: float | None = None,
+) -> float:
+    """
+    Play ``command`` for team 1, then let ``policies`` play both sides for
+    ``horizon`` steps, consulting them every ``interval`` steps; returns
+    ``evaluate`` of the position reached. ``state`` is advanced in place.
+    Past ``deadline`` (``time.monotonic``) the playout stops at the next
+    consultation and the position reached so far is evaluated.
+    """
+    players = [policy() for policy in policies]
+    for player in players:
+        player.set_rng(rng)
+    end = min(state.step + horizon, STEPLIMIT)
+    while state.step < end and not state.over:
+        commands = []
+        for team, player in ((1, players[0]), (2, players[1])):
+            if hasattr(player, "step"):
+                # Heuristics that count their own updates as the game clock
+                player.step = state.step
+            commands.append(to_board(player.update(state.info(team)), team))
+        if command is not None:
+            commands[0], command = command, None
+        state.play(*commands, n_steps=min(interval, end - state.step))
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+    return evaluate(state)
+
+
+def search_root(
+    snapshot,
+    candidates: list,
+    policies: tuple[type[Controller], type[Controller]],
+    horizon: int,
+    interval: int,
+    deadline: float,
+    max_rollouts: int | None,
+    exploration: float,
+    seed: int,
+) -> tuple[list[float], list[int]]:
+    """
+    UCB1 over the root ``candidates`` until ``deadline`` (``time.monotonic``)
+    or ``max_rollouts``; returns the summed rollout values and visit counts.
+    A rollout running at the deadline is cut short, and none is started
+    after it, so every count can be zero.
+
+    ``snapshot`` is a ``GameState`` or its pickle, so a pool task unpickles
+    the position once however many rollouts it runs. Each candidate is
+    tried once before the bandit starts choosing: the first one (the
+    reference move) first, then the others in an order drawn from ``seed``,
+    so searchers cut short by the deadline cover different candidates.
+    """
+    if isinstance(snapshot, bytes):
+        snapshot = pickle.loads(snapshot)
+    rng = random.Random(seed)
+    sweep = list(range(1, len(candidates)))
+    rng.shuffle(sweep)
+    sweep.insert(0, 0)
+    totals = [0.0] * len(candidates)
+    visits = [0] * len(candidates)
+    n = 0
+    while time.monotonic() < deadline and (max_rollouts is None or n < max_rollouts):
+        if n < len(candidates):
+            k = sweep[n]
+        else:
+            log_n = math.log(n)
+            k = max(
+                range(len(candidates)),
+                key=lambda i: totals[i] / visits[i] + exploration * math.sqrt(log_n / visits[i]),
+            )
+        state = snapshot.fork()
+        state.rng = random.Random(rng.getrandbits(64))
+        totals[k] += rollout(state, candidates[k], policies, horizon, interval, rng, deadline)
+        visits[k] += 1
+        n += 1
+    return totals, visits
+
+
+class RolloutSearch:
+    """
+    Root-parallel Monte Carlo search with UCB1 at the root.
+
+    Every process runs its own bandit over the same candidates with its own
+    seed until the shared deadline, and the visit counts and values are
+    summed. The calling process is one of the searchers; the other
+    ``workers - 1`` run on ``rollout_pool``, which is created once and
+    reused by every later decision, and receive the position as a single
+    pickle per decision. Since the searchers only meet at the end, the
+    number of rollouts per decision grows with the number of cores.
+
+    ``budget`` is the wall time of one ``search`` call in seconds, the
+    pool round trip included. A rollout still running at the deadline is
+    cut short and scores the position it reached, so a search overruns by
+    at most one policy consultation; if no rollout finished, the first
+    candidate is returned. ``max_rollouts`` caps the rollouts of each
+    searcher; with ``workers=1`` and a budget that is not reached it makes
+    the search reproducible.
+    """
+
+    def __init__(
+        self,
+        policies: tuple[type[Controller], type[Controller]],
+        budget: float = 0.02,
+        horizon: int = 400,
+        interval: int = 10,
+        workers: int = 1,
+        exploration: float = 0.5,
+        max_rollouts: int | None = None,
+        seed: int | None = None,
+    ):
+        self.policies = policies
+        self.budget = budget
+        self.horizon = horizon
+        self.interval = interval
+        self.workers = workers
+        self.exploration = exploration
+        self.max_rollouts = max_rollouts
+        self.rng = random.Random(seed)
+        # Share of the budget kept for sending the tasks and merging the results
+        self.margin = 0.1 if workers > 1 else 0.0
+        # Rollouts run by the last search, over all searchers
+        self.rollouts = 0
+
+    def search(self, snapshot: GameState, candidates: list):
+        """
+        The candidate command for team 1 with the best mean rollout value.
+
+        Ties go to the more visited candidate, then to the earlier one, so
+        the first candidate is kept unless another one did better.
+        """
+        deadline = time.monotonic() + self.budget * (1 - self.margin)
+        args = (self.policies, self.horizon, self.interval, deadline, self.max_rollouts)
+        futures = []
+        if self.workers > 1:
+            pool = rollout_pool(self.workers - 1)
+            blob = pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)
+            futures = [
+                pool.submit(
+                    search_root, blob, candidates, *args, self.exploration, self.rng.getrandbits(64)
+                )
+                for _ in range(self.workers - 1)
+            ]
+        totals, visits = search_root(
+            snapshot, candidates, *args, self.exploration, self.rng.getrandbits(64)
+        )
+        for future in futures:
+            more_totals, more_visits = future.result()
+            totals = [a + b for a, b in zip(totals, more_totals)]
+            visits = [a + b for a, b in zip(visits, more_visits)]
+        self.rollouts = sum(visits)
+        best = max(
+            range(len(candidates)),
+            key=lambda i: (totals[i] / visits[i] if visits[i] else -math.inf, visits[i], -i),
+        )
+        return candidates[best]
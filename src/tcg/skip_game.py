@@ -0,0 +1,106 @@
+"""Game class for Fortress Conquest that jumps over quiet steps."""
+
+from .config import STEPLIMIT, fortress_cool, fortress_limit, n_fortress
+from .controller import Controller
+from .event_game import EventGame
+from .profiling import StepProfiler
+
+# Steps between two departures from a spawn point, by kind
+DEPARTURE_INTERVAL = (7, 10)
+# pawn_over runs on multiples of this step
+OVERFLOW_INTERVAL = 40
+
+
+def _next_multiple(step: int, interval: int) -> int:
+    """Smallest multiple of ``interval`` that is ``>= step``."""
+    return -(-step // interval) * interval
+
+
+class SkipGame(EventGame):
+    """
+    EventGame that advances straight to the next step where something happens.
+
+    Most steps only tick production cooldowns and upgrade timers. Before each
+    step the game computes the next event: a production tick of a fortress
+    below its limit, a pawn_over tick while a fortress is above its limit, a
+    departure tick while spawn points are queued, an upgrade completion, a
+    pawn arrival, the last step, or a controller waking up. Steps before it
+    are applied in bulk: upgrade timers are decremented and the departure
+    jitter draws are consumed so the engine RNG stays in sync.
+
+    While a controller is idle (``Controller.idle_steps``) it is not consulted
+    in any engine, so its wake-up step is an event too. So is every step on
+    which a waiting controller acts (``Cadence.pending``): one that replays
+    a command, or one woken by its ``wake_events``. With the default of 0
+    idle steps both controllers are consulted every step and nothing is
+    skipped. Every executed step and the final state match ``GymGame``.
+    """
+
+    def __init__(
+        self,
+        controller1: Controller,
+        controller2: Controller,
+        window: bool = True,
+        seed: int | None = None,
+        profiler: StepProfiler | None = None,
+        recorder=None,
+    ):
+        # Steps applied in bulk rather than simulated
+        self.skipped = 0
+        super().__init__(controller1, controller2, window, seed, profiler, recorder)
+
+    def next_event(self) -> int:
+        """First step ``>= self.step`` that cannot be applied in bulk."""
+        step = self.step
+        candidates = [STEPLIMIT - 1, *self.wake]
+
+        if self.arrivals:
+            # The bucket for move m is resolved by the step that makes self.moves == m
+            candidates.append(step + min(self.arrivals) - self.moves - 1)
+
+        for _, kind, pawn_number, *_ in self.spawning_pawns:
+            if pawn_number <= 0:
+                return step  # still waiting to be removed
+            candidates.append(_next_multiple(step, DEPARTURE_INTERVAL[kind]))
+
+        overflow = False
+        for _, kind, level, pawn_number, upgrade_time, _ in self.state:
+            limit = fortress_limit[level]
+            if pawn_number < limit:
+                candidates.append(_next_multiple(step, fortress_cool[kind][level]))
+            elif pawn_number > limit:
+                overflow = True
+            if upgrade_time >= 0:
+                candidates.append(step + upgrade_time)
+        if overflow:
+            candidates.append(_next_multiple(step, OVERFLOW_INTERVAL))
+
+        return min(candidates)
+
+    def skip_to(self, target: int):
+        """Apply the quiet steps ``self.step .. target - 1`` in bulk."""
+        n = target - self.step
+        if n <= 0:
+            return
+        # pawn_departure draws one jitter value per spawn point per step
+        draw = self.rng.random
+        for _ in range(n * len(self.spawning_pawns)):
+            draw()
+        for i in range(n_fortress):
+            if self.state[i][4] > 0:
+                self.state[i][4] -= n
+        self.moves += n
+        self.step = target
+        self.skipped += n
+
+    def process_step(self):
+        """Jump to the next event, then execute it as one simulation step."""
+        if not (
+            self.isGameOver
+            or self.step >= STEPLIMIT
+            or self.isGameOver_loop
+            or self.done
+            or self.cadence.pending(self.step, self.state, self.spawning_pawns)
+        ):
+            self.skip_to(self.next_event())
+        return super().process_step()
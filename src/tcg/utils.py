@@ -1,8 +1,159 @@
 """Utility functions for the game."""
 
+from collections.abc import Sequence
+
 from .config import swap_number_d, swap_number_l
 
 
+class LazyRows(Sequence):
+    """Read-only list of rows that is built by ``build(*args)`` on first access."""
+
+    __slots__ = ("_build", "_args", "_len", "_rows")
+
+    def __init__(self, length, build, *args):
+        self._build = build
+        self._args = args
+        self._len = length
+        self._rows = None
+
+    def _materialize(self):
+        if self._rows is None:
+            self._rows = self._build(*self._args) if self._len else []
+            self._build = self._args = None
+        return self._rows
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(self._materialize())
+
+
+class MirroredRows(Sequence):
+    """
+    Red's view of a live pawn list, mirrored row by row on access.
+
+    Each source row is flipped once by ``flip_row`` and the result is kept;
+    later accesses only copy the fields that change in place (``refresh``).
+    Nothing is allocated for pawns a controller never reads.
+    """
+
+    def __init__(self, flip_row, refresh):
+        self.flip_row = flip_row
+        self.refresh = refresh
+        self.source = []
+        # id(source row) -> (source row, mirrored row)
+        self._cache = {}
+
+    def bind(self, source):
+        self.source = source
+        if len(self._cache) > 2 * len(source) + 64:
+            # Drop rows of pawns that have arrived or spawn points that ran out
+            cache = self._cache
+            self._cache = {id(row): cache[id(row)] for row in source if id(row) in cache}
+
+    def _mirror(self, row):
+        entry = self._cache.get(id(row))
+        if entry is None or entry[0] is not row:
+            entry = (row, self.flip_row(row))
+            self._cache[id(row)] = entry
+        else:
+            self.refresh(entry[1], row)
+        return entry[1]
+
+    def __len__(self):
+        return len(self.source)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._mirror(row) for row in self.source[index]]
+        return self._mirror(self.source[index])
+
+    def __iter__(self):
+        for row in self.source:
+            yield self._mirror(row)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _flip_moving_row(row):
+    team, kind, from_, to, pos = row
+    return [Swap_team(team), kind, swap_number_l[from_], swap_number_l[to], pos]
+
+
+def _refresh_moving_row(mirrored, row):
+    mirrored[4] = row[4]
+
+
+def _flip_spawning_row(row):
+    team, kind, pawn_number, from_, to, pos = row
+    return [Swap_team(team), kind, pawn_number, swap_number_l[from_], swap_number_l[to], pos]
+
+
+def _refresh_spawning_row(mirrored, row):
+    mirrored[2] = row[2]
+    mirrored[5] = row[5]
+
+
+class PerspectiveView:
+    """
+    Incrementally maintained ``flip_board_view`` for the engine's team-2 controller.
+
+    The mirrored ``state`` rows are allocated once and refreshed in place every
+    step. Pawn and spawn lists are ``MirroredRows`` views over the engine's
+    live lists, so a step costs O(fortresses) plus whatever the controller
+    actually reads. Like the unflipped info team 1 receives, the returned rows
+    are live and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.state = [[0, 0, 0, 0, -1, []] for _ in swap_number_l]
+        self.moving_pawns = MirroredRows(_flip_moving_row, _refresh_moving_row)
+        self.spawning_pawns = MirroredRows(_flip_spawning_row, _refresh_spawning_row)
+
+    def flip(self, info):
+        """Same result as ``flip_board_view(info)`` for a team-2 ``info``."""
+        team, state, moving_pawns, spawning_pawns, done = info
+        if team == 1:
+            return info
+
+        for mirrored, j, to_set in zip(self.state, swap_number_l, state):
+            row = state[j]
+            mirrored[0] = Swap_team(row[0])
+            mirrored[1] = row[1]
+            mirrored[2] = row[2]
+            mirrored[3] = row[3]
+            mirrored[4] = row[4]
+            mirrored[5] = to_set[5]
+
+        # Lazily built pawn lists (ArrayGame, EventGame) keep their own path
+        if isinstance(moving_pawns, LazyRows):
+            flipped_moving = LazyRows(len(moving_pawns), _flip_moving_pawns, moving_pawns)
+        else:
+            self.moving_pawns.bind(moving_pawns)
+            flipped_moving = self.moving_pawns
+        if isinstance(spawning_pawns, LazyRows):
+            flipped_spawning = LazyRows(len(spawning_pawns), _flip_spawning_pawns, spawning_pawns)
+        else:
+            self.spawning_pawns.bind(spawning_pawns)
+            flipped_spawning = self.spawning_pawns
+
+        return [Swap_team(team), self.state, flipped_moving, flipped_spawning, done]
+
+
 def Swap_team(team):
     """Swap team perspective."""
     return 0 if team == 0 else 1 if team == 2 else 2
@@ -24,29 +175,30 @@ def flip_board_view(info):
     for i in range(len(state)):
         new_state[i][5] = state[i][5]
 
-    # Update moving_pawns
-    new_moving_pawns = [
-        [
-            Swap_team(moving_pawns[i][0]),
-            moving_pawns[i][1],
-            swap_number_d[moving_pawns[i][2]],
-            swap_number_d[moving_pawns[i][3]],
-        ]
-        + moving_pawns[i][4:]
-        for i in range(len(moving_pawns))
-    ]
+    # Update moving_pawns (kept lazy if the engine built them lazily)
+    if isinstance(moving_pawns, LazyRows):
+        new_moving_pawns = LazyRows(len(moving_pawns), _flip_moving_pawns, moving_pawns)
+    else:
+        new_moving_pawns = _flip_moving_pawns(moving_pawns)
 
     # Update spawning_pawns
-    new_spawning_pawns = [
-        [
-            Swap_team(spawning_pawns[i][0]),
-            spawning_pawns[i][1],
-            spawning_pawns[i][2],
-            swap_number_d[spawning_pawns[i][3]],
-            swap_number_d[spawning_pawns[i][4]],
-        ]
-        + spawning_pawns[i][5:]
-        for i in range(len(spawning_pawns))
-    ]
+    if isinstance(spawning_pawns, LazyRows):
+        new_spawning_pawns = LazyRows(len(spawning_pawns), _flip_spawning_pawns, spawning_pawns)
+    else:
+        new_spawning_pawns = _flip_spawning_pawns(spawning_pawns)
 
     return [Swap_team(team), new_state, new_moving_pawns, new_spawning_pawns, done]
+
+
+def _flip_moving_pawns(moving_pawns):
+    return [
+        [Swap_team(team), kind, swap_number_d[from_], swap_number_d[to], *rest]
+        for team, kind, from_, to, *rest in moving_pawns
+    ]
+
+
+def _flip_spawning_pawns(spawning_pawns):
+    return [
+        [Swap_team(team), kind, pawn_number, swap_number_d[from_], swap_number_d[to], *rest]
+        for team, kind, pawn_number, from_, to, *rest in spawning_pawns
+    ]
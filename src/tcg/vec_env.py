@@ -0,0 +1,286 @@
+"""
+Native vectorized environments stepping many games on a ``BatchGame``.
+
+``TCGVecEnv`` steps every game in one process. Opponents are ``Controller``
+objects whose ``update`` still runs once per game and step; ``BatchGame``
+keeps their ``info`` lists live and rewrites only what changed, so beyond
+those calls a step costs a fixed number of array operations for the whole
+batch. ``SubprocTCGVecEnv`` splits the games into shards, one
+``TCGVecEnv`` per worker process, so the opponents of different shards run
+in parallel; ``bench_vec_env.py`` compares both with SB3's ``DummyVecEnv``
+and ``SubprocVecEnv`` over ``TCGEnv``.
+"""
+
+import os
+import random
+from multiprocessing import get_context
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from .batch_game import BatchGame
+from .config import STEPLIMIT, fortress_limit
+from .features import batch_action_masks, batch_observations
+
+FORTRESS_LIMIT = np.array(fortress_limit, dtype=np.float64)
+OBSERVATION_SPACE = spaces.Box(low=-1, high=50000, shape=(348,), dtype=np.float32)
+
+
+def decode_actions(actions):
+    """Decode Discrete(432) actions into a (B, 3) ``(command, subject, to)`` array."""
+    actions = np.asarray(actions, dtype=np.int64).reshape(-1)
+    command = np.where(actions < 144, 0, np.where(actions < 288, 1, 2))
+    rem = np.where(command == 0, 0, actions - 144 * command)
+    return np.stack([command, rem // 12, rem % 12], axis=1)
+
+
+class TCGVecEnv(VecEnv):
+    """
+    ``VecEnv`` running ``n_envs`` TCG games in lockstep on a ``BatchGame``.
+
+    Matches ``TCGEnv``: the agent plays Blue, each action is repeated for 40
+    simulation steps and rewards use the same shaping. Observations, rewards
+    and action masks are returned as (B, 348), (B,) and (B, 432) arrays.
+    Finished games are reset automatically, with the last observation in
+    ``infos[i]["terminal_observation"]`` like the other SB3 vector envs.
+    """
+
+    steps_per_action = 40
+
+    def __init__(self, opponent_class, n_envs: int = 8, seed=None):
+        self.opponent_class = opponent_class
+        self.render_mode = None
+        self.game = BatchGame(n_envs, seed=seed)
+        self.opponents = [None] * n_envs
+        self.actions = np.zeros((n_envs, 3), dtype=np.int64)
+
+        super().__init__(n_envs, OBSERVATION_SPACE, spaces.Discrete(432))
+
+    def _pick_opponents(self, games):
+        classes = self.opponent_class
+        rng = self.game.rng
+        for b in games:
+            if isinstance(classes, list):
+                self.opponents[b] = classes[rng.integers(len(classes))]()
+            else:
+                self.opponents[b] = classes()
+            self.opponents[b].set_rng(random.Random(int(rng.integers(2**63))))
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self.game.rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+
+        self.game.reset_games(np.ones(self.num_envs, dtype=bool))
+        self._pick_opponents(range(self.num_envs))
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self.actions = decode_actions(actions)
+
+    def step_wait(self):
+        game = self.game
+        prev_blue, prev_red = game.fortress_counts()
+
+        terminated = np.zeros(self.num_envs, dtype=bool)
+        for _ in range(self.steps_per_action):
+            terminated |= ~game.process_step(self.actions, self.opponents, active=~terminated)
+            if terminated.all():
+                break
+
+        rewards = self._rewards(terminated, prev_blue, prev_red)
+        truncated = game.step >= STEPLIMIT
+        dones = terminated | truncated
+
+        obs = self._get_obs()
+        infos = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            finished = np.flatnonzero(dones)
+            for b in finished.tolist():
+                infos[b]["terminal_observation"] = obs[b].copy()
+                infos[b]["TimeLimit.truncated"] = bool(truncated[b] and not terminated[b])
+            game.reset_games(dones)
+            self._pick_opponents(finished.tolist())
+            obs[finished] = self._get_obs()[finished]
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def _rewards(self, terminated, prev_blue, prev_red):
+        """Same shaping as ``TCGEnv.step``, for every game at once."""
+        game = self.game
+        winner = game.winner()
+        rewards = np.where(winner == 1, 10.0, np.where(winner == 2, -10.0, -5.0))
+        rewards = np.where(terminated, rewards, 0.0)
+
+        blue, red = game.team == 1, game.team == 2
+        rewards += (blue.sum(axis=1) - prev_blue) * 1.0
+        rewards -= (red.sum(axis=1) - prev_red) * 1.0
+
+        production = FORTRESS_LIMIT[game.level]
+        rewards += ((production * blue).sum(axis=1) - (production * red).sum(axis=1)) * 0.0001
+        rewards += ((game.pawns * blue).sum(axis=1) - (game.pawns * red).sum(axis=1)) * 0.00001
+        return rewards
+
+    def _get_obs(self):
+        game = self.game
+        live = np.arange(game.p_team.shape[1]) < game.n_pawns[:, None]
+        return batch_observations(
+            game.team,
+            game.kind,
+            game.level,
+            game.pawns,
+            game.upgrade_time,
+            np.nonzero(live)[0],
+            game.p_from[live],
+            game.p_to[live],
+            game.p_team[live],
+        )
+
+    def action_masks(self):
+        """Valid actions per game, as a (B, 432) bool array."""
+        game = self.game
+        return batch_action_masks(game.team, game.level, game.pawns, game.upgrade_time)
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        indices = list(self._get_indices(indices))
+        if method_name == "action_masks":
+            return list(self.action_masks()[indices])
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in indices]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+
+def _shard_worker(remote, opponent_class, n_envs, seed):
+    """Serve one shard's ``TCGVecEnv`` to its ``SubprocTCGVecEnv``."""
+    env = TCGVecEnv(opponent_class, n_envs, seed)
+    while True:
+        command, data = remote.recv()
+        if command == "step":
+            env.step_async(data)
+            remote.send((*env.step_wait(), env.action_masks()))
+        elif command == "reset":
+            if data is not None:
+                env.seed(data)
+            remote.send((env.reset(), env.action_masks()))
+        elif command == "call":
+            name, args, kwargs = data
+            remote.send(getattr(env, name)(*args, **kwargs))
+        elif command == "close":
+            remote.close()
+            return
+
+
+class SubprocTCGVecEnv(VecEnv):
+    """
+    ``TCGVecEnv`` split into ``workers`` shards, each in its own process.
+
+    Games are assigned to shards in contiguous blocks, and shard ``i``
+    plays its games exactly as a ``TCGVecEnv`` of that size would. A step
+    costs one message each way per shard, rather than per game as with
+    ``SubprocVecEnv``. Each shard returns its action masks along with its
+    observations, so ``action_masks`` needs no round trip. ``workers``
+    defaults to the number of CPUs.
+    """
+
+    def __init__(self, opponent_class, n_envs: int = 8, workers: int | None = None, seed=None):
+        workers = max(1, min(n_envs, workers or os.cpu_count() or 1))
+        sizes = [len(part) for part in np.array_split(np.arange(n_envs), workers)]
+        # First game of each shard, and the end of the last one
+        self.offsets = np.cumsum([0] + sizes).tolist()
+        self.masks = np.zeros((n_envs, 432), dtype=bool)
+        self.closed = False
+        self.remotes = []
+        self.processes = []
+        context = get_context("spawn")
+        for offset, size in zip(self.offsets, sizes):
+            remote, child = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child, opponent_class, size, None if seed is None else seed + offset),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        super().__init__(n_envs, OBSERVATION_SPACE, spaces.Discrete(432))
+
+    def _shards(self, indices):
+        """``(shard, [local indices])`` for global game ``indices``, by shard."""
+        grouped = {}
+        for index in self._get_indices(indices):
+            shard = int(np.searchsorted(self.offsets, index, side="right")) - 1
+            grouped.setdefault(shard, []).append(index - self.offsets[shard])
+        return grouped.items()
+
+    def reset(self):
+        for remote, offset in zip(self.remotes, self.offsets):
+            remote.send(("reset", self._seeds[offset]))
+        self._reset_seeds()
+        self._reset_options()
+        results = [remote.recv() for remote in self.remotes]
+        self.masks = np.concatenate([masks for _, masks in results])
+        return np.concatenate([obs for obs, _ in results])
+
+    def step_async(self, actions):
+        actions = np.asarray(actions)
+        for remote, start, end in zip(self.remotes, self.offsets, self.offsets[1:]):
+            remote.send(("step", actions[start:end]))
+
+    def step_wait(self):
+        results = [remote.recv() for remote in self.remotes]
+        obs, rewards, dones, infos, masks = zip(*results)
+        self.masks = np.concatenate(masks)
+        return (
+            np.concatenate(obs),
+            np.concatenate(rewards),
+            np.concatenate(dones),
+            [info for shard in infos for info in shard],
+        )
+
+    def action_masks(self):
+        """Valid actions per game, as a (B, 432) bool array."""
+        return self.masks
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def _call(self, name, indices, *args, **kwargs):
+        results = []
+        for shard, local in self._shards(indices):
+            self.remotes[shard].send(("call", (name, args, {**kwargs, "indices": local})))
+            results.extend(self.remotes[shard].recv() or ())
+        return results
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call("get_attr", indices, attr_name)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call("set_attr", indices, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name == "action_masks":
+            return list(self.masks[list(self._get_indices(indices))])
+        return self._call("env_method", indices, method_name, *method_args, **method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
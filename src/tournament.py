@@ -7,31 +7,78 @@ src/tcg/players/ ディレクトリ内の全AIプレイヤーを自動検出し
     cd src
     uv run python tournament.py
 
+    uv run python tournament.py --workers 8   # 8プロセスで並列実行
+
 オプション:
     - トーナメント形式: TOURNAMENT_MODE = "swiss" または "round_robin"
     - ウィンドウ表示: ENABLE_WINDOW を True/False に設定
     - スイス式ラウンド数: SWISS_ROUNDS を変更
+    - 並列実行: --workers N（試合ごとにシードを固定するため、結果は直列実行と同一）
+    - 高速エンジン: --skip（何も起きないステップを飛ばす SkipGame で実行。結果は同一）
+    - リプレイの記録: --replays DIR（各試合を DIR/match_0001.tcgr などに保存。
+      replay_viewer.py で再生）
+    - 試合データベース: --db DIR（各試合のリプレイを DIR の試合データベースに追加。
+      match_database.py で分析）
+    - 出場者の指定: --players Strategic RandomPlayer（チーム名またはクラス名）
+    - 推論のバッチ処理: --inference（PPO プレイヤーの推論を全ワーカー分まとめて行う。
+      --workers と併用）
+    - 軽量モード: --light（torch などが必要な機械学習プレイヤーを除外。import しないので起動が速い）
 """
 
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
+from pathlib import Path
 import random
 
-import pygame
-
 from tcg.controller import Controller
 from tcg.game import Game
-from tcg.players import discover_players
+from tcg.match_cache import MatchCache
+from tcg.match_db import MatchDB
+from tcg.profiling import ControllerTimer, LatencyStats
+from tcg.replay import ReplayRecorder
+from tcg.skip_game import SkipGame
+from tcg.players import scan_players, team_name
 
 # トーナメント設定
 TOURNAMENT_MODE = "swiss"  # "swiss" または "round_robin"
 SWISS_ROUNDS = None  # None の場合は自動計算（ceil(log2(player_count)) * 2）
 MATCHES_PER_PAIR = 2  # 各対戦カードで実行する試合数（round_robin用）
 ENABLE_WINDOW = False  # ウィンドウ表示の有効/無効
+WORKERS = 1  # 並列実行するプロセス数（1 の場合は直列実行）
+SEED = 0  # 試合ごとの乱数シードの基準値
+CACHE_PATH = None  # 試合結果キャッシュ（SQLite）のパス。None の場合は使わない
+MEASURE_LATENCY = False  # 各プレイヤーの update 所要時間を計測して表示するか
+TIME_BUDGET = None  # update 1回あたりの持ち時間（秒）。超過した呼び出しは (0, 0, 0) 扱い
+SKIP_QUIET = False  # ウィンドウ非表示時、何も起きないステップを飛ばすエンジンで実行するか
+BATCH_INFERENCE = False  # 並列実行時、PPO プレイヤーの推論を1プロセスでまとめて行うか
+REPLAY_DIR = None  # 試合のリプレイを保存するディレクトリ。None の場合は記録しない
+DB_PATH = None  # 試合データベースのディレクトリ。None の場合は使わない
+
+
+def match_seed(match_id: int, seed: int = SEED) -> int:
+    """試合番号から試合ごとの乱数シードを決める"""
+    return seed * 1_000_000 + match_id
 
 
 def run_match(
-    player1: Controller, player2: Controller, match_id: int = 1, window: bool = True
+    player1: Controller,
+    player2: Controller,
+    match_id: int = 1,
+    window: bool = True,
+    seed: int | None = None,
+    verbose: bool = True,
+    cache: MatchCache | None = None,
+    latency: bool = False,
+    budget: float | None = None,
+    skip: bool = False,
+    replays: str | None = None,
 ) -> dict:
     """
     1試合を実行して結果を返す
@@ -41,6 +88,13 @@ def run_match(
         player2: プレイヤー2（赤/上側）
         match_id: 試合番号
         window: ウィンドウ表示の有効/無効
+        seed: 乱数シード（None の場合はシードを固定しない）
+        verbose: ウィンドウ非表示時に結果を表示するか
+        cache: 試合結果キャッシュ（シード指定時のみ使用。ヒットしたら試合を実行しない）
+        latency: 両プレイヤーの update 所要時間を計測するか
+        budget: update 1回あたりの持ち時間（秒）。超過した呼び出しは (0, 0, 0) 扱い
+        skip: ウィンドウ非表示時に SkipGame で実行するか（結果は Game と同一）
+        replays: リプレイを保存するディレクトリ（キャッシュにヒットした試合は記録しない）
 
     Returns:
         dict: 試合結果
@@ -48,9 +102,35 @@ def run_match(
             - blue_fortresses: 青チームの要塞数
             - red_fortresses: 赤チームの要塞数
             - steps: 総ステップ数
+            - latency: [青, 赤] の LatencyStats（計測時のみ）
     """
-    game = Game(player1, player2, window=window)
-    game.run()
+    # 持ち時間を課すと結果が実行速度に依存するため、キャッシュは使わない
+    use_cache = cache is not None and seed is not None and budget is None
+    result = cache.get(type(player1), type(player2), seed) if use_cache else None
+    if result is not None:
+        if verbose:
+            print_match_result(result, match_id)
+        return result
+
+    if seed is not None:
+        # self.rng を使わずモジュールの random を直接使うプレイヤー向け
+        random.seed(seed)
+    timers = []
+    if latency or budget is not None:
+        timers = [ControllerTimer(player1, budget), ControllerTimer(player2, budget)]
+    recorder = ReplayRecorder(seed) if replays is not None else None
+    if skip and not window:
+        game = SkipGame(player1, player2, window=False, seed=seed, recorder=recorder)
+        while game.process_step():
+            pass
+    else:
+        game = Game(player1, player2, window=window, seed=seed, recorder=recorder)
+        game.run()
+    for timer in timers:
+        timer.detach()
+    if recorder is not None:
+        Path(replays).mkdir(parents=True, exist_ok=True)
+        recorder.finish().save(Path(replays) / f"match_{match_id:04d}.tcgr")
 
     result = {
         "winner": game.win_team,
@@ -58,14 +138,182 @@ def run_match(
         "red_fortresses": game.Red_fortress,
         "steps": game.step,
     }
+    if timers:
+        result["latency"] = [timer.stats() for timer in timers]
+    if use_cache:
+        cache.put(type(player1), type(player2), seed, result)
+
+    if not window and verbose:
+        print_match_result(result, match_id)
+
+    return result
+
+
+def print_match_result(result: dict, match_id: int):
+    """1試合の結果を1行で表示"""
+    print(
+        f"  Match {match_id}: {result['winner']} Win! "
+        f"(Blue: {result['blue_fortresses']}, Red: {result['red_fortresses']}, "
+        f"Steps: {result['steps']})"
+    )
+
+
+# ワーカープロセスごとに1度だけ import したプレイヤークラス
+_worker_classes = {}
+
+
+def _class_path(player_class: type[Controller]) -> str:
+    return f"{player_class.__module__}:{player_class.__qualname__}"
+
+
+def _load_class(path: str) -> type[Controller]:
+    module_name, qualname = path.split(":")
+    obj = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _init_worker(class_paths: list[str]):
+    """ワーカー起動時にプレイヤークラスを import しておく"""
+    for path in class_paths:
+        _worker_classes[path] = _load_class(path)
+
+
+def _play_match(task: tuple) -> dict:
+    """ワーカープロセスで1試合を実行"""
+    path1, path2, match_id, seed, latency, budget, skip, replays = task
+    # 表示は親プロセスが試合順に行うので、ワーカー側の出力は捨てる
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_match(
+            _worker_classes[path1](),
+            _worker_classes[path2](),
+            match_id,
+            window=False,
+            seed=seed,
+            verbose=False,
+            latency=latency,
+            budget=budget,
+            skip=skip,
+            replays=replays,
+        )
 
-    if not window:
+
+def create_executor(players: list[type[Controller]], workers: int):
+    """
+    並列実行用のプロセスプールを作成（workers が1以下なら None）
+
+    各ワーカーは起動時に一度だけプレイヤークラスを import する。
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=([_class_path(c) for c in players],),
+    )
+
+
+def run_matches(
+    matches: list[tuple],
+    window: bool = True,
+    executor=None,
+    seed: int = SEED,
+    cache: MatchCache | None = None,
+    latency: bool = False,
+    budget: float | None = None,
+    skip: bool = False,
+    replays: str | None = None,
+    db: MatchDB | None = None,
+):
+    """
+    試合をまとめて実行し、結果を matches と同じ順に返すジェネレータ
+
+    Args:
+        matches: (プレイヤー1クラス, プレイヤー2クラス, 試合番号) のリスト
+        window: ウィンドウ表示の有効/無効（並列実行時は常に無効）
+        executor: create_executor で作ったプロセスプール（None の場合は直列実行）
+        seed: 乱数シードの基準値
+        cache: 試合結果キャッシュ（ヒットした試合は実行しない）
+        latency: update 所要時間を計測するか
+        budget: update 1回あたりの持ち時間（秒）
+        skip: 何も起きないステップを飛ばすエンジンで実行するか
+        replays: リプレイを保存するディレクトリ（None の場合は記録しない）
+        db: 試合データベース（記録したリプレイを追加する。replays の指定が必要）
+    """
+    if budget is not None:
+        # 持ち時間を課した結果は実行速度に依存するので、キャッシュとは混ぜない
+        cache = None
+    seeds = [match_seed(match_id, seed) for _, _, match_id in matches]
+    cached = [
+        cache.get(p1, p2, s) if cache is not None else None
+        for (p1, p2, _), s in zip(matches, seeds)
+    ]
+    pending = [(match, s) for match, s, hit in zip(matches, seeds, cached) if hit is None]
+
+    if executor is None:
+        computed = (
+            run_match(
+                p1(),
+                p2(),
+                match_id,
+                window=window,
+                seed=s,
+                verbose=False,
+                latency=latency,
+                budget=budget,
+                skip=skip,
+                replays=replays,
+            )
+            for (p1, p2, match_id), s in pending
+        )
+    else:
+        tasks = [
+            (_class_path(p1), _class_path(p2), match_id, s, latency, budget, skip, replays)
+            for (p1, p2, match_id), s in pending
+        ]
+        # map は投入順に結果を返すので、集計順は直列実行と同じになる
+        computed = executor.map(_play_match, tasks)
+
+    for (p1, p2, match_id), s, result in zip(matches, seeds, cached):
+        if result is None:
+            result = next(computed)
+            if cache is not None:
+                cache.put(p1, p2, s, result)
+            if db is not None and replays is not None:
+                db.add_file(Path(replays) / f"match_{match_id:04d}.tcgr")
+        yield result
+
+
+def record_latency(latency_stats: dict, names: tuple, result: dict):
+    """試合結果に含まれる update 所要時間をプレイヤーごとに集計"""
+    for name, stats in zip(names, result.get("latency", ())):
+        latency_stats[name].merge(stats)
+
+
+def print_latency_table(latency_stats: dict, budget: float | None):
+    """プレイヤーごとの update 所要時間を表示"""
+    if not latency_stats:
+        return
+    print("\nupdate 所要時間" + (f"（持ち時間: {budget * 1000:g}ms）" if budget else ""))
+    print(
+        f"{'プレイヤー名':<20} {'呼出回数':>10} {'p50(ms)':>9} {'p95(ms)':>9} {'max(ms)':>9} "
+        f"{'CPU/試合(s)':>12} {'超過':>6}"
+    )
+    print("-" * 70)
+    rows = sorted(latency_stats.items(), key=lambda x: x[1].to_dict()["p95_ms"], reverse=True)
+    for name, stats in rows:
+        d = stats.to_dict()
         print(
-            f"  Match {match_id}: {game.win_team} Win! "
-            f"(Blue: {game.Blue_fortress}, Red: {game.Red_fortress}, Steps: {game.step})"
+            f"{name:<20} {d['calls']:>10} {d['p50_ms']:>9.3f} {d['p95_ms']:>9.3f} "
+            f"{d['max_ms']:>9.3f} {d['cpu_per_match_s']:>12.3f} {d['over_budget']:>6}"
         )
 
-    return result
+
+def print_cache_summary(cache: MatchCache | None, hits_before: int, total: int):
+    """キャッシュから再利用した試合数を表示"""
+    if cache is not None:
+        print(f"キャッシュ再利用: {cache.hits - hits_before}/{total}試合")
 
 
 def calculate_swiss_rounds(player_count: int) -> int:
@@ -139,7 +387,17 @@ def pair_swiss_round(
 
 
 def run_swiss_tournament(
-    players: list[type[Controller]], rounds: int = None, window: bool = True
+    players: list[type[Controller]],
+    rounds: int = None,
+    window: bool = True,
+    workers: int = 1,
+    seed: int = SEED,
+    cache: MatchCache | None = None,
+    latency: bool = MEASURE_LATENCY,
+    budget: float | None = TIME_BUDGET,
+    skip: bool = SKIP_QUIET,
+    replays: str | None = REPLAY_DIR,
+    db: MatchDB | None = None,
 ):
     """
     スイス式トーナメントを実行
@@ -148,6 +406,14 @@ def run_swiss_tournament(
         players: プレイヤークラスのリスト
         rounds: ラウンド数（Noneの場合は自動計算）
         window: ウィンドウ表示の有効/無効
+        workers: 並列実行するプロセス数（各ラウンドの試合を並列に実行）
+        seed: 乱数シードの基準値
+        cache: 試合結果キャッシュ（None の場合は使わない）
+        latency: 各プレイヤーの update 所要時間を計測して表示するか
+        budget: update 1回あたりの持ち時間（秒）。超過した呼び出しは (0, 0, 0) 扱い
+        skip: 何も起きないステップを飛ばすエンジンで実行するか（結果は同一）
+        replays: 各試合のリプレイを保存するディレクトリ（None の場合は記録しない）
+        db: 試合データベース（None の場合は使わない。replays の指定が必要）
     """
     if len(players) < 2:
         print("エラー: 最低2人のプレイヤーが必要です")
@@ -161,21 +427,23 @@ def run_swiss_tournament(
     print("=" * 70)
     print(f"\n参加プレイヤー: {len(players)}人")
     for i, player_class in enumerate(players, 1):
-        player = player_class()
-        print(f"  {i}. {player.team_name()} ({player_class.__name__})")
+        print(f"  {i}. {team_name(player_class)} ({player_class.__name__})")
+
+    if workers > 1:
+        window = False
 
     print(f"\nラウンド数: {rounds}")
     expected_matches = rounds * (len(players) // 2)
     print(f"予定試合数（約）: {expected_matches}試合")
     print(f"ビジュアライゼーション: {'ON' if window else 'OFF'}")
+    print(f"並列実行: {workers}プロセス")
     print("=" * 70)
 
     # プレイヤー情報の初期化
     player_stats = {}
     player_classes = {}
     for idx, player_class in enumerate(players):
-        player = player_class()
-        player_name = player.team_name()
+        player_name = team_name(player_class)
         player_stats[player_name] = {
             "wins": 0,
             "draws": 0,
@@ -188,6 +456,9 @@ def run_swiss_tournament(
 
     played_pairs = set()
     match_count = 0
+    executor = create_executor(players, workers)
+    cache_hits = cache.hits if cache is not None else 0
+    latency_stats = defaultdict(LatencyStats)
 
     # 各ラウンドを実行
     for round_num in range(1, rounds + 1):
@@ -219,7 +490,8 @@ def run_swiss_tournament(
             print("  対戦ペアが見つかりません")
             break
 
-        # 各ペアの対戦を実行
+        # 各ペアの対戦を実行（ラウンド内の試合はまとめて投入し、ラウンド間で同期）
+        matches = []
         for player1_name_idx, player2_name_idx in pairs:
             # インデックスからプレイヤーを取得
             player1_name = next(
@@ -232,17 +504,26 @@ def run_swiss_tournament(
                 for name, stats in player_stats.items()
                 if stats["original_idx"] == player2_name_idx
             )
-
-            print(f"  {player1_name} vs {player2_name}")
-
-            # 対戦実行
-            result = run_match(
-                player_classes[player1_name](),
-                player_classes[player2_name](),
-                match_count + 1,
-                window=window,
-            )
             match_count += 1
+            matches.append((player1_name, player2_name, match_count))
+
+        results = run_matches(
+            [(player_classes[p1], player_classes[p2], m) for p1, p2, m in matches],
+            window=window,
+            executor=executor,
+            seed=seed,
+            cache=cache,
+            latency=latency,
+            budget=budget,
+            skip=skip,
+            replays=replays,
+            db=db,
+        )
+        for (player1_name, player2_name, match_id), result in zip(matches, results):
+            print(f"  {player1_name} vs {player2_name}")
+            if not window:
+                print_match_result(result, match_id)
+            record_latency(latency_stats, (player1_name, player2_name), result)
 
             # 統計更新
             player_stats[player1_name]["matches"] += 1
@@ -266,6 +547,9 @@ def run_swiss_tournament(
                              player_stats[player2_name]["original_idx"]]))
             )
 
+    if executor is not None:
+        executor.shutdown()
+
     # 最終結果表示
     print("\n" + "=" * 70)
     print("トーナメント結果")
@@ -312,11 +596,23 @@ def run_swiss_tournament(
 
     print("\n" + "=" * 70)
     print(f"総試合数: {match_count}試合")
+    print_cache_summary(cache, cache_hits, match_count)
     print("=" * 70)
+    print_latency_table(latency_stats, budget)
 
 
 def run_round_robin_tournament(
-    players: list[type[Controller]], matches_per_pair: int = 2, window: bool = True
+    players: list[type[Controller]],
+    matches_per_pair: int = 2,
+    window: bool = True,
+    workers: int = 1,
+    seed: int = SEED,
+    cache: MatchCache | None = None,
+    latency: bool = MEASURE_LATENCY,
+    budget: float | None = TIME_BUDGET,
+    skip: bool = SKIP_QUIET,
+    replays: str | None = REPLAY_DIR,
+    db: MatchDB | None = None,
 ):
     """
     総当たり戦トーナメントを実行
@@ -325,6 +621,14 @@ def run_round_robin_tournament(
         players: プレイヤークラスのリスト
         matches_per_pair: 各対戦で実行する試合数
         window: ウィンドウ表示の有効/無効
+        workers: 並列実行するプロセス数（全試合を一度に投入）
+        seed: 乱数シードの基準値
+        cache: 試合結果キャッシュ（None の場合は使わない）
+        latency: 各プレイヤーの update 所要時間を計測して表示するか
+        budget: update 1回あたりの持ち時間（秒）。超過した呼び出しは (0, 0, 0) 扱い
+        skip: 何も起きないステップを飛ばすエンジンで実行するか（結果は同一）
+        replays: 各試合のリプレイを保存するディレクトリ（None の場合は記録しない）
+        db: 試合データベース（None の場合は使わない。replays の指定が必要）
     """
     if len(players) < 2:
         print("エラー: 最低2人のプレイヤーが必要です")
@@ -336,12 +640,15 @@ def run_round_robin_tournament(
     print("=" * 70)
     print(f"\n参加プレイヤー: {len(players)}人")
     for i, player_class in enumerate(players, 1):
-        player = player_class()
-        print(f"  {i}. {player.team_name()} ({player_class.__name__})")
+        print(f"  {i}. {team_name(player_class)} ({player_class.__name__})")
+
+    if workers > 1:
+        window = False
 
     print(f"\n各対戦: {matches_per_pair}試合")
     print(f"総試合数: {len(list(combinations(range(len(players)), 2))) * matches_per_pair}試合")
     print(f"ビジュアライゼーション: {'ON' if window else 'OFF'}")
+    print(f"並列実行: {workers}プロセス")
     print("=" * 70)
 
     # 統計情報を記録
@@ -349,38 +656,61 @@ def run_round_robin_tournament(
         lambda: {"wins": 0, "losses": 0, "draws": 0, "total_fortresses": 0, "matches": 0}
     )
 
-    # 総当たり戦
-    match_count = 0
+    # 総当たり戦（全試合の組み合わせを先に作る）
+    matches = []
     for i, j in combinations(range(len(players)), 2):
-        player1_class = players[i]
-        player2_class = players[j]
-
-        player1_name = player1_class().team_name()
-        player2_name = player2_class().team_name()
-
-        print(f"\n【{player1_name} vs {player2_name}】")
-
-        # 複数回対戦
         for round_num in range(1, matches_per_pair + 1):
-            print(f"  Match {round_num}: {player1_name} vs {player2_name}")
-            result = run_match(player1_class(), player2_class(), match_count + 1, window=window)
-            match_count += 1
-
-            # 統計更新
-            stats[player1_name]["matches"] += 1
-            stats[player2_name]["matches"] += 1
-            stats[player1_name]["total_fortresses"] += result["blue_fortresses"]
-            stats[player2_name]["total_fortresses"] += result["red_fortresses"]
+            matches.append((i, j, round_num, len(matches) + 1))
+
+    names = [team_name(player_class) for player_class in players]
+    executor = create_executor(players, workers)
+    cache_hits = cache.hits if cache is not None else 0
+    latency_stats = defaultdict(LatencyStats)
+    results = run_matches(
+        [(players[i], players[j], match_id) for i, j, _, match_id in matches],
+        window=window,
+        executor=executor,
+        seed=seed,
+        cache=cache,
+        latency=latency,
+        budget=budget,
+        skip=skip,
+        replays=replays,
+        db=db,
+    )
 
-            if result["winner"] == "Blue":
-                stats[player1_name]["wins"] += 1
-                stats[player2_name]["losses"] += 1
-            elif result["winner"] == "Red":
-                stats[player2_name]["wins"] += 1
-                stats[player1_name]["losses"] += 1
-            else:
-                stats[player1_name]["draws"] += 1
-                stats[player2_name]["draws"] += 1
+    match_count = 0
+    for (i, j, round_num, match_id), result in zip(matches, results):
+        player1_name = names[i]
+        player2_name = names[j]
+
+        if round_num == 1:
+            print(f"\n【{player1_name} vs {player2_name}】")
+
+        print(f"  Match {round_num}: {player1_name} vs {player2_name}")
+        if not window:
+            print_match_result(result, match_id)
+        record_latency(latency_stats, (player1_name, player2_name), result)
+        match_count += 1
+
+        # 統計更新
+        stats[player1_name]["matches"] += 1
+        stats[player2_name]["matches"] += 1
+        stats[player1_name]["total_fortresses"] += result["blue_fortresses"]
+        stats[player2_name]["total_fortresses"] += result["red_fortresses"]
+
+        if result["winner"] == "Blue":
+            stats[player1_name]["wins"] += 1
+            stats[player2_name]["losses"] += 1
+        elif result["winner"] == "Red":
+            stats[player2_name]["wins"] += 1
+            stats[player1_name]["losses"] += 1
+        else:
+            stats[player1_name]["draws"] += 1
+            stats[player2_name]["draws"] += 1
+
+    if executor is not None:
+        executor.shutdown()
 
     # 結果表示
     print("\n" + "=" * 70)
@@ -429,18 +759,99 @@ def run_round_robin_tournament(
 
     print("\n" + "=" * 70)
     print(f"総試合数: {match_count}試合")
+    print_cache_summary(cache, cache_hits, match_count)
     print("=" * 70)
+    print_latency_table(latency_stats, budget)
 
 
 def main():
     """メイン関数"""
-    # プレイヤーを収集
+    parser = argparse.ArgumentParser(description="要塞征服ゲーム トーナメント")
+    parser.add_argument(
+        "--workers", type=int, default=WORKERS, help="並列実行するプロセス数（既定: 1）"
+    )
+    parser.add_argument("--seed", type=int, default=SEED, help="試合ごとの乱数シードの基準値")
+    parser.add_argument(
+        "--cache", default=CACHE_PATH, help="試合結果キャッシュ（SQLite ファイル）のパス"
+    )
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        default=MEASURE_LATENCY,
+        help="各プレイヤーの update 所要時間（p50/p95/max, CPU時間）を表示",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="update 1回あたりの持ち時間（ms）。超過した呼び出しは (0, 0, 0) 扱い",
+    )
+    parser.add_argument(
+        "--skip",
+        action="store_true",
+        default=SKIP_QUIET,
+        help="何も起きないステップを飛ばすエンジンで実行（結果は同一で高速）",
+    )
+    parser.add_argument(
+        "--replays",
+        default=REPLAY_DIR,
+        metavar="DIR",
+        help="各試合のリプレイ (.tcgr) を DIR に保存（キャッシュにヒットした試合は記録しない）",
+    )
+    parser.add_argument(
+        "--db",
+        default=DB_PATH,
+        metavar="DIR",
+        help=(
+            "各試合を DIR の試合データベースに追加"
+            "（--replays を省略すると DIR/replays/日時/ に記録）"
+        ),
+    )
+    parser.add_argument(
+        "--players",
+        nargs="+",
+        default=None,
+        help="出場させるプレイヤー（チーム名またはクラス名）。既定は全員",
+    )
+    parser.add_argument(
+        "--light",
+        action="store_true",
+        help="torch などの重いライブラリが必要なプレイヤーを除外（起動が速くなる）",
+    )
+    parser.add_argument(
+        "--inference",
+        action="store_true",
+        default=BATCH_INFERENCE,
+        help=(
+            "PPO プレイヤーの推論を1プロセスにまとめ、全ワーカーの要求をバッチ処理する"
+            "（--workers 2 以上）"
+        ),
+    )
+    args = parser.parse_args()
+    budget = args.budget / 1000 if args.budget is not None else TIME_BUDGET
+    cache = MatchCache(args.cache) if args.cache else None
+    db = MatchDB(args.db) if args.db else None
+    if db is not None and args.replays is None:
+        args.replays = str(Path(args.db) / "replays" / time.strftime("%Y%m%d-%H%M%S"))
+
+    # src/tcg/players/ から自動検出（モジュールは import せずにソースを読む）
+    entries = scan_players()
+    print(f"発見したプレイヤー: {len(entries)}人")
+    if args.players:
+        entries = [e for e in entries if {e.class_name, e.team_name} & set(args.players)]
+    if args.light:
+        excluded = [e for e in entries if e.heavy]
+        entries = [e for e in entries if not e.heavy]
+        for e in excluded:
+            print(f"  除外: {e.team_name or e.class_name}（{', '.join(e.heavy)} が必要）")
+
+    # 出場するプレイヤーのモジュールだけを import する
     players = []
-
-    # src/tcg/players/ から自動検出
-    discovered_players = discover_players()
-    players.extend(discovered_players)
-    print(f"発見したプレイヤー: {len(discovered_players)}人")
+    for entry in entries:
+        try:
+            players.append(entry.load())
+        except Exception as e:
+            print(f"Warning: Failed to load {entry.module}: {e}")
 
     if len(players) == 0:
         print("\nエラー: プレイヤーが見つかりませんでした")
@@ -448,18 +859,61 @@ def main():
         print("詳細は src/tcg/players/README.md を参照")
         return
 
-    # トーナメント実行
+    # PPO プレイヤーの推論をまとめて行うプロセス（ワーカーより先に起動し、環境変数で場所を伝える）
+    service = None
+    if args.inference and args.workers > 1:
+        from tcg.inference import InferenceService
+
+        service = InferenceService()
+        os.environ.update(service.environ())
+
+    try:
+        run_tournament(players, args, cache, budget, db)
+    finally:
+        if service is not None:
+            service.close()
+        if db is not None:
+            db.close()
+
+    # Pygameの終了処理（ウィンドウ表示時のみ読み込む）
+    if ENABLE_WINDOW:
+        import pygame
+
+        pygame.quit()
+
+
+def run_tournament(players, args, cache, budget, db=None):
+    """TOURNAMENT_MODE の形式でトーナメントを実行"""
     if TOURNAMENT_MODE == "swiss":
-        run_swiss_tournament(players, rounds=SWISS_ROUNDS, window=ENABLE_WINDOW)
+        run_swiss_tournament(
+            players,
+            rounds=SWISS_ROUNDS,
+            window=ENABLE_WINDOW,
+            workers=args.workers,
+            seed=args.seed,
+            cache=cache,
+            latency=args.latency,
+            budget=budget,
+            skip=args.skip,
+            replays=args.replays,
+            db=db,
+        )
     elif TOURNAMENT_MODE == "round_robin":
-        run_round_robin_tournament(players, matches_per_pair=MATCHES_PER_PAIR, window=ENABLE_WINDOW)
+        run_round_robin_tournament(
+            players,
+            matches_per_pair=MATCHES_PER_PAIR,
+            window=ENABLE_WINDOW,
+            workers=args.workers,
+            seed=args.seed,
+            cache=cache,
+            latency=args.latency,
+            budget=budget,
+            skip=args.skip,
+            replays=args.replays,
+            db=db,
+        )
     else:
         print(f"エラー: 不明なトーナメント形式: {TOURNAMENT_MODE}")
-        return
-
-    # Pygameの終了処理
-    if ENABLE_WINDOW:
-        pygame.quit()
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ from stable_baselines3.common.env_util import make_vec_env
 from stable_baselines3.common.callbacks import CheckpointCallback
 
 from tcg.gym_env import TCGEnv
-from tcg.players import discover_players
+from tcg.players import scan_players
 
 def mask_fn(env: TCGEnv) -> list[bool]:
     return env.action_masks()
@@ -19,7 +19,8 @@ def train():
 
     # Define the opponent. 
     # Use specific strong opponents including the new Aggressive variants
-    all_players = discover_players()
+    # Only the chosen opponents' modules are imported
+    all_players = scan_players()
     opponent_classes = []
     target_opponents = [
         # New Aggressive Strategies
@@ -41,14 +42,14 @@ def train():
     ]
     
     for p in all_players:
-        if p.__name__ in target_opponents:
-            opponent_classes.append(p)
+        if p.class_name in target_opponents:
+            opponent_classes.append(p.load())
     
     if not opponent_classes:
         print("Warning: No target opponents found! Falling back to all available.")
         for p in all_players:
-             if p.__name__ not in ["GymController", "MLPlayer"]:
-                 opponent_classes.append(p)
+             if p.class_name not in ["GymController", "MLPlayer"]:
+                 opponent_classes.append(p.load())
 
     print(f"Training against {len(opponent_classes)} opponents: {[p.__name__ for p in opponent_classes]}")
 